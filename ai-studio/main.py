@@ -1,12 +1,31 @@
 import argparse
-import json
+import hashlib
 import os
+import sys
 import time
 import urllib.parse
 from pathlib import Path
+from typing import Optional
 
 import requests
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from persolive_common.http_client import (  # noqa: E402
+    PersoSession,
+    get_session,
+    get_session_for_url,
+)
+from persolive_common.job_journal import (  # noqa: E402
+    JobJournal,
+    job_key,
+    status_command,
+)
+from persolive_common.webhook import (  # noqa: E402
+    TERMINAL_STATUSES,
+    WebhookReceiver,
+)
+
 
 def parse_arguments():
     """Command line argument parser"""
@@ -29,6 +48,10 @@ Examples:
   
   # Custom save directory
   python main.py --tts-text "Hello" --save-dir "./my-outputs"
+
+  # Record tasks; rerunning the same command after a crash re-attaches to them
+  python main.py --tts-text "Hello" --journal jobs.db
+  python main.py status --journal jobs.db
         """,
     )
     parser.add_argument(
@@ -79,6 +102,19 @@ Examples:
         "--webhook_url",
         help="Webhook URL",
     )
+    parser.add_argument(
+        "--journal",
+        help="SQLite file recording submitted tasks; a rerun re-attaches instead of resubmitting",
+    )
+    parser.add_argument(
+        "--webhook-port",
+        type=int,
+        help="Receive task webhooks on this local port instead of polling every 5 seconds",
+    )
+    parser.add_argument(
+        "--webhook-public-url",
+        help="Public URL that forwards to --webhook-port (default: http://127.0.0.1:PORT)",
+    )
     parser.add_argument(
         "--skip-stf",
         action="store_true",
@@ -111,7 +147,7 @@ def download_file(url: str, save_dir: str = "user-uploads") -> str:
     save_path = os.path.join(save_dir, file_name)
 
     # Download file
-    response = requests.get(url, stream=True, timeout=30)
+    response = get_session_for_url(url).get(url, stream=True)
     response.raise_for_status()
 
     with open(save_path, "wb") as f:
@@ -121,12 +157,12 @@ def download_file(url: str, save_dir: str = "user-uploads") -> str:
     return save_path
 
 
-def check_types(base_url: str, headers: dict, type_name: str = "tts_type"):
+def check_types(client: PersoSession, type_name: str = "tts_type"):
     """Check available TTS (Text To Speech) types."""
-    url = f"{base_url}/api/v1/settings/{type_name}/"
+    url = f"{client.base_url}/api/v1/settings/{type_name}/"
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = client.get(url)
         print(f"📡 Status Code: {response.status_code}")
 
         if response.status_code == 200:
@@ -142,14 +178,100 @@ def check_types(base_url: str, headers: dict, type_name: str = "tts_type"):
         print(f"❌ Request failed: {e}")
 
 
+def file_digest(path: str) -> str:
+    """SHA-256 of a local file, to recognize the same upload on a rerun."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def submit_task(
+    kind: str,
+    label: str,
+    request: dict,
+    post,
+    journal: JobJournal = None,
+) -> Optional[str]:
+    """Send a studio task request unless the journal already has it.
+
+    request identifies the task in the journal (uploaded files by digest);
+    post() sends it. Returns the task ID, or None if the request failed.
+    """
+    key = job_key(kind, request)
+    previous = journal.resumable(key) if journal else None
+    if previous:
+        print(
+            f"♻️  Re-attached to {label} task {previous['remote_id']} ({previous['status']})"
+        )
+        return previous["remote_id"]
+
+    if journal:
+        journal.begin(key, kind, request, label)
+    response = post()
+
+    if response.status_code >= 400:
+        print(f"❌ {label} request failed: {response.status_code}")
+        print(response.text)
+        if journal:
+            journal.fail(key, f"{response.status_code} - {response.text}")
+        return None
+
+    data = response.json()
+    if journal:
+        journal.submitted(key, data["task_id"], data.get("status", "PENDING"))
+    print(f"⏳ {label} task started (Task ID: {data['task_id']})")
+    return data["task_id"]
+
+
+def wait_for_task(
+    client: PersoSession,
+    url: str,
+    task_id: str,
+    label: str,
+    receiver: WebhookReceiver = None,
+    journal: JobJournal = None,
+) -> dict:
+    """Wait until a studio task is COMPLETED or FAILED and return its state.
+
+    Without a receiver the task is polled every 5 seconds. With one, the task
+    is checked as soon as its webhook arrives and only polled once a minute
+    as a safety net. Status changes are recorded in the journal, and a task
+    the journal already has as finished is not polled again.
+    """
+    if journal:
+        previous = journal.get_by_remote_id(task_id)
+        if previous and previous["status"] in TERMINAL_STATUSES and previous["result"]:
+            return previous["result"]
+
+    def check():
+        response = client.get(url + f"{task_id}/")
+        data = response.json()
+        print(f"⏳ {label} task status: {data['status']}")
+        if journal:
+            journal.update(task_id, data["status"], data)
+        return data
+
+    if receiver is not None:
+        return receiver.wait_blocking(task_id, poll=check, poll_interval=60)
+
+    while True:
+        time.sleep(5)
+        data = check()
+        if data["status"] in TERMINAL_STATUSES:
+            return data
+
+
 def tts_task(
-    base_url: str,
-    headers: dict,
+    client: PersoSession,
     tts_text: list,
     tts_type: str = "yuri",
     tts_audio_format: str = "wav_16bit_32000hz_mono",
     agent: str = "1",
     webhook_url: str = None,
+    receiver: WebhookReceiver = None,
+    journal: JobJournal = None,
 ):
     """Perform TTS task."""
     print("🎵 Starting TTS task...")
@@ -157,62 +279,44 @@ def tts_task(
     print(f"🔊 TTS Type: {tts_type}")
     print(f"🎛️  Audio Format: {tts_audio_format}")
 
-    url = f"{base_url}/api/studio/v1/task/tts/"
-
-    payload = json.dumps(
-        {
-            "agent": agent,
-            "tts_type": tts_type,
-            "tts_audio_format": tts_audio_format,
-            "tts_text": tts_text,
-            "webhook_url": webhook_url,
-        },
-        ensure_ascii=False,
-    )
-    response = requests.post(url, headers=headers, data=payload, timeout=30)
-    data = response.json()
+    url = f"{client.base_url}/api/studio/v1/task/tts/"
 
-    if response.status_code >= 400:
-        print(f"❌ TTS request failed: {response.status_code}")
-        print(response.text)
+    payload = {
+        "agent": agent,
+        "tts_type": tts_type,
+        "tts_audio_format": tts_audio_format,
+        "tts_text": tts_text,
+        "webhook_url": webhook_url,
+    }
+    task_id = submit_task(
+        "tts", "TTS", payload, lambda: client.post(url, json=payload), journal
+    )
+    if task_id is None:
         return None
 
-    print(f"⏳ TTS task started (Task ID: {data['task_id']})")
-
-    while True:
-        time.sleep(5)
-        response = requests.get(
-            url + f"{data['task_id']}/", headers=headers, timeout=30
-        )
-        data = response.json()
-        print(f"⏳ TTS task status: {data['status']}")
-
-        if data["status"] == "COMPLETED":
-            audio_url = data["tts_output_audio"]
-            return audio_url
-        elif data["status"] == "FAILED":
-            print(f"❌ TTS task failed: {data.get('failure_reason', 'Unknown error')}")
-            return None
+    data = wait_for_task(client, url, task_id, "TTS", receiver, journal)
+    if data["status"] == "COMPLETED":
+        audio_url = data["tts_output_audio"]
+        return audio_url
+    print(f"❌ TTS task failed: {data.get('failure_reason', 'Unknown error')}")
+    return None
 
 
 def stf_task(
-    base_url: str,
-    headers: dict,
+    client: PersoSession,
     stf_input_audio: str,
     stf_model_style: str = "yuri-front_natural",
     agent: str = "1",
     webhook_url: str = None,
+    receiver: WebhookReceiver = None,
+    journal: JobJournal = None,
 ):
     """Perform STF (Speech To Face) task."""
     print("🎭 Starting STF task...")
     print(f"🎵 Input audio: {stf_input_audio}")
     print(f"👤 Model style: {stf_model_style}")
 
-    url = f"{base_url}/api/studio/v1/task/stf/"
-
-    # Remove Content-Type header for multipart/form-data
-    upload_headers = headers.copy()
-    upload_headers.pop("Content-Type", None)
+    url = f"{client.base_url}/api/studio/v1/task/stf/"
 
     data = {
         "agent": agent,
@@ -220,62 +324,47 @@ def stf_task(
         "webhook_url": webhook_url,
     }
 
-    try:
+    def post():
         with open(stf_input_audio, "rb") as f:
             files = {
                 "stf_input_audio": (os.path.basename(stf_input_audio), f, "audio/wav")
             }
-            response = requests.post(
-                url, headers=upload_headers, data=data, files=files, timeout=30
-            )
+            return client.post(url, data=data, files=files)
+
+    try:
+        request = {**data, "stf_input_audio": file_digest(stf_input_audio)}
+        task_id = submit_task("stf", "STF", request, post, journal)
     except FileNotFoundError:
         print(f"❌ Audio file not found: {stf_input_audio}")
         return None
-
-    data = response.json()
-    if response.status_code >= 400:
-        print(f"❌ STF request failed: {response.status_code}")
-        print(response.text)
+    if task_id is None:
         return None
 
-    print(f"⏳ STF task started (Task ID: {data['task_id']})")
-
-    while True:
-        time.sleep(5)
-        response = requests.get(
-            url + f"{data['task_id']}/", headers=headers, timeout=30
-        )
-        data = response.json()
-        print(f"⏳ STF task status: {data['status']}")
-
-        if data["status"] == "COMPLETED":
-            video_url = data["stf_output_video"]
-            print("✅ STF task completed!")
-            print(f"🎥 Output video: {video_url}")
-            return video_url
-        elif data["status"] == "FAILED":
-            print(f"❌ STF task failed: {data.get('failure_reason', 'Unknown error')}")
-            return None
+    data = wait_for_task(client, url, task_id, "STF", receiver, journal)
+    if data["status"] == "COMPLETED":
+        video_url = data["stf_output_video"]
+        print("✅ STF task completed!")
+        print(f"🎥 Output video: {video_url}")
+        return video_url
+    print(f"❌ STF task failed: {data.get('failure_reason', 'Unknown error')}")
+    return None
 
 
 def photo_avatar_task(
-    base_url: str,
-    headers: dict,
+    client: PersoSession,
     photo_avatar_input_image: str,
     photo_avatar_input_audio: str,
     agent: str = "1",
     webhook_url: str = None,
+    receiver: WebhookReceiver = None,
+    journal: JobJournal = None,
 ):
     """Perform Photo Avatar task."""
     print("🎭 Starting Photo Avatar task...")
     print(f"🖼️ Input image: {photo_avatar_input_image}")
     print(f"🎵 Input audio: {photo_avatar_input_audio}")
 
-    url = f"{base_url}/api/studio/v1/task/photoavatar/"
-
-    # Remove Content-Type header for multipart/form-data
-    upload_headers = headers.copy()
-    upload_headers.pop("Content-Type", None)
+    url = f"{client.base_url}/api/studio/v1/task/photoavatar/"
 
     data = {
         "agent": agent,
@@ -311,82 +400,47 @@ def photo_avatar_task(
         print(f"❌ {e}")
         return None
 
-    if files:
-        response = requests.post(
-            url, headers=upload_headers, data=data, files=files, timeout=30
-        )
-    else:
-        response = requests.post(url, headers=upload_headers, data=data, timeout=30)
-
-    data = response.json()
-    if response.status_code >= 400:
-        print(f"❌ Photo Avatar request failed: {response.status_code}")
-        print(response.text)
+    def post():
+        if files:
+            return client.post(url, data=data, files=files)
+        return client.post(url, data=data)
+
+    request = dict(data)
+    if "photoavatar_input_image" in files:
+        request["photoavatar_input_image"] = file_digest(photo_avatar_input_image)
+    if "photoavatar_input_audio" in files:
+        request["photoavatar_input_audio"] = file_digest(photo_avatar_input_audio)
+    task_id = submit_task("photoavatar", "Photo Avatar", request, post, journal)
+    if task_id is None:
         return None
 
-    print(f"⏳ Photo Avatar task started (Task ID: {data['task_id']})")
-
-    while True:
-        time.sleep(5)
-        response = requests.get(
-            url + f"{data['task_id']}/", headers=headers, timeout=30
-        )
-        data = response.json()
-        print(f"⏳ Photo Avatar task status: {data['status']}")
-
-        if data["status"] == "COMPLETED":
-            video_url = data["photoavatar_output_video"]
-            print("✅ Photo Avatar task completed!")
-            return video_url
-        elif data["status"] == "FAILED":
-            print(
-                f"❌ Photo Avatar task failed: {data.get('failure_reason', 'Unknown error')}"
-            )
-            return None
-
-
-def main():
-    # Parse command line arguments
-    args = parse_arguments()
-
-    # Set up API configuration
-    base_url = args.base_url
-    api_key = args.api_key or os.environ.get("EST_LIVE_API_KEY")
-
-    if not api_key:
-        print(
-            "❌ Error: API key is required. Provide it via --api-key argument or EST_LIVE_API_KEY environment variable."
-        )
-        return 1
-
-    headers = {
-        "Content-Type": "application/json",
-        "PersoLive-APIKey": api_key,
-    }
-
-    print("🤖 AI Studio API Client")
-    print(f"🔗 Base URL: {base_url}")
-    print("=" * 50)
-
-    # Check types mode (optional)
-    if args.check_types:
-        check_types(base_url, headers, args.check_types)
-        return 0
-
-    # TTS + STF workflow mode
-    if not args.tts_text:
-        print("❌ Error: --tts-text is required for TTS/STF workflow")
-        return 1
-
+    data = wait_for_task(client, url, task_id, "Photo Avatar", receiver, journal)
+    if data["status"] == "COMPLETED":
+        video_url = data["photoavatar_output_video"]
+        print("✅ Photo Avatar task completed!")
+        return video_url
+    print(f"❌ Photo Avatar task failed: {data.get('failure_reason', 'Unknown error')}")
+    return None
+
+
+def run_tasks(
+    args,
+    client: PersoSession,
+    webhook_url: str,
+    receiver: WebhookReceiver = None,
+    journal: JobJournal = None,
+) -> int:
+    """Run the TTS, STF and Photo Avatar tasks and return the exit code."""
     # TTS task
     audio_url = tts_task(
-        base_url=base_url,
-        headers=headers,
+        client=client,
         tts_text=args.tts_text,
         tts_type=args.tts_type,
         tts_audio_format=args.tts_audio_format,
         agent=args.agent,
-        webhook_url=args.webhook_url,
+        webhook_url=webhook_url,
+        receiver=receiver,
+        journal=journal,
     )
 
     if not audio_url:
@@ -403,12 +457,13 @@ def main():
     # STF task
     if not args.skip_stf:
         video_url = stf_task(
-            base_url=base_url,
-            headers=headers,
+            client=client,
             stf_input_audio=local_audio_path,
             stf_model_style=args.stf_model_style,
             agent=args.agent,
-            webhook_url=args.webhook_url,
+            webhook_url=webhook_url,
+            receiver=receiver,
+            journal=journal,
         )
 
         if not video_url:
@@ -427,12 +482,13 @@ def main():
             return 1
 
         video_url = photo_avatar_task(
-            base_url=base_url,
-            headers=headers,
+            client=client,
             photo_avatar_input_image=args.photo_avatar_input_image,
             photo_avatar_input_audio=audio_url,
             agent=args.agent,
-            webhook_url=args.webhook_url,
+            webhook_url=webhook_url,
+            receiver=receiver,
+            journal=journal,
         )
 
         if not video_url:
@@ -443,8 +499,67 @@ def main():
         print(f"🎥 Video URL: {video_url}")
 
     print("\n🎉 All tasks completed successfully!")
+    if receiver is not None:
+        stats = receiver.summary()
+        print(
+            f"📬 {stats['by_webhook']}/{stats['jobs']} tasks reported by webhook, "
+            f"{stats['by_poll']} found by the safety-net poll"
+        )
     return 0
 
 
+def main():
+    if sys.argv[1:2] == ["status"]:
+        return status_command(sys.argv[2:], "main.py")
+
+    # Parse command line arguments
+    args = parse_arguments()
+
+    # Set up API configuration
+    base_url = args.base_url
+    api_key = args.api_key or os.environ.get("EST_LIVE_API_KEY")
+
+    if not api_key:
+        print(
+            "❌ Error: API key is required. Provide it via --api-key argument or EST_LIVE_API_KEY environment variable."
+        )
+        return 1
+
+    client = get_session(base_url, api_key)
+
+    print("🤖 AI Studio API Client")
+    print(f"🔗 Base URL: {base_url}")
+    print("=" * 50)
+
+    # Check types mode (optional)
+    if args.check_types:
+        check_types(client, args.check_types)
+        return 0
+
+    # TTS + STF workflow mode
+    if not args.tts_text:
+        print("❌ Error: --tts-text is required for TTS/STF workflow")
+        return 1
+
+    # Webhook receiver (optional): tasks report completion instead of being polled
+    receiver = None
+    webhook_url = args.webhook_url
+    if args.webhook_port is not None:
+        receiver = WebhookReceiver(
+            "0.0.0.0", args.webhook_port, args.webhook_public_url
+        ).serve_in_thread()
+        webhook_url = receiver.url
+        print(f"📬 Receiving webhooks at {webhook_url}")
+
+    journal = JobJournal(args.journal) if args.journal else None
+    try:
+        return run_tasks(args, client, webhook_url, receiver, journal)
+    finally:
+        if receiver is not None:
+            receiver.close()
+        if journal:
+            journal.close()
+
+
 if __name__ == "__main__":
     exit(main())
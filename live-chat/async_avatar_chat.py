@@ -0,0 +1,416 @@
+# async_avatar_chat.py
+import asyncio
+import base64
+import os
+import wave
+from typing import AsyncIterator, Callable, Optional
+
+from audio_preprocess import NUMPY_AVAILABLE, prepare_for_stt
+from chat_history import ChatHistory, dumps_compact
+from llm_stream import TokenTimer, ToolCall, ToolCallAssembler, parse_llm_event
+from sse import SSEDecoder
+
+try:
+    import aiohttp
+
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    print("⚠️  aiohttp is not installed, AsyncAvatarChat is unavailable.")
+    print("   Install: pip install aiohttp")
+
+# One connection pool shared by every AsyncAvatarChat on the event loop
+_shared_http_session: Optional["aiohttp.ClientSession"] = None
+
+
+def get_shared_http_session(
+    limit: int = 100, timeout: float = 30
+) -> "aiohttp.ClientSession":
+    """Return the process-wide HTTP session, creating it on first use"""
+    global _shared_http_session
+
+    if not AIOHTTP_AVAILABLE:
+        raise Exception("aiohttp is not installed.")
+
+    if _shared_http_session is None or _shared_http_session.closed:
+        _shared_http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=limit, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(
+                total=None, sock_connect=10, sock_read=timeout
+            ),
+        )
+    return _shared_http_session
+
+
+async def close_shared_http_session():
+    """Close the process-wide HTTP session (call once on shutdown)"""
+    global _shared_http_session
+
+    if _shared_http_session is not None and not _shared_http_session.closed:
+        await _shared_http_session.close()
+    _shared_http_session = None
+
+
+class AsyncAvatarChat:
+    """asyncio-native counterpart of AvatarChat
+
+    Every instance shares one connection pool, so a single event loop can run
+    many concurrent conversations. Streaming LLM tokens and TTS chunks are
+    exposed as async iterators.
+    """
+
+    def __init__(
+        self,
+        api_server: str,
+        api_key: str,
+        llm_version: str = "v2",
+        http_session: Optional["aiohttp.ClientSession"] = None,
+        history: Optional[ChatHistory] = None,
+    ):
+        self.api_server = api_server.rstrip("/")
+        self.api_key = api_key
+        self.llm_version = llm_version  # "v1" or "v2"
+        self.session_id: Optional[str] = None
+        self.chat_history = history if history is not None else ChatHistory()
+        self.turn_payload_bytes: list[int] = []
+        self.llm_timings: list[dict] = []  # TokenTimer.summary() per LLM call
+        self.capability: list[str] = []
+        self.tools: list[str] = []
+        self.stt_workers = 4  # Concurrent requests for long, split audio
+        self._http_session = http_session
+
+    @property
+    def http(self) -> "aiohttp.ClientSession":
+        return self._http_session or get_shared_http_session()
+
+    async def create_session(
+        self,
+        llm_type: str,
+        tts_type: str,
+        model_style: str,
+        prompt: str,
+        document: Optional[str] = None,
+        capability: Optional[list[str]] = None,
+        stt_type: Optional[str] = None,
+        agent: Optional[str] = None,
+        mcp_servers: Optional[str] = None,
+        tools: Optional[list[str]] = None,
+        text_normalization_config: Optional[str] = None,
+        text_normalization_locale: Optional[str] = None,
+    ) -> Optional[str]:
+        """Create session for text and voice chat"""
+        data: dict = {
+            "llm_type": llm_type,
+            "tts_type": tts_type,
+            "model_style": model_style,
+            "prompt": prompt,
+        }
+
+        if document:
+            data["document"] = document
+        if capability:
+            data["capability"] = capability
+            self.capability = capability
+        if stt_type:
+            data["stt_type"] = stt_type
+        if agent:
+            data["agent"] = agent
+        if mcp_servers:
+            data["mcp_servers"] = mcp_servers
+        if tools:
+            self.tools = tools
+        if text_normalization_config:
+            data["text_normalization_config"] = text_normalization_config
+        if text_normalization_locale:
+            data["text_normalization_locale"] = text_normalization_locale
+
+        async with self.http.post(
+            f"{self.api_server}/api/v1/session/",
+            headers={"PersoLive-APIKey": self.api_key},
+            json=data,
+        ) as response:
+            if response.status != 201:
+                raise Exception(
+                    f"Session creation failed: {response.status} - {await response.text()}"
+                )
+            result = await response.json()
+
+        self.session_id = result["session_id"]
+        print(f"✅ Session created: {self.session_id}")
+        return self.session_id
+
+    async def start_session(self):
+        """Start session"""
+        if not self.session_id:
+            raise Exception("Session has not been created.")
+
+        async with self.http.post(
+            f"{self.api_server}/api/v1/session/{self.session_id}/event/create/",
+            json={"event": "SESSION_START", "detail": "Session started via Python"},
+        ) as response:
+            if response.status >= 400:
+                raise Exception(
+                    f"Session start failed: {response.status} - {await response.text()}"
+                )
+
+        print(f"✅ Session {self.session_id} has been started.")
+
+    async def chat_text_events(
+        self,
+        message: str,
+        on_tool_call: Optional[Callable[[ToolCall], Optional[str]]] = None,
+    ) -> AsyncIterator:
+        """Chat with AI using text, yielding typed events as they are parsed
+
+        Yields ContentDelta, ToolCall, ToolResult and StreamError events
+        (llm_stream.py). Each tool call is yielded once, complete, and passed
+        to on_tool_call (a local executor, run on the event loop) as soon as
+        it is; a string it returns becomes the call's result. In v2 mode the
+        assistant reply (or tool call messages) are appended to chat_history
+        once the stream has been fully consumed. Timings of the call are
+        appended to llm_timings.
+        """
+        if not self.session_id:
+            raise Exception("Session has not been started.")
+
+        if self.llm_version == "v1":
+            endpoint = f"{self.api_server}/api/v1/session/{self.session_id}/llm/"
+            body = dumps_compact({"message": message, "clear_history": False})
+        else:  # v2
+            self.chat_history.append({"role": "user", "content": message})
+            endpoint = f"{self.api_server}/api/v1/session/{self.session_id}/llm/v2/"
+            body = self.chat_history.build_payload(self.tools)
+        self.turn_payload_bytes.append(len(body))
+
+        timer = TokenTimer()
+        response_parts = []
+        tool_calls = ToolCallAssembler(on_tool_call)
+
+        async with self.http.post(
+            endpoint, data=body, headers={"Content-Type": "application/json"}
+        ) as response:
+            if response.status != 200:
+                raise Exception(
+                    f"LLM request failed: {response.status} - {await response.text()}"
+                )
+
+            async for data in _aiter_sse_events(response.content):
+                for event in parse_llm_event(data, tool_calls):
+                    if event.type == "content":
+                        timer.token()
+                        response_parts.append(event.text)
+                    yield event
+
+        for event in tool_calls.finish():
+            yield event
+
+        self.llm_timings.append(timer.summary())
+
+        if self.llm_version == "v2":
+            if tool_calls:
+                self.chat_history.extend(tool_calls.history())
+            elif response_parts:
+                self.chat_history.append(
+                    {"role": "assistant", "content": "".join(response_parts)}
+                )
+
+    async def chat_text_stream(self, message: str) -> AsyncIterator[str]:
+        """Chat with AI using text, yielding content tokens as they arrive"""
+        async for event in self.chat_text_events(message):
+            if event.type == "content":
+                yield event.text
+            elif event.type == "error":
+                print(f"❌ Error: {event.reason}")
+
+    async def chat_text(self, message: str) -> str:
+        """Chat with AI using text and return the full reply"""
+        return "".join([token async for token in self.chat_text_stream(message)])
+
+    async def generate_speech(
+        self, text: str, save_path: Optional[str] = None, streaming: bool = False
+    ) -> bytes:
+        """Convert text to speech"""
+        if not self.session_id:
+            raise Exception("Session has not been started.")
+
+        if streaming:
+            return await self.generate_speech_streaming(text, save_path)
+
+        async with self.http.post(
+            f"{self.api_server}/api/v1/session/{self.session_id}/tts/",
+            json={"text": text},
+        ) as response:
+            if response.status != 200:
+                raise Exception(
+                    f"TTS request failed: {response.status} - {await response.text()}"
+                )
+            result = await response.json()
+
+        audio_data = base64.b64decode(result["audio"])
+        if save_path:
+            await asyncio.to_thread(_write_file, save_path, audio_data)
+        return audio_data
+
+    async def generate_speech_streaming(
+        self, text: str, save_path: Optional[str] = None
+    ) -> bytes:
+        """Convert text to speech with streaming response"""
+        audio_data = b"".join(
+            [chunk async for chunk in self.generate_speech_streaming_iter(text)]
+        )
+        if save_path:
+            await asyncio.to_thread(_write_file, save_path, audio_data)
+        return audio_data
+
+    async def generate_speech_streaming_iter(self, text: str) -> AsyncIterator[bytes]:
+        """Convert text to speech, yielding audio chunks as they are received"""
+        if not self.session_id:
+            raise Exception("Session has not been started.")
+
+        async with self.http.post(
+            f"{self.api_server}/api/v1/session/{self.session_id}/streaming_tts/",
+            json={"text": text},
+        ) as response:
+            if response.status != 200:
+                raise Exception(
+                    f"TTS streaming request failed: {response.status} - {await response.text()}"
+                )
+            async for chunk in response.content.iter_chunked(4096):
+                yield chunk
+
+    async def recognize_speech(self, audio_file_path: str, language: str = "ko") -> str:
+        """Convert audio file to text"""
+        if not self.session_id:
+            raise Exception("Session has not been started.")
+
+        status = await self.get_session_status()
+        if status == "TERMINATED":
+            raise Exception("Session has been terminated. Please start a new session.")
+
+        audio_bytes = await asyncio.to_thread(_read_file, audio_file_path)
+        segments = [audio_bytes]
+        if NUMPY_AVAILABLE:
+            # 16 kHz mono, silence trimmed, split under the 30 s limit
+            try:
+                segments = await asyncio.to_thread(prepare_for_stt, audio_bytes)
+            except (wave.Error, EOFError, ValueError):
+                pass  # Not PCM WAV, let the server handle it
+        if not segments:
+            return ""  # Empty recording, nothing to send
+
+        # Recognize segments concurrently, at most stt_workers at a time
+        limit = asyncio.Semaphore(self.stt_workers)
+        filename = os.path.basename(audio_file_path)
+
+        async def recognize(segment: bytes) -> str:
+            async with limit:
+                return await self._recognize_segment(segment, filename, language)
+
+        texts = await asyncio.gather(*(recognize(segment) for segment in segments))
+        return " ".join(text.strip() for text in texts if text.strip())
+
+    async def _recognize_segment(
+        self, audio_bytes: bytes, filename: str, language: str
+    ) -> str:
+        form = aiohttp.FormData()
+        form.add_field(
+            "audio",
+            audio_bytes,
+            filename=filename,
+            content_type="audio/wav",
+        )
+        form.add_field("language", language)
+
+        async with self.http.post(
+            f"{self.api_server}/api/v1/session/{self.session_id}/stt/",
+            data=form,
+            headers={"User-Agent": "PersoLive-Python-Client/1.0"},
+        ) as response:
+            if response.status != 200:
+                raise Exception(
+                    f"STT request failed: {response.status} - {await response.text()}"
+                )
+            result = await response.json()
+
+        return result["text"]
+
+    async def end_session(self):
+        """End session"""
+        if not self.session_id:
+            return
+
+        async with self.http.post(
+            f"{self.api_server}/api/v1/session/{self.session_id}/event/create/",
+            json={"event": "SESSION_END", "detail": "Session ended via Python"},
+        ) as response:
+            if response.status == 201:
+                print(f"✅ Session {self.session_id} has been ended.")
+            else:
+                print(f"⚠️  Session end failed: {response.status}")
+
+        self.session_id = None
+
+    def get_chat_history(self):
+        """Return conversation history"""
+        return self.chat_history
+
+    async def get_session_status(self) -> str:
+        """Query session status"""
+        if not self.session_id:
+            raise Exception("Session has not been created.")
+
+        async with self.http.get(
+            f"{self.api_server}/api/v1/session/{self.session_id}/"
+        ) as response:
+            if response.status != 200:
+                raise Exception(
+                    f"Session status query failed: {response.status} - {await response.text()}"
+                )
+            result = await response.json()
+
+        return result.get("status", "UNKNOWN")
+
+    async def wait_for_session_ready(self, timeout: int = 30):
+        """Wait until session becomes IN_PROGRESS state"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            status = await self.get_session_status()
+            if status == "IN_PROGRESS":
+                return True
+            elif status == "TERMINATED":
+                raise Exception("Session has been terminated.")
+            await asyncio.sleep(1)
+
+        raise Exception(f"Session was not ready within {timeout} seconds.")
+
+    async def get_available_settings(self, setting_type: str) -> list[dict]:
+        """Get available settings (TTS types, model styles, etc.)"""
+        async with self.http.get(
+            f"{self.api_server}/api/v1/settings/{setting_type}/",
+            headers={"PersoLive-APIKey": self.api_key},
+        ) as response:
+            if response.status != 200:
+                raise Exception(
+                    f"Failed to get {setting_type}: {response.status} - {await response.text()}"
+                )
+            return await response.json()
+
+
+async def _aiter_sse_events(content) -> AsyncIterator[dict]:
+    decoder = SSEDecoder()
+    async for chunk in content.iter_any():
+        for event in decoder.feed(chunk):
+            yield event
+    for event in decoder.flush():
+        yield event
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write_file(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
@@ -0,0 +1,290 @@
+# audio_capture.py
+import abc
+import io
+import math
+import struct
+import threading
+import time
+import wave
+from typing import Callable, Iterator, Optional
+
+try:
+    import pyaudio
+
+    AUDIO_AVAILABLE = True
+except ImportError:
+    AUDIO_AVAILABLE = False
+
+FrameCallback = Callable[[bytes], None]
+
+
+class RingBuffer:
+    """Fixed-size byte ring buffer written by the audio callback thread
+
+    Memory is allocated once; when the buffer is full the oldest audio is
+    overwritten and counted in dropped_bytes.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.dropped_bytes = 0
+        self._buffer = bytearray(capacity)
+        self._written = 0  # Total bytes ever written
+        self._start = 0  # Total-byte offset of the oldest retained byte
+        self._read = 0  # Total-byte offset of the next read_new()
+        self._origin = 0  # Total-byte offset of the last clear()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._written - self._start
+
+    def write(self, data: bytes):
+        with self._lock:
+            if len(data) > self.capacity:
+                # Only the tail fits; the head counts as written and overwritten
+                self._written += len(data) - self.capacity
+                data = data[-self.capacity :]
+            position = self._written % self.capacity
+            first = min(len(data), self.capacity - position)
+            self._buffer[position : position + first] = data[:first]
+            self._buffer[: len(data) - first] = data[first:]
+            self._written += len(data)
+            if self._written - self._start > self.capacity:
+                self.dropped_bytes += self._written - self.capacity - self._start
+                self._start = self._written - self.capacity
+
+    def read_new(self) -> bytes:
+        """Bytes written since the previous read_new() call (or the clear)"""
+        with self._lock:
+            start = max(self._read, self._start)
+            self._read = self._written
+            return self._copy(start, self._written)
+
+    def getvalue(self, start: int = 0, end: Optional[int] = None) -> bytes:
+        """Retained bytes between offsets counted from the last clear()"""
+        with self._lock:
+            first = max(self._origin + start, self._start)
+            last = self._written if end is None else self._origin + end
+            return self._copy(first, max(first, min(last, self._written)))
+
+    def clear(self):
+        with self._lock:
+            self._start = self._read = self._origin = self._written
+
+    def _copy(self, start: int, end: int) -> bytes:
+        begin = start % self.capacity
+        length = end - start
+        if begin + length <= self.capacity:
+            return bytes(self._buffer[begin : begin + length])
+        return bytes(self._buffer[begin:]) + bytes(
+            self._buffer[: length - (self.capacity - begin)]
+        )
+
+
+class MicrophoneSource:
+    """Microphone input through pyaudio's callback mode"""
+
+    finite = False
+
+    def __init__(self, rate: int = 16000, channels: int = 1, chunk: int = 1024):
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = 2
+        self.chunk = chunk
+        self._audio = None
+        self._stream = None
+
+    def start(self, on_frames: FrameCallback):
+        def callback(in_data, frame_count, time_info, status):
+            on_frames(in_data)
+            return (None, pyaudio.paContinue)
+
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.rate,
+            input=True,
+            frames_per_buffer=self.chunk,
+            stream_callback=callback,
+        )
+        self._stream.start_stream()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return False  # Never ends on its own
+
+    def stop(self):
+        if self._stream:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio:
+            self._audio.terminate()
+            self._audio = None
+
+
+class _ThreadedSource(abc.ABC):
+    """Delivers chunks from a thread, optionally paced like a real device"""
+
+    finite = True
+
+    def __init__(
+        self, rate: int, channels: int, chunk: int = 1024, realtime: bool = True
+    ):
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = 2
+        self.chunk = chunk
+        self.realtime = realtime
+        self._stopped = threading.Event()
+        self._finished = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, on_frames: FrameCallback):
+        self._stopped.clear()
+        self._finished.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(on_frames,), daemon=True
+        )
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the source has delivered all of its audio"""
+        return self._finished.wait(timeout)
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, on_frames: FrameCallback):
+        chunk_seconds = self.chunk / self.rate
+        next_at = time.monotonic()
+        try:
+            for data in self._chunks():
+                if self._stopped.is_set():
+                    break
+                if self.realtime:
+                    next_at += chunk_seconds
+                    if self._stopped.wait(max(0.0, next_at - time.monotonic())):
+                        break
+                on_frames(data)
+        finally:
+            self._finished.set()
+
+    @abc.abstractmethod
+    def _chunks(self) -> Iterator[bytes]:
+        """PCM chunks of up to self.chunk frames, in order"""
+
+
+class WavFileSource(_ThreadedSource):
+    """Replays a 16-bit WAV file as if it came from a microphone"""
+
+    def __init__(self, path: str, chunk: int = 1024, realtime: bool = True):
+        with wave.open(path, "rb") as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError(f"Only 16-bit WAV files are supported: {path}")
+            rate, channels = wf.getframerate(), wf.getnchannels()
+        super().__init__(rate, channels, chunk, realtime)
+        self.path = path
+
+    def _chunks(self):
+        with wave.open(self.path, "rb") as wf:
+            while True:
+                data = wf.readframes(self.chunk)
+                if not data:
+                    break
+                yield data
+
+
+class SyntheticSource(_ThreadedSource):
+    """Generated test signal: silence, then a tone, then silence"""
+
+    def __init__(
+        self,
+        tone_seconds: float = 2.0,
+        silence_seconds: float = 0.5,
+        rate: int = 16000,
+        frequency: float = 440.0,
+        amplitude: float = 0.3,
+        chunk: int = 1024,
+        realtime: bool = True,
+    ):
+        super().__init__(rate, 1, chunk, realtime)
+        self.tone_seconds = tone_seconds
+        self.silence_seconds = silence_seconds
+        self.frequency = frequency
+        self.amplitude = amplitude
+
+    def _chunks(self):
+        silence = int(self.silence_seconds * self.rate)
+        tone = int(self.tone_seconds * self.rate)
+        total = 2 * silence + tone
+        peak = int(self.amplitude * 32767)
+        step = 2 * math.pi * self.frequency / self.rate
+        for start in range(0, total, self.chunk):
+            samples = [
+                (
+                    int(peak * math.sin(step * (i - silence)))
+                    if silence <= i < silence + tone
+                    else 0
+                )
+                for i in range(start, min(start + self.chunk, total))
+            ]
+            yield struct.pack(f"<{len(samples)}h", *samples)
+
+
+class AudioCapture:
+    """Capture audio from a source into a preallocated ring buffer
+
+    The source calls back with each block of frames; the callback only copies
+    into the ring buffer, so nothing is allocated per block and no Python
+    thread spins on a blocking read.
+    """
+
+    def __init__(self, source, max_seconds: float = 60.0):
+        self.source = source
+        frame_size = source.channels * source.sample_width
+        self.buffer = RingBuffer(int(max_seconds * source.rate) * frame_size)
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        frame_size = self.source.channels * self.source.sample_width
+        return len(self.buffer) / frame_size / self.source.rate
+
+    def start(self):
+        self.buffer.clear()
+        self.started_at = time.time()
+        self.stopped_at = None
+        self.source.start(self._on_frames)
+
+    def stop(self):
+        self.source.stop()
+        self.stopped_at = time.time()
+        if self.buffer.dropped_bytes:
+            print(
+                f"⚠️  Recording exceeded the buffer, "
+                f"{self.buffer.dropped_bytes} oldest bytes dropped"
+            )
+
+    def wav_bytes(self, start_frame: int = 0, end_frame: Optional[int] = None) -> bytes:
+        """Captured audio (optionally a range of frames) as an in-memory WAV file"""
+        frame_size = self.source.channels * self.source.sample_width
+        output = io.BytesIO()
+        with wave.open(output, "wb") as wf:
+            wf.setnchannels(self.source.channels)
+            wf.setsampwidth(self.source.sample_width)
+            wf.setframerate(self.source.rate)
+            wf.writeframes(
+                self.buffer.getvalue(
+                    start_frame * frame_size,
+                    None if end_frame is None else end_frame * frame_size,
+                )
+            )
+        return output.getvalue()
+
+    def _on_frames(self, data: bytes):
+        self.buffer.write(data)
@@ -0,0 +1,291 @@
+# audio_playback.py
+import queue
+import struct
+import threading
+import time
+from typing import Iterable, Optional
+
+try:
+    import pyaudio
+
+    AUDIO_AVAILABLE = True
+except ImportError:
+    AUDIO_AVAILABLE = False
+
+# (sample_rate, channels, sample_width) used when a stream has no WAV header
+DEFAULT_FORMAT = (16000, 1, 2)
+
+_END = object()  # End of utterance
+_FLUSHED = object()  # Everything queued before this marker has been discarded
+
+
+class WavStreamParser:
+    """Strip the WAV header from a chunked audio stream and return PCM frames
+
+    Streams that do not start with a RIFF header are treated as raw PCM in
+    the default format. PCM is returned in whole frames; a partial frame is
+    carried over to the next chunk.
+    """
+
+    def __init__(self, default_format: tuple[int, int, int] = DEFAULT_FORMAT):
+        self.format = default_format
+        self._buffer = bytearray()
+        self._in_data = False
+        self._carry = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self._in_data:
+            return self._frames(chunk)
+
+        self._buffer += chunk
+        if len(self._buffer) < 4:
+            return b""
+        if self._buffer[:4] != b"RIFF":
+            return self._start_data(0)
+        if len(self._buffer) < 12:
+            return b""
+
+        position = 12
+        while len(self._buffer) >= position + 8:
+            chunk_id = bytes(self._buffer[position : position + 4])
+            size = int.from_bytes(self._buffer[position + 4 : position + 8], "little")
+            if chunk_id == b"data":
+                # Streamed WAVs often carry a placeholder size, so read to the end
+                return self._start_data(position + 8)
+            if len(self._buffer) < position + 8 + size:
+                break
+            if chunk_id == b"fmt ":
+                channels, sample_rate = struct.unpack_from(
+                    "<HI", self._buffer, position + 10
+                )
+                bits = struct.unpack_from("<H", self._buffer, position + 22)[0]
+                self.format = (sample_rate, channels, bits // 8)
+            position += 8 + size + (size & 1)
+        return b""
+
+    def _start_data(self, offset: int) -> bytes:
+        self._in_data = True
+        data = bytes(self._buffer[offset:])
+        self._buffer.clear()
+        return self._frames(data)
+
+    def _frames(self, data: bytes) -> bytes:
+        _, channels, sample_width = self.format
+        frame_size = channels * sample_width
+        data = self._carry + data
+        usable = len(data) - len(data) % frame_size
+        self._carry = data[usable:]
+        return data[:usable]
+
+
+class PyAudioSink:
+    """Sound card output through pyaudio"""
+
+    def __init__(self):
+        self._audio = pyaudio.PyAudio()
+        self._stream = None
+        self._format = None
+
+    def open(self, audio_format: tuple[int, int, int]):
+        if self._stream and self._format == audio_format:
+            if self._stream.is_stopped():
+                self._stream.start_stream()
+            return
+        self._close_stream()
+        sample_rate, channels, sample_width = audio_format
+        self._stream = self._audio.open(
+            format=self._audio.get_format_from_width(sample_width),
+            channels=channels,
+            rate=sample_rate,
+            output=True,
+        )
+        self._format = audio_format
+
+    def write(self, pcm: bytes):
+        self._stream.write(pcm)
+
+    def abort(self):
+        try:
+            if self._stream and not self._stream.is_stopped():
+                self._stream.stop_stream()
+        except OSError:
+            pass
+
+    def close(self):
+        self._close_stream()
+        self._audio.terminate()
+
+    def _close_stream(self):
+        if self._stream:
+            self._stream.close()
+            self._stream = None
+
+
+class NullSink:
+    """Sink without sound hardware that records when audio would be heard
+
+    With realtime=True each write blocks for the duration of its audio, like
+    a sound card, so playback timing matches real devices. Used to measure
+    playback-start latency in CI.
+    """
+
+    def __init__(self, realtime: bool = True):
+        self.realtime = realtime
+        self.format: Optional[tuple[int, int, int]] = None
+        self.writes: list[tuple[float, int]] = []  # (time.time(), bytes)
+        self._aborted = threading.Event()
+
+    def open(self, audio_format: tuple[int, int, int]):
+        self.format = audio_format
+        self._aborted.clear()
+
+    def write(self, pcm: bytes):
+        self.writes.append((time.time(), len(pcm)))
+        if self.realtime:
+            sample_rate, channels, sample_width = self.format
+            self._aborted.wait(len(pcm) / (sample_rate * channels * sample_width))
+
+    def abort(self):
+        self._aborted.set()
+
+    def close(self):
+        pass
+
+
+class StreamingPlayer:
+    """In-process audio player fed with chunks as they arrive
+
+    A dedicated thread writes PCM to the sink. Playback of each utterance
+    starts once jitter_buffer_ms of audio is buffered (or the utterance has
+    ended), which absorbs network jitter without waiting for the whole file.
+    """
+
+    def __init__(
+        self,
+        sink=None,
+        jitter_buffer_ms: int = 80,
+        default_format: tuple[int, int, int] = DEFAULT_FORMAT,
+    ):
+        self.sink = sink if sink is not None else PyAudioSink()
+        self.jitter_buffer_ms = jitter_buffer_ms
+        self.default_format = default_format
+
+        # Timestamps (time.time()) of the current utterance
+        self.first_chunk_at: Optional[float] = None
+        self.playback_started_at: Optional[float] = None
+        self.played_bytes = 0  # PCM handed to the sink for the current utterance
+
+        self._queue: queue.Queue = queue.Queue()
+        self._parser: Optional[WavStreamParser] = None
+        self._outstanding = 0  # Utterances queued but not yet played out
+        self._idle = threading.Condition()
+        self._flushing = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def feed(self, chunk: bytes):
+        """Queue an audio chunk (WAV or raw PCM) of the current utterance"""
+        if self._parser is None:
+            self._parser = WavStreamParser(self.default_format)
+            self.first_chunk_at = time.time()
+            self.playback_started_at = None
+            self.played_bytes = 0
+            with self._idle:
+                self._outstanding += 1
+
+        pcm = self._parser.feed(chunk)
+        if pcm:
+            self._queue.put((self._parser.format, pcm))
+
+    def end_utterance(self):
+        """Mark the end of the current utterance; the next chunk starts a new one"""
+        if self._parser is not None:
+            self._parser = None
+            self._queue.put(_END)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every ended utterance has been played"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def play(self, chunks: Iterable[bytes]) -> Optional[float]:
+        """Play one utterance and return its playback-start latency in seconds"""
+        try:
+            for chunk in chunks:
+                self.feed(chunk)
+        finally:
+            self.end_utterance()
+        self.wait()
+        return self.start_latency
+
+    @property
+    def start_latency(self) -> Optional[float]:
+        if self.first_chunk_at is None or self.playback_started_at is None:
+            return None
+        return self.playback_started_at - self.first_chunk_at
+
+    def stop(self):
+        """Stop playback immediately and discard all buffered audio"""
+        self._flushing.set()
+        self.end_utterance()
+        self._queue.put(_FLUSHED)
+        self.sink.abort()
+
+    def close(self):
+        self.stop()
+        self._queue.put(None)
+        self._thread.join(timeout=2)
+        self.sink.close()
+
+    def _run(self):
+        pending: list[bytes] = []
+        pending_bytes = 0
+        playing = False
+        current_format = None
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            if item is _FLUSHED:
+                self._flushing.clear()
+                pending, pending_bytes, playing = [], 0, False
+                continue
+
+            if item is _END:
+                if pending and not self._flushing.is_set():
+                    self._write(current_format, pending)
+                pending, pending_bytes, playing = [], 0, False
+                with self._idle:
+                    self._outstanding -= 1
+                    self._idle.notify_all()
+                continue
+
+            if self._flushing.is_set():
+                continue
+
+            current_format, pcm = item
+            if playing:
+                self._write(current_format, [pcm])
+                continue
+
+            pending.append(pcm)
+            pending_bytes += len(pcm)
+            sample_rate, channels, sample_width = current_format
+            jitter_bytes = (
+                sample_rate * channels * sample_width * self.jitter_buffer_ms // 1000
+            )
+            if pending_bytes >= jitter_bytes:
+                self._write(current_format, pending)
+                pending, pending_bytes, playing = [], 0, True
+
+    def _write(self, audio_format: tuple[int, int, int], chunks: list[bytes]):
+        if self.playback_started_at is None:
+            self.sink.open(audio_format)
+            self.playback_started_at = time.time()
+        for pcm in chunks:
+            if self._flushing.is_set():
+                return
+            self.sink.write(pcm)
+            self.played_bytes += len(pcm)
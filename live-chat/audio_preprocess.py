@@ -0,0 +1,135 @@
+# audio_preprocess.py
+import io
+import wave
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+STT_SAMPLE_RATE = 16000
+MAX_SEGMENT_SECONDS = 28.0  # Stay under the 30 s STT limit
+FRAME_MS = 20
+
+
+def load_wav(data: bytes):
+    """Decode PCM WAV bytes into mono float32 samples in [-1, 1] and the rate"""
+    with wave.open(io.BytesIO(data), "rb") as wf:
+        channels = wf.getnchannels()
+        sample_width = wf.getsampwidth()
+        rate = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif sample_width == 3:
+        padded = np.zeros((len(raw) // 3, 4), dtype=np.uint8)
+        padded[:, 1:] = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        samples = padded.view("<i4").ravel().astype(np.float32) / 2**31
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2**31
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels]
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def resample(samples, rate: int, target_rate: int = STT_SAMPLE_RATE):
+    """Linear-interpolation resampler with a box low-pass when downsampling"""
+    if rate == target_rate or len(samples) == 0:
+        return samples
+    ratio = rate / target_rate
+    if ratio > 1:
+        width = int(np.ceil(ratio))
+        samples = np.convolve(samples, np.ones(width) / width, mode="same")
+    count = int(len(samples) / ratio)
+    positions = np.arange(count) * ratio
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def frame_energy_db(samples, rate: int):
+    """Energy in dBFS of each FRAME_MS frame"""
+    frame = rate * FRAME_MS // 1000
+    count = len(samples) // frame
+    frames = samples[: count * frame].reshape(count, frame)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    return 20 * np.log10(rms + 1e-10)
+
+
+def trim_silence(samples, rate: int, threshold_db: float = -45.0, margin_ms: int = 200):
+    """Cut leading and trailing silence, keeping margin_ms around the speech
+
+    Audio without any frame above the threshold is returned unchanged.
+    """
+    frame = rate * FRAME_MS // 1000
+    voiced = np.flatnonzero(frame_energy_db(samples, rate) > threshold_db)
+    if len(voiced) == 0:
+        return samples
+    margin = rate * margin_ms // 1000
+    start = max(0, voiced[0] * frame - margin)
+    end = min(len(samples), (voiced[-1] + 1) * frame + margin)
+    return samples[start:end]
+
+
+def split_on_silence(
+    samples,
+    rate: int,
+    max_seconds: float = MAX_SEGMENT_SECONDS,
+    threshold_db: float = -45.0,
+) -> list:
+    """Split audio into segments shorter than max_seconds at quiet points
+
+    Each cut is placed at the quietest frame in the last third of the allowed
+    window, so it falls between words whenever there is a pause; a hard cut
+    is only needed when the window has no frame below the threshold.
+    """
+    frame = rate * FRAME_MS // 1000
+    max_frames = int(max_seconds * 1000 / FRAME_MS)
+    energy = frame_energy_db(samples, rate)
+
+    segments = []
+    start = 0
+    while len(energy) - start > max_frames:
+        window = energy[start + max_frames * 2 // 3 : start + max_frames]
+        quietest = int(np.argmin(window))
+        if window[quietest] < threshold_db:
+            cut = start + max_frames * 2 // 3 + quietest
+        else:
+            cut = start + max_frames
+        segments.append(samples[start * frame : cut * frame])
+        start = cut
+    segments.append(samples[start * frame :])
+    return [segment for segment in segments if len(segment)]
+
+
+def to_wav_bytes(samples, rate: int = STT_SAMPLE_RATE) -> bytes:
+    pcm = np.clip(samples * 32768, -32768, 32767).astype("<i2")
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm.tobytes())
+    return output.getvalue()
+
+
+def prepare_for_stt(
+    data: bytes, max_seconds: float = MAX_SEGMENT_SECONDS
+) -> list[bytes]:
+    """Convert WAV bytes to 16 kHz mono, trim silence and split long audio
+
+    Returns the WAV segments to recognize, in order; the list is empty when
+    the audio has no samples.
+    """
+    samples, rate = load_wav(data)
+    samples = resample(samples, rate)
+    samples = trim_silence(samples, STT_SAMPLE_RATE)
+    segments = split_on_silence(samples, STT_SAMPLE_RATE, max_seconds)
+    return [to_wav_bytes(segment) for segment in segments]
@@ -0,0 +1,129 @@
+# audio_stream.py
+import base64
+from typing import Callable, Optional
+
+# Audio written through to a file/sink is still cached when it is at most this
+# large; longer utterances are not buffered, so peak memory stays flat
+CACHE_WRITE_THROUGH_LIMIT = 1024 * 1024
+
+JSON_WHITESPACE = b" \t\r\n"
+
+
+class Base64FieldDecoder:
+    """Incrementally decode a base64 string field from a streamed JSON body
+
+    Feeds on raw response chunks, finds the field (e.g. "audio" in the /tts/
+    response) and decodes its value in 4-character blocks, so neither the
+    JSON document nor the decoded audio is ever held in memory as a whole.
+    """
+
+    def __init__(self, field: str = "audio"):
+        self._key = b'"' + field.encode("utf-8") + b'"'
+        self._state = "key"  # key -> colon -> value -> done
+        self._pending = bytearray()  # Scan buffer, then undecoded base64 tail
+        self._carry = b""  # Escape sequence split across chunks
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Add a response chunk and return the audio bytes it completed"""
+        data = chunk
+
+        if self._state == "key":
+            self._pending += data
+            index = self._pending.find(self._key)
+            if index < 0:
+                del self._pending[: max(0, len(self._pending) - len(self._key) + 1)]
+                return b""
+            data = bytes(self._pending[index + len(self._key) :])
+            self._pending.clear()
+            self._state = "colon"
+
+        if self._state == "colon":
+            data = data.lstrip(JSON_WHITESPACE + b":")
+            if not data:
+                return b""
+            if data[:1] != b'"':
+                raise ValueError("Audio field is not a string")
+            data = data[1:]
+            self._state = "value"
+
+        if self._state != "value":
+            return b""
+
+        end = data.find(b'"')
+        value = self._carry + (data if end < 0 else data[:end])
+        self._carry = b""
+        if value.endswith(b"\\"):
+            self._carry, value = b"\\", value[:-1]
+        if b"\\" in value:
+            # JSON encoders may escape "/" and wrap long strings
+            value = (
+                value.replace(b"\\/", b"/").replace(b"\\n", b"").replace(b"\\r", b"")
+            )
+        self._pending += value
+
+        if end >= 0:
+            self._state = "done"
+            audio = base64.b64decode(bytes(self._pending))
+            self._pending.clear()
+            return audio
+
+        usable = len(self._pending) - len(self._pending) % 4
+        audio = base64.b64decode(bytes(self._pending[:usable]))
+        del self._pending[:usable]
+        return audio
+
+
+class AudioWriter:
+    """Write audio chunks to a file and/or sink as they arrive
+
+    Optionally keeps a copy for the TTS cache until the audio grows past
+    CACHE_WRITE_THROUGH_LIMIT.
+    """
+
+    def __init__(
+        self,
+        save_path: Optional[str] = None,
+        sink: Optional[Callable[[bytes], None]] = None,
+        keep_for_cache: bool = False,
+    ):
+        self.save_path = save_path
+        self.sink = sink
+        self.bytes_written = 0
+        self._file = open(save_path, "wb") if save_path else None
+        self._cache_buffer: Optional[bytearray] = (
+            bytearray() if keep_for_cache else None
+        )
+
+    def write(self, chunk: bytes):
+        if not chunk:
+            return
+        if self._file:
+            self._file.write(chunk)
+        if self.sink:
+            self.sink(chunk)
+        self.bytes_written += len(chunk)
+
+        if self._cache_buffer is not None:
+            if len(self._cache_buffer) + len(chunk) > CACHE_WRITE_THROUGH_LIMIT:
+                self._cache_buffer = None  # Too long to cache
+            else:
+                self._cache_buffer += chunk
+
+    def cached_audio(self) -> Optional[bytes]:
+        """Complete audio if it was small enough to keep, else None"""
+        return bytes(self._cache_buffer) if self._cache_buffer is not None else None
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,13 +1,37 @@
 # avatar_chat.py
 import base64
-import json
+import io
 import os
+import sys
 import threading
 import time
 import wave
-from typing import Optional
-
-import requests
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator, Optional, Union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_capture import AudioCapture, MicrophoneSource  # noqa: E402
+from audio_playback import StreamingPlayer  # noqa: E402
+from audio_preprocess import NUMPY_AVAILABLE, prepare_for_stt  # noqa: E402
+from audio_stream import AudioWriter, Base64FieldDecoder  # noqa: E402
+from barge_in import BargeInMonitor, TurnInterrupted  # noqa: E402
+from chat_history import ChatHistory, dumps_compact, estimate_text_tokens  # noqa: E402
+from llm_stream import (  # noqa: E402
+    TokenTimer,
+    ToolCall,
+    ToolCallAssembler,
+    format_token_timings,
+    parse_llm_event,
+)
+from persolive_common.http_client import get_session  # noqa: E402
+from phrasebook import PhrasebookWarmup  # noqa: E402
+from session_state import ALIVE_STATUS, SessionState  # noqa: E402
+from session_store import SessionStore, normalize_config  # noqa: E402
+from sse import iter_event_batches  # noqa: E402
+from tts_cache import TTSCache, tts_cache_key  # noqa: E402
+from vad import VoiceActivityDetector  # noqa: E402
+from voice_pipeline import PipelinedSpeaker  # noqa: E402
 
 try:
     import pyaudio
@@ -20,14 +44,43 @@ except ImportError:
 
 
 class AvatarChat:
-    def __init__(self, api_server: str, api_key: str, llm_version: str = "v2"):
+    def __init__(
+        self,
+        api_server: str,
+        api_key: str,
+        llm_version: str = "v2",
+        history: Optional[ChatHistory] = None,
+        tts_cache: Optional[TTSCache] = None,
+        phrases: Optional[list[str]] = None,
+        player: Optional[StreamingPlayer] = None,
+        in_process_playback: bool = True,
+        jitter_buffer_ms: int = 80,
+    ):
         self.api_server = api_server.rstrip("/")
         self.api_key = api_key
         self.llm_version = llm_version  # "v1" or "v2"
         self.session_id: Optional[str] = None
-        self.chat_history: list[dict[str, str]] = []
+        # v2 history with optional token/byte budget (unbounded by default)
+        self.chat_history = history if history is not None else ChatHistory()
+        self.turn_payload_bytes: list[int] = []  # LLM request size per turn
+        self.llm_timings: list[dict] = []  # TokenTimer.summary() per LLM call
+        self.tts_cache = tts_cache  # May be shared by several AvatarChat instances
+        # Expected phrases pre-synthesized right after start_session
+        self.phrases: list[str] = phrases or []
+        self.phrasebook: Optional[PhrasebookWarmup] = None
+
+        # TTS settings of the current session (part of the TTS cache key)
+        self.tts_type: Optional[str] = None
+        self.text_normalization_config: Optional[str] = None
+        self.text_normalization_locale: Optional[str] = None
+        # Cached session status; API responses count as liveness signals
+        self.session_state: Optional[SessionState] = None
+        # Refresh the status from a thread while idle instead of on first use
+        # after the lease expires (one polling thread per session)
+        self.background_status_refresh = False
         self.capability: list[str] = []  # Store capability information
         self.tools: list[str] = []
+        self.http = get_session(self.api_server, api_key)  # Shared keep-alive pool
 
         # Audio settings
         self.audio_format = pyaudio.paInt16 if AUDIO_AVAILABLE else None
@@ -35,7 +88,25 @@ class AvatarChat:
         self.rate = 16000
         self.chunk = 1024
         self.is_recording = False
-        self.audio_frames: list[bytes] = []
+        self.max_recording_seconds = 120  # Ring buffer size
+        # Capture source used instead of the microphone (e.g. WavFileSource)
+        self.capture_source = None
+        # Hands-free endpointing
+        self.trailing_silence_ms = 700
+        self.vad_threshold_db = -40.0
+        self.no_speech_timeout = 10.0
+        self.stt_workers = 4  # Concurrent requests for long, split audio
+        self.endpointing_delay: Optional[float] = None  # Of the last hands-free turn
+
+        # Barge-in: set while the user interrupts the current turn
+        self.interrupted = threading.Event()
+        self.barge_in_source = None  # Capture source used instead of the microphone
+        self.barge_in_threshold_db = -30.0
+
+        # In-process playback (pyaudio); falls back to the OS players without it
+        self.player = player
+        self.in_process_playback = in_process_playback or player is not None
+        self.jitter_buffer_ms = jitter_buffer_ms
 
     def create_session(
         self,
@@ -80,18 +151,17 @@ class AvatarChat:
         if text_normalization_locale:
             data["text_normalization_locale"] = text_normalization_locale
 
-        response = requests.post(
+        response = self.http.post(
             f"{self.api_server}/api/v1/session/",
-            headers={
-                "PersoLive-APIKey": self.api_key,
-                "Content-Type": "application/json",
-            },
             json=data,
         )
 
         if response.status_code == 201:
             result = response.json()
             self.session_id = result["session_id"]
+            self.tts_type = tts_type
+            self.text_normalization_config = text_normalization_config
+            self.text_normalization_locale = text_normalization_locale
             print(f"✅ Session created: {self.session_id}")
             return self.session_id
         else:
@@ -107,9 +177,8 @@ class AvatarChat:
         print("🚀 Starting session...")
 
         # Send session start event
-        response = requests.post(
+        response = self.http.post(
             f"{self.api_server}/api/v1/session/{self.session_id}/event/create/",
-            headers={"Content-Type": "application/json"},
             json={"event": "SESSION_START", "detail": "Session started via Python"},
         )
 
@@ -119,129 +188,258 @@ class AvatarChat:
             )
         else:
             print("✅ Session has been started.")
+        if self.background_status_refresh:
+            self._session_state().start_refresh()
+
+        if self.phrases:
+            self.start_phrasebook_warmup()
+
+    def open_session(self, store: Optional[SessionStore] = None, **session_kwargs):
+        """Create and start a session, or reattach to the one saved in store
+
+        With a store, the new session and every history change are recorded
+        in its state file so a restarted process can resume the conversation.
+        """
+        if store is not None and self.resume_session(store, **session_kwargs):
+            return
+
+        self.create_session(**session_kwargs)
+        self.start_session()
+        if store is not None:
+            store.start(
+                self.session_id, normalize_config(session_kwargs), self.llm_version
+            )
+            self.chat_history.log = store
+
+    def resume_session(self, store: SessionStore, **session_kwargs) -> bool:
+        """Reattach to the saved session if it is still IN_PROGRESS
+
+        Restores the chat history from the state file and skips creating and
+        starting a session. Returns False if there is nothing to resume.
+        """
+        state = store.load()
+        if state is None:
+            return False
+
+        session_id = state["session_id"]
+        config = normalize_config(session_kwargs)
+        if state["config"] != config or state["llm_version"] != self.llm_version:
+            print(f"ℹ️  Saved session {session_id} has another configuration.")
+            return False
+        try:
+            status = self._query_session_status(session_id)
+        except Exception as e:
+            print(f"⚠️  Could not check saved session {session_id}: {e}")
+            return False
+        if status != ALIVE_STATUS:
+            print(f"ℹ️  Saved session {session_id} is {status}, creating a new one.")
+            return False
+
+        self.session_id = session_id
+        self.tts_type = config["tts_type"]
+        self.text_normalization_config = config.get("text_normalization_config")
+        self.text_normalization_locale = config.get("text_normalization_locale")
+        self.capability = config.get("capability") or []
+        self.tools = config.get("tools") or []
+        self.chat_history.extend(state["messages"])
+
+        # Rewrite the log compactly, then keep appending to it
+        store.start(session_id, config, self.llm_version, self.chat_history.messages)
+        self.chat_history.log = store
+
+        self._session_state().update(status)
+        if self.background_status_refresh:
+            self._session_state().start_refresh()
+        print(
+            f"♻️  Reattached to session {session_id} "
+            f"({len(state['messages'])} messages restored)"
+        )
+        if self.phrases:
+            self.start_phrasebook_warmup()
+        return True
+
+    def open_session_in_background(
+        self,
+        prewarm_connections: int = 2,
+        store: Optional[SessionStore] = None,
+        **session_kwargs,
+    ) -> Future:
+        """Create and start (or resume, see open_session) a session on a background thread
+
+        Extra keep-alive connections are opened at the same time (DNS and
+        TLS), so the first STT/LLM/TTS requests after the session is ready
+        skip the handshakes. Returns a Future of the time.time() at which the
+        session was ready; result() re-raises a creation failure.
+        """
+
+        def open_session() -> float:
+            warmup = threading.Thread(
+                target=self.http.prewarm, args=(prewarm_connections,), daemon=True
+            )
+            warmup.start()
+            self.open_session(store, **session_kwargs)
+            return time.time()
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(open_session)
+        executor.shutdown(wait=False)
+        return future
 
-    def chat_text(self, message: str) -> str:
-        """Chat with AI using text"""
+    def start_phrasebook_warmup(self):
+        """Synthesize the expected phrases in the background
+
+        Returns immediately; generate_speech serves phrases from memory once
+        they are ready and falls back to the TTS endpoint until then.
+        """
+        self.cancel_phrasebook_warmup()
+        self.phrasebook = PhrasebookWarmup(self, self.phrases)
+        self.phrasebook.start()
+        print(f"🔥 Warming up {len(self.phrasebook.phrases)} phrases in the background")
+
+    def cancel_phrasebook_warmup(self):
+        """Stop an in-progress phrasebook warmup"""
+        if self.phrasebook:
+            self.phrasebook.cancel()
+
+    def chat_text(
+        self,
+        message: str,
+        on_content: Optional[Callable[[str], None]] = None,
+        on_tool_call: Optional[Callable[[ToolCall], Optional[str]]] = None,
+    ) -> str:
+        """Chat with AI using text
+
+        Prints the reply as it streams in and returns it once complete. Use
+        chat_text_events to consume the stream without console output.
+
+        Args:
+            message: User message
+            on_content: Optional callback invoked with each content delta as it streams in
+            on_tool_call: Optional local tool executor, see chat_text_events
+        """
         if not self.session_id:
             raise Exception("Session has not been started.")
 
         print(f"👤 You: {message}")
 
+        endpoint, body = self._prepare_llm_request(message)
+        if self.llm_version == "v1":
+            print(f"📦 Request payload: {len(body)} bytes")
+        else:
+            window_size = len(self.chat_history) - self.chat_history.window_start
+            print(
+                f"📦 Request payload: {len(body)} bytes ({window_size} messages in "
+                f"window, {self.chat_history.evicted_count} evicted)"
+            )
+
+        print("🤖 AI: ", end="", flush=True)
+        response_parts: list[str] = []
+        for events in self._llm_event_batches(endpoint, body, on_tool_call):
+            for event in events:
+                if event.type == "content":
+                    sys.stdout.write(event.text)
+                    response_parts.append(event.text)
+                    if on_content:
+                        on_content(event.text)
+                elif event.type == "error":
+                    print(f"❌ Error: {event.reason}")
+            sys.stdout.flush()  # Once per network chunk instead of per token
+        if self.interrupted.is_set():
+            print(" ✋", end="")
+        print()  # New line
+        print(format_token_timings(self.llm_timings[-1]))
+
+        return "".join(response_parts)
+
+    def chat_text_events(
+        self,
+        message: str,
+        on_tool_call: Optional[Callable[[ToolCall], Optional[str]]] = None,
+    ) -> Iterator:
+        """Chat with AI using text, yielding typed events as they are parsed
+
+        Yields ContentDelta, ToolCall, ToolResult and StreamError events
+        (llm_stream.py) without printing anything. Each tool call is yielded
+        once, complete, and passed to on_tool_call as soon as it is; a string
+        it returns becomes the call's result in the history. In v2 mode the
+        reply is added to chat_history once the stream ends. Timings of the
+        call are appended to llm_timings.
+        """
+        if not self.session_id:
+            raise Exception("Session has not been started.")
+
+        endpoint, body = self._prepare_llm_request(message)
+        for events in self._llm_event_batches(endpoint, body, on_tool_call):
+            yield from events
+
+    def _prepare_llm_request(self, message: str) -> tuple[str, bytes]:
         # LLM API 버전에 따른 분기
         if self.llm_version == "v1":
             # v1: 서버에서 히스토리 관리, 클라이언트는 히스토리에 추가하지 않음
             endpoint = f"{self.api_server}/api/v1/session/{self.session_id}/llm/"
-            request_data = {"message": message, "clear_history": False}
+            body = dumps_compact({"message": message, "clear_history": False})
         else:  # v2
-            # v2: 클라이언트에서 히스토리 관리
+            # v2: 클라이언트에서 히스토리 관리 (token/byte budget window)
             self.chat_history.append({"role": "user", "content": message})
             endpoint = f"{self.api_server}/api/v1/session/{self.session_id}/llm/v2/"
-            request_data = {
-                "messages": self.chat_history,
-                "tools": self.tools,
-            }
+            body = self.chat_history.build_payload(self.tools)
+        self.turn_payload_bytes.append(len(body))
+        return endpoint, body
 
-        response = requests.post(
+    def _llm_event_batches(
+        self,
+        endpoint: str,
+        body: bytes,
+        on_tool_call: Optional[Callable[[ToolCall], Optional[str]]] = None,
+    ) -> Iterator[list]:
+        """Stream the LLM reply, yielding the events of each network chunk"""
+        timer = TokenTimer()
+        response = self.http.post(
             endpoint,
+            data=body,
             headers={"Content-Type": "application/json"},
-            json=request_data,
             stream=True,
         )
+        self._observe_response(response)
 
-        if response.status_code == 200:
-            print("🤖 AI: ", end="", flush=True)
-            ai_response = ""
-            collected_tool_calls = []
-            collected_tool_messages = []
-            has_tool_calls = False
-
-            # Process streaming response
-            for line in response.iter_lines():
-                if line:
-                    line_str = line.decode("utf-8")
-                    if line_str.startswith("data: "):
-                        try:
-                            data = json.loads(line_str[6:])
-                            if data.get("status") == "success":
-                                content = data.get("content", "")
-                                if content:
-                                    print(content, end="", flush=True)
-                                    ai_response += content
-
-                                # tool_calls 수집
-                                if data.get("tool_calls"):
-                                    has_tool_calls = True
-                                    collected_tool_calls.extend(
-                                        data.get("tool_calls", [])
-                                    )
-
-                                # tool 메시지 수집
-                                if data.get("tool_call_id"):
-                                    tool_message = {
-                                        "role": "tool",
-                                        "content": data.get("content", ""),
-                                        "tool_call_id": data.get("tool_call_id"),
-                                    }
-                                    collected_tool_messages.append(tool_message)
-                            else:
-                                print(
-                                    f"❌ Error: {data.get('reason', 'Unknown error')}"
-                                )
-                        except json.JSONDecodeError:
-                            continue
-
-            # v2에서만 chat_history 관리
-            if self.llm_version == "v2":
-                new_history = []
-                if has_tool_calls and collected_tool_calls:
-                    # Assistant 메시지 추가
-                    assistant_message = {
-                        "role": "assistant",
-                        "tool_calls": collected_tool_calls,
-                    }
-                    new_history.append(assistant_message)
-
-                    # 누락된 tool message 보완
-                    tool_call_ids = {tc.get("id") for tc in collected_tool_calls}
-                    tool_message_ids = {
-                        tm.get("tool_call_id") for tm in collected_tool_messages
-                    }
-
-                    for missing_id in tool_call_ids - tool_message_ids:
-                        collected_tool_messages.append(
-                            {
-                                "role": "tool",
-                                "content": "Tool execution completed",
-                                "tool_call_id": missing_id,
-                            }
-                        )
-
-                    # Tool 메시지들을 순서대로 추가
-                    tool_call_id_order = [tc.get("id") for tc in collected_tool_calls]
-                    for tool_call_id in tool_call_id_order:
-                        for tool_message in collected_tool_messages:
-                            if tool_message.get("tool_call_id") == tool_call_id:
-                                new_history.append(tool_message)
-                                break
-
-                elif ai_response and not has_tool_calls:
-                    # 일반 Assistant 메시지 추가
-                    self.chat_history.append(
-                        {"role": "assistant", "content": ai_response}
-                    )
-
-                if new_history:
-                    print(new_history)
-                    self.chat_history.extend(new_history)
-
-            print()  # New line
-
-            return ai_response
-        else:
+        if response.status_code != 200:
             raise Exception(
                 f"LLM request failed: {response.status_code} - {response.text}"
             )
 
+        response_parts: list[str] = []
+        tool_calls = ToolCallAssembler(on_tool_call)
+
+        with response:
+            # Process streaming response as raw chunks arrive
+            for batch in iter_event_batches(response.iter_content(chunk_size=None)):
+                if self.interrupted.is_set():
+                    break  # Closing the response stops generating the rest
+                events = []
+                for data in batch:
+                    for event in parse_llm_event(data, tool_calls):
+                        if event.type == "content":
+                            timer.token()
+                            response_parts.append(event.text)
+                        events.append(event)
+                if events:
+                    yield events
+
+        events = tool_calls.finish()
+        if events:
+            yield events
+
+        self.llm_timings.append(timer.summary())
+
+        # v2에서만 chat_history 관리
+        if self.llm_version == "v2":
+            ai_response = "".join(response_parts)
+            if tool_calls:
+                self.chat_history.extend(tool_calls.history())
+            elif ai_response:
+                # 일반 Assistant 메시지 추가
+                self.chat_history.append({"role": "assistant", "content": ai_response})
+
     def generate_speech(
         self, text: str, save_path: Optional[str] = None, streaming: bool = False
     ) -> bytes:
@@ -260,21 +458,39 @@ class AvatarChat:
         if streaming:
             return self.generate_speech_streaming(text, save_path)
 
-        response = requests.post(
+        audio_data = self.phrasebook.get(text) if self.phrasebook else None
+        if audio_data is None:
+            audio_data = self.synthesize_speech(text)
+
+        if save_path:
+            with open(save_path, "wb") as f:
+                f.write(audio_data)
+            print(f"💾 Audio file saved: {save_path}")
+
+        return audio_data
+
+    def synthesize_speech(self, text: str) -> bytes:
+        """Synthesize text with the TTS endpoint (TTS cache aware, no console output)"""
+        if not self.session_id:
+            raise Exception("Session has not been started.")
+
+        cache_key = self._tts_cache_key("tts", text)
+        if self.tts_cache:
+            audio_data = self.tts_cache.get(cache_key)
+            if audio_data is not None:
+                return audio_data
+
+        response = self.http.post(
             f"{self.api_server}/api/v1/session/{self.session_id}/tts/",
-            headers={"Content-Type": "application/json"},
             json={"text": text},
         )
+        self._observe_response(response)
 
         if response.status_code == 200:
             result = response.json()
             audio_data = base64.b64decode(result["audio"])
-
-            if save_path:
-                with open(save_path, "wb") as f:
-                    f.write(audio_data)
-                print(f"💾 Audio file saved: {save_path}")
-
+            if self.tts_cache:
+                self.tts_cache.put(cache_key, audio_data)
             return audio_data
         else:
             raise Exception(
@@ -284,86 +500,171 @@ class AvatarChat:
     def generate_speech_streaming(
         self, text: str, save_path: Optional[str] = None
     ) -> bytes:
-        """Convert text to speech with streaming response"""
+        """Convert text to speech with streaming response
+
+        Chunks are written to save_path as they arrive. Use write_speech to
+        avoid holding the audio in memory at all.
+        """
+        audio_data = bytearray()
+        self.write_speech(text, save_path, sink=audio_data.extend, streaming=True)
+        return bytes(audio_data)
+
+    def write_speech(
+        self,
+        text: str,
+        save_path: Optional[str] = None,
+        sink: Optional[Callable[[bytes], None]] = None,
+        streaming: bool = False,
+    ) -> int:
+        """Convert text to speech, writing audio to a file and/or sink as it arrives
+
+        Peak memory stays flat whatever the utterance length: the streaming
+        endpoint is written through chunk by chunk, and the base64 audio of the
+        buffered endpoint is decoded incrementally from the response stream.
+
+        Args:
+            text: Text to convert to speech
+            save_path: Optional path to write the audio to
+            sink: Optional callable receiving each audio chunk (e.g. a player)
+            streaming: If True, use streaming TTS endpoint
+
+        Returns:
+            Number of audio bytes written
+        """
         if not self.session_id:
             raise Exception("Session has not been started.")
 
-        response = requests.post(
-            f"{self.api_server}/api/v1/session/{self.session_id}/streaming_tts/",
-            headers={"Content-Type": "application/json"},
+        kind = "streaming_tts" if streaming else "tts"
+        cache_key = self._tts_cache_key(kind, text)
+        audio_data = None
+        if not streaming and self.phrasebook:
+            audio_data = self.phrasebook.get(text)
+        if audio_data is None and self.tts_cache:
+            audio_data = self.tts_cache.get(cache_key)
+
+        keep_for_cache = bool(self.tts_cache) and audio_data is None
+        with AudioWriter(save_path, sink, keep_for_cache) as writer:
+            if audio_data is not None:
+                writer.write(audio_data)
+            else:
+                self._stream_speech(kind, text, writer)
+                audio_data = writer.cached_audio()
+                if self.tts_cache and audio_data is not None:
+                    self.tts_cache.put(cache_key, audio_data)
+
+        if save_path:
+            print(f"💾 Audio file saved: {save_path}")
+        return writer.bytes_written
+
+    def _stream_speech(self, kind: str, text: str, writer: AudioWriter):
+        response = self.http.post(
+            f"{self.api_server}/api/v1/session/{self.session_id}/{kind}/",
             json={"text": text},
             stream=True,
         )
+        self._observe_response(response)
 
-        if response.status_code == 200:
-            audio_chunks = []
-            for chunk in response.iter_content(chunk_size=4096):
-                if chunk:
-                    audio_chunks.append(chunk)
-
-            audio_data = b"".join(audio_chunks)
-
-            if save_path:
-                with open(save_path, "wb") as f:
-                    f.write(audio_data)
-                print(f"💾 Audio file saved: {save_path}")
-
-            return audio_data
-        else:
+        if response.status_code != 200:
             raise Exception(
-                f"TTS streaming request failed: {response.status_code} - {response.text}"
+                f"TTS request failed: {response.status_code} - {response.text}"
             )
 
+        with response:
+            if kind == "streaming_tts":
+                for chunk in response.iter_content(chunk_size=4096):
+                    if self.interrupted.is_set():
+                        raise TurnInterrupted(writer.bytes_written)
+                    writer.write(chunk)
+            else:
+                decoder = Base64FieldDecoder("audio")
+                for chunk in response.iter_content(chunk_size=65536):
+                    if self.interrupted.is_set():
+                        raise TurnInterrupted(writer.bytes_written)
+                    writer.write(decoder.feed(chunk))
+                if not decoder.done:
+                    raise Exception("TTS response did not contain complete audio.")
+
     def generate_speech_streaming_iter(self, text: str):
         """Convert text to speech with streaming response (iterator version)
 
         Yields audio chunks as they are received from the server.
-        Useful for real-time audio playback.
+        Useful for real-time audio playback. Shares TTS cache entries with
+        write_speech(streaming=True).
         """
         if not self.session_id:
             raise Exception("Session has not been started.")
 
-        response = requests.post(
+        cache_key = self._tts_cache_key("streaming_tts", text)
+        cached = self.tts_cache.get(cache_key) if self.tts_cache else None
+        if cached is not None:
+            for start in range(0, len(cached), 4096):
+                yield cached[start : start + 4096]
+            return
+
+        response = self.http.post(
             f"{self.api_server}/api/v1/session/{self.session_id}/tts/streaming/",
-            headers={"Content-Type": "application/json"},
             json={"text": text},
             stream=True,
             verify=False,
         )
+        self._observe_response(response)
 
         if response.status_code == 200:
-            for chunk in response.iter_content(chunk_size=4096):
-                if chunk:
-                    yield chunk
+            # Only keeps a copy for the cache up to the write-through limit
+            with response, AudioWriter(keep_for_cache=bool(self.tts_cache)) as writer:
+                for chunk in response.iter_content(chunk_size=4096):
+                    if chunk:
+                        writer.write(chunk)
+                        yield chunk
+            audio_data = writer.cached_audio()
+            if self.tts_cache and audio_data is not None:
+                self.tts_cache.put(cache_key, audio_data)
         else:
             raise Exception(
                 f"TTS streaming request failed: {response.status_code} - {response.text}"
             )
 
-    def recognize_speech(self, audio_file_path: str) -> str:
-        """Convert audio file to text"""
+    def _tts_cache_key(self, kind: str, text: str) -> str:
+        return tts_cache_key(
+            kind,
+            self.tts_type,
+            text,
+            self.text_normalization_config,
+            self.text_normalization_locale,
+        )
+
+    def recognize_speech(
+        self, audio: Union[str, bytes], filename: str = "recording.wav"
+    ) -> str:
+        """Convert audio to text
+
+        Args:
+            audio: Path of a WAV file, or WAV bytes (e.g. from record_audio)
+            filename: Upload file name used for in-memory audio
+        """
+        if isinstance(audio, str):
+            with open(audio, "rb") as f:
+                audio_data = f.read()
+            filename = os.path.basename(audio)
+        else:
+            audio_data = audio
+
         if not self.session_id:
             raise Exception("Session has not been started.")
 
-        # Check session status
-        try:
-            status = self.get_session_status()
-            print(f"📊 Current session status: {status}")
-            if status == "TERMINATED":
-                raise Exception(
-                    "Session has been terminated. Please start a new session."
-                )
-            elif status != "IN_PROGRESS":
-                print(f"⚠️  Session is not in IN_PROGRESS state. Current: {status}")
-        except Exception as e:
-            print(f"⚠️  Session status check failed: {e}")
-            raise e
+        # Cached status: no extra round trip while the session is known to be alive
+        status = self.get_session_status(cached=True)
+        if status == "TERMINATED":
+            raise Exception("Session has been terminated. Please start a new session.")
+        elif status != "IN_PROGRESS":
+            print(f"⚠️  Session is not in IN_PROGRESS state. Current: {status}")
 
         print("🎤 Recognizing speech...")
 
         # Check audio file details
+        duration = None
         try:
-            with wave.open(audio_file_path, "rb") as wf:
+            with wave.open(io.BytesIO(audio_data), "rb") as wf:
                 frames = wf.getnframes()
                 sample_rate = wf.getframerate()
                 channels = wf.getnchannels()
@@ -371,150 +672,274 @@ class AvatarChat:
                 print(
                     f"🎵 Audio info: {duration:.2f}s, {sample_rate}Hz, {channels}ch, {frames}frames"
                 )
-
-                if duration < 0.5:
-                    print("⚠️  Audio is too short. (Less than 0.5 seconds)")
-                elif duration > 30:
-                    print("⚠️  Audio is too long. (More than 30 seconds)")
         except Exception as e:
             print(f"⚠️  Audio file analysis failed: {e}")
 
-        # Send audio file as multipart/form-data
-        with open(audio_file_path, "rb") as f:
-            # Check file size
-            file_size = os.path.getsize(audio_file_path)
-            print(f"📁 File size: {file_size} bytes")
-
-            files = {"audio": (os.path.basename(audio_file_path), f, "audio/wav")}
-            data = {"language": "ko"}
-
-            response = requests.post(
-                f"{self.api_server}/api/v1/session/{self.session_id}/stt/",
-                files=files,
-                data=data,
-                timeout=30,  # 30 second timeout
-                headers={"User-Agent": "PersoLive-Python-Client/1.0"},
+        # Convert to 16 kHz mono, trim silence and split long audio
+        segments = [audio_data]
+        if NUMPY_AVAILABLE and duration is not None:
+            segments = prepare_for_stt(audio_data)
+            print(
+                f"🎛️  Preprocessed: {len(audio_data)} → "
+                f"{sum(len(segment) for segment in segments)} bytes, "
+                f"{len(segments)} segment(s)"
             )
-
-        print(f"📡 Response status: {response.status_code}")
-
-        # Output detailed error information
-        if response.status_code != 200:
-            print(f"📋 Response headers: {dict(response.headers)}")
-            try:
-                error_detail = response.json()
-                print(f"📝 Error details: {error_detail}")
-            except:
-                print(f"📝 Response content: {response.text[:500]}...")
-
-        if response.status_code == 200:
-            result = response.json()
-            recognized_text = result["text"]
-            print(f"✅ Recognized text: {recognized_text}")
-            return recognized_text
         else:
-            raise Exception(
-                f"STT request failed: {response.status_code} - {response.text}"
+            print(f"📁 File size: {len(audio_data)} bytes")
+            if duration is not None and duration > 30:
+                print("⚠️  Audio is too long. (More than 30 seconds)")
+                print("   Install numpy to split long audio: pip install numpy")
+        if duration is not None and duration < 0.5:
+            print("⚠️  Audio is too short. (Less than 0.5 seconds)")
+
+        recognized_text = self._recognize_segments(segments, filename)
+        print(f"✅ Recognized text: {recognized_text}")
+        return recognized_text
+
+    def transcribe(self, audio_data: bytes, filename: str = "recording.wav") -> str:
+        """Recognize WAV bytes quietly (no session check, no console output)
+
+        Used for batch transcription; audio is preprocessed like in
+        recognize_speech when numpy is available.
+        """
+        segments = [audio_data]
+        if NUMPY_AVAILABLE:
+            try:
+                segments = prepare_for_stt(audio_data)
+            except (wave.Error, EOFError, ValueError):
+                pass  # Not PCM WAV, let the server handle it
+        return self._recognize_segments(segments, filename)
+
+    def _recognize_segments(self, segments: list[bytes], filename: str) -> str:
+        if not segments:
+            return ""  # Empty recording, nothing to send
+        if len(segments) == 1:
+            return self._recognize_segment(segments[0], filename)
+
+        # Recognize segments concurrently and stitch them back in order
+        with ThreadPoolExecutor(
+            max_workers=min(self.stt_workers, len(segments))
+        ) as executor:
+            texts = list(
+                executor.map(
+                    lambda segment: self._recognize_segment(segment, filename),
+                    segments,
+                )
             )
+        return " ".join(text.strip() for text in texts if text.strip())
+
+    def _recognize_segment(self, audio_data: bytes, filename: str) -> str:
+        # Send audio as multipart/form-data
+        files = {"audio": (filename, audio_data, "audio/wav")}
+        data = {"language": "ko"}
+
+        response = self.http.post(
+            f"{self.api_server}/api/v1/session/{self.session_id}/stt/",
+            files=files,
+            data=data,
+            timeout=30,  # 30 second timeout
+        )
+        self._observe_response(response)
 
-    def start_recording(self):
-        """Start real-time voice recording"""
-        if not AUDIO_AVAILABLE:
-            print("❌ Cannot record because pyaudio is not installed.")
-            return
+        if response.status_code == 200:
+            return response.json()["text"]
+        raise Exception(f"STT request failed: {response.status_code} - {response.text}")
 
-        if self.is_recording:
-            print("⚠️  Already recording.")
-            return
+    def record_audio(self, source=None) -> Optional[bytes]:
+        """Record a voice turn and return it as in-memory WAV bytes
 
-        print("🎤 Recording started... (Press Enter to stop)")
+        Audio is captured in callback mode into a preallocated ring buffer.
+        The microphone stops when Enter is pressed; finite sources (a WAV file
+        or synthetic signal) stop when they run out.
+        """
+        source = self._capture_source(source)
+        if source is None:
+            return None
 
+        capture = AudioCapture(source, max_seconds=self.max_recording_seconds)
         self.is_recording = True
-        self.audio_frames = []
-
-        audio = pyaudio.PyAudio()
-        stream = audio.open(
-            format=self.audio_format,
-            channels=self.channels,
-            rate=self.rate,
-            input=True,
-            frames_per_buffer=self.chunk,
-        )
+        try:
+            capture.start()
+            if source.finite:
+                print("🎤 Recording started... (until the source ends)")
+                source.wait()
+            else:
+                print("🎤 Recording started... (Press Enter to stop)")
+                input()
+        finally:
+            capture.stop()
+            self.is_recording = False
 
-        def record():
-            while self.is_recording:
-                data = stream.read(self.chunk)
-                self.audio_frames.append(data)
+        print(f"🛑 Recording stopped ({capture.duration:.2f}s)")
+        return capture.wav_bytes()
 
-        # Execute recording in separate thread
-        record_thread = threading.Thread(target=record)
-        record_thread.start()
+    def record_until_silence(self, source=None) -> Optional[bytes]:
+        """Record a hands-free voice turn, ending it when the user stops speaking
 
-        # Wait for Enter input
-        input()
+        Captured audio is run through the VAD as it arrives; once
+        trailing_silence_ms of silence follows speech, the utterance (with a
+        little context around it) is returned as in-memory WAV bytes.
+        """
+        source = self._capture_source(source)
+        if source is None:
+            return None
+
+        vad = VoiceActivityDetector(
+            source.rate,
+            source.channels,
+            threshold_db=self.vad_threshold_db,
+            trailing_silence_ms=self.trailing_silence_ms,
+        )
+        capture = AudioCapture(source, max_seconds=self.max_recording_seconds)
+        self.is_recording = True
+        self.endpointing_delay = None
+        print("🎤 Listening... (stops when you finish speaking)")
+        try:
+            capture.start()
+            while True:
+                source_ended = source.wait(0.02) if source.finite else False
+                if not source.finite:
+                    time.sleep(0.02)
+                if vad.feed(capture.buffer.read_new()) or source_ended:
+                    break
+                if (
+                    vad.speech_start is None
+                    and time.time() - capture.started_at > self.no_speech_timeout
+                ):
+                    break
+        finally:
+            capture.stop()
+            self.is_recording = False
+
+        if vad.speech_start is None:
+            print("🔇 No speech detected.")
+            return None
+
+        self.endpointing_delay = vad.endpointing_delay
+        # Keep 200 ms of context on both sides of the detected speech
+        margin = source.rate // 5
+        start = max(0, vad.speech_start - margin)
+        end = vad.speech_end + margin
+        print(
+            f"🛑 End of speech detected "
+            f"({(vad.speech_end - vad.speech_start) / source.rate:.2f}s of speech)"
+        )
+        return capture.wav_bytes(start, end)
 
-        # Stop recording
-        self.is_recording = False
-        record_thread.join()
-
-        stream.stop_stream()
-        stream.close()
-        audio.terminate()
-
-        print("🛑 Recording stopped")
-
-        # Save as WAV file
-        timestamp = int(time.time())
-        audio_file = f"recorded_{timestamp}.wav"
-
-        # Check current directory
-        current_dir = os.getcwd()
-        full_path = os.path.abspath(audio_file)
-        print(f"📂 Current directory: {current_dir}")
-        print(f"📍 File save path: {full_path}")
-
-        wf = wave.open(audio_file, "wb")
-        wf.setnchannels(self.channels)
-        wf.setsampwidth(audio.get_sample_size(self.audio_format))
-        wf.setframerate(self.rate)
-        wf.writeframes(b"".join(self.audio_frames))
-        wf.close()
-
-        # Verify save
-        if os.path.exists(audio_file):
-            file_size = os.path.getsize(audio_file)
-            print(f"💾 Recording file saved: {audio_file} ({file_size} bytes)")
-        else:
-            print(f"❌ File save failed: {audio_file}")
+    def _capture_source(self, source=None):
+        source = source or self.capture_source
+        if source is None:
+            if not AUDIO_AVAILABLE:
+                print("❌ Cannot record because pyaudio is not installed.")
+                return None
+            source = MicrophoneSource(self.rate, self.channels, self.chunk)
 
+        if self.is_recording:
+            print("⚠️  Already recording.")
+            return None
+        return source
+
+    def start_recording(self, source=None) -> Optional[str]:
+        """Record a voice turn and save it as a WAV file"""
+        audio_data = self.record_audio(source)
+        if audio_data is None:
+            return None
+
+        audio_file = f"recorded_{int(time.time())}.wav"
+        with open(audio_file, "wb") as f:
+            f.write(audio_data)
+        print(f"💾 Recording file saved: {audio_file} ({len(audio_data)} bytes)")
         return audio_file
 
-    def voice_chat(self) -> str:
-        """Voice conversation (Recording → STT → LLM → TTS)"""
-        # 1. Voice recording
-        audio_file = self.start_recording()
-        if not audio_file:
-            return ""
+    def voice_chat(
+        self,
+        pipelined: bool = False,
+        max_tts_workers: int = 3,
+        hands_free: bool = False,
+        barge_in: bool = False,
+    ) -> str:
+        """Voice conversation (Recording → STT → LLM → TTS)
 
-        # Check file existence
-        if not os.path.exists(audio_file):
-            print(f"❌ Recording file not found: {audio_file}")
+        Args:
+            pipelined: If True, stream LLM sentences into TTS while the reply is
+                still generating and start playback on the first segment
+            max_tts_workers: Maximum concurrent TTS requests in pipelined mode
+            hands_free: If True, end the recording automatically when the user
+                stops speaking instead of waiting for Enter
+            barge_in: If True, keep listening while the reply plays and stop the
+                LLM stream, TTS and playback as soon as the user speaks
+                (pipelined mode with in-process playback only)
+        """
+        if barge_in and (
+            self.get_player() is None
+            or (self.barge_in_source is None and not AUDIO_AVAILABLE)
+        ):
+            print(
+                "⚠️  Barge-in needs in-process playback and a microphone, continuing without it."
+            )
+            barge_in = False
+        pipelined = pipelined or barge_in
+        self.interrupted.clear()
+
+        # 1. Voice recording (kept in memory)
+        if hands_free:
+            audio_data = self.record_until_silence()
+        else:
+            audio_data = self.record_audio()
+        if not audio_data:
             return ""
 
         try:
             # 2. Speech recognition
-            recognized_text = self.recognize_speech(audio_file)
-
-            # 3. Chat with AI
-            ai_response = self.chat_text(recognized_text)
-
-            # 4. Speech synthesis
-            timestamp = int(time.time())
-            tts_file = f"ai_response_{timestamp}.wav"
-            self.generate_speech(ai_response, tts_file)
-
-            # 5. Audio playback (OS-specific)
-            self.play_audio(tts_file)
+            stt_started = time.time()
+            recognized_text = self.recognize_speech(audio_data)
+            if hands_free and self.endpointing_delay is not None:
+                print(f"⏱️  Endpointing delay: {self.endpointing_delay * 1000:.0f} ms")
+            print(f"⏱️  STT latency: {time.time() - stt_started:.2f}s")
+
+            if pipelined:
+                # 3-5. Chat with AI, synthesizing and playing sentence by sentence
+                monitor = None
+                if barge_in:
+                    monitor = BargeInMonitor(
+                        self.barge_in_source
+                        or MicrophoneSource(self.rate, self.channels, self.chunk),
+                        on_speech=self.interrupt,
+                        threshold_db=self.barge_in_threshold_db,
+                    )
+                    monitor.start()
+                try:
+                    with PipelinedSpeaker(self, max_workers=max_tts_workers) as speaker:
+                        ai_response = self.chat_text(
+                            recognized_text, on_content=speaker.feed
+                        )
+                        timings = speaker.finish()
+                finally:
+                    if monitor:
+                        monitor.stop()
+
+                if timings["interrupted"]:
+                    self._rollback_interrupted_reply(ai_response, speaker)
+                    self.interrupted.clear()
+                    return timings["spoken_text"]
+            else:
+                turn_start = time.time()
+
+                # 3. Chat with AI
+                ai_response = self.chat_text(recognized_text)
+
+                # 4-5. Speech synthesis and playback, starting on the first chunk
+                timestamp = int(time.time())
+                tts_file = f"ai_response_{timestamp}.wav"
+                first_audio_at = self.speak(ai_response, tts_file)
+                timings = {
+                    "time_to_first_audio": first_audio_at - turn_start,
+                    "end_to_end": time.time() - turn_start,
+                }
+
+            if timings["time_to_first_audio"] is not None:
+                print(f"⏱️  Time to first audio: {timings['time_to_first_audio']:.2f}s")
+            print(f"⏱️  End-to-end: {timings['end_to_end']:.2f}s")
 
             return ai_response
 
@@ -522,15 +947,86 @@ class AvatarChat:
             print(f"❌ Error during voice conversation: {e}")
             return ""
 
+    def _rollback_interrupted_reply(self, ai_response: str, speaker: PipelinedSpeaker):
+        """Keep only what the user heard in the history and report the savings"""
+        spoken_text = " ".join(speaker.spoken)
+        if self.llm_version == "v2" and ai_response and self.chat_history.messages:
+            last = self.chat_history.messages[-1]
+            if last.get("role") == "assistant" and last.get("content") == ai_response:
+                if spoken_text:
+                    self.chat_history.replace_last(
+                        {"role": "assistant", "content": spoken_text}
+                    )
+                else:
+                    self.chat_history.pop()
+
+        wasted_tokens = 0
+        if ai_response:
+            spoken_tokens = estimate_text_tokens(spoken_text) if spoken_text else 0
+            wasted_tokens = max(0, estimate_text_tokens(ai_response) - spoken_tokens)
+        print(
+            f"✋ Interrupted after {len(spoken_text)}/{len(ai_response)} characters: "
+            f"~{wasted_tokens} tokens generated but not heard, "
+            f"~{speaker.bytes_saved()} bytes of TTS audio not downloaded, "
+            f"{speaker.flushed_bytes} bytes of audio flushed"
+        )
+
+    def get_player(self) -> Optional[StreamingPlayer]:
+        """In-process player, created on first use (None if unavailable)"""
+        if self.player is None and self.in_process_playback and AUDIO_AVAILABLE:
+            try:
+                self.player = StreamingPlayer(jitter_buffer_ms=self.jitter_buffer_ms)
+            except Exception as e:
+                print(f"⚠️  In-process playback unavailable, using OS player: {e}")
+                self.in_process_playback = False
+        return self.player
+
+    def speak(self, text: str, save_path: Optional[str] = None) -> float:
+        """Synthesize and play text, returning the time playback started
+
+        With the in-process player, audio is played while it streams in (and
+        is written to save_path at the same time); otherwise the file is
+        synthesized completely and handed to the OS player.
+        """
+        player = self.get_player()
+        if player is None:
+            save_path = save_path or f"ai_response_{int(time.time())}.wav"
+            self.write_speech(text, save_path)
+            started_at = time.time()
+            self.play_audio(save_path)
+            return started_at
+
+        try:
+            self.write_speech(text, save_path, sink=player.feed, streaming=True)
         finally:
-            # Preserve temporary files for debugging
-            # if os.path.exists(audio_file):
-            #     os.remove(audio_file)
-            print(f"🗂️  Recording file preserved: {audio_file} (for debugging)")
+            player.end_utterance()
+        player.wait()
+        if player.start_latency is not None:
+            print(
+                f"🔊 Playback started {player.start_latency * 1000:.0f} ms after first chunk"
+            )
+        return player.playback_started_at or time.time()
 
-    def play_audio(self, audio_file: str):
+    def interrupt(self):
+        """Abandon the current turn: stop LLM/TTS streams and flush playback"""
+        self.interrupted.set()
+        self.stop_playback()
+
+    def stop_playback(self):
+        """Stop in-process playback immediately and discard buffered audio"""
+        if self.player:
+            self.player.stop()
+
+    def play_audio(self, audio_file: str, quiet: bool = False):
         """Play audio file"""
-        print(f"🔊 Playing audio: {audio_file}")
+        if not quiet:
+            print(f"🔊 Playing audio: {audio_file}")
+
+        player = self.get_player()
+        if player is not None:
+            with open(audio_file, "rb") as f:
+                player.play(iter(lambda: f.read(4096), b""))
+            return
 
         import platform
 
@@ -553,10 +1049,14 @@ class AvatarChat:
             return
 
         print("🛑 Ending session...")
+        self.cancel_phrasebook_warmup()
+        self.phrasebook = None
+        if self.session_state:
+            self.session_state.stop_refresh()
+            self.session_state = None
 
-        response = requests.post(
+        response = self.http.post(
             f"{self.api_server}/api/v1/session/{self.session_id}/event/create/",
-            headers={"Content-Type": "application/json"},
             json={"event": "SESSION_END", "detail": "Session ended via Python"},
         )
 
@@ -567,16 +1067,31 @@ class AvatarChat:
 
         self.session_id = None
 
+    def close_player(self):
+        """Release the audio device used by the in-process player"""
+        if self.player:
+            self.player.close()
+            self.player = None
+
     def get_chat_history(self):
         """Return conversation history"""
         return self.chat_history
 
-    def get_session_status(self) -> str:
-        """Query session status"""
+    def get_session_status(self, cached: bool = False) -> str:
+        """Query session status
+
+        Args:
+            cached: If True, return the status observed within the lease
+                (including recent successful API responses) without a request
+        """
         if not self.session_id:
             raise Exception("Session has not been created.")
 
-        response = requests.get(f"{self.api_server}/api/v1/session/{self.session_id}/")
+        state = self._session_state()
+        return state.get() if cached else state.refresh()
+
+    def _query_session_status(self, session_id: str) -> str:
+        response = self.http.get(f"{self.api_server}/api/v1/session/{session_id}/")
 
         if response.status_code == 200:
             result = response.json()
@@ -586,29 +1101,37 @@ class AvatarChat:
                 f"Session status query failed: {response.status_code} - {response.text}"
             )
 
-    def wait_for_session_ready(self, timeout: int = 30):
-        """Wait until session becomes IN_PROGRESS state"""
-        import time
-
-        print("⏳ Waiting for session to be ready...")
+    def _session_state(self) -> SessionState:
+        if (
+            self.session_state is None
+            or self.session_state.session_id != self.session_id
+        ):
+            session_id = self.session_id
+            self.session_state = SessionState(
+                lambda: self._query_session_status(session_id), session_id=session_id
+            )
+        return self.session_state
 
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                status = self.get_session_status()
-                print(f"📊 Session status: {status}")
+    def _observe_response(self, response):
+        """Count API responses as signals of whether the session is alive"""
+        if not self.session_id:
+            return
+        if response.status_code < 400:
+            self._session_state().mark_alive()
+        else:
+            self._session_state().invalidate()
 
-                if status == "IN_PROGRESS":
-                    print("✅ Session ready!")
-                    return True
-                elif status == "TERMINATED":
-                    raise Exception("Session has been terminated.")
+    def wait_for_session_ready(self, timeout: int = 30):
+        """Wait until session becomes IN_PROGRESS state
 
-                time.sleep(1)  # Wait 1 second
+        Polls with adaptive backoff: quickly at first, then less often.
+        """
+        print("⏳ Waiting for session to be ready...")
 
-            except Exception as e:
-                print(f"⚠️  Error during status check: {e}")
-                time.sleep(1)
+        started_at = time.time()
+        if self._session_state().wait_until("IN_PROGRESS", timeout):
+            print(f"✅ Session ready! ({time.time() - started_at:.2f}s)")
+            return True
 
         raise Exception(f"Session was not ready within {timeout} seconds.")
 
@@ -629,9 +1152,8 @@ class AvatarChat:
         """Get available settings (TTS types, model styles, etc.)"""
         print(f"🔍 Getting available {setting_type}...")
 
-        response = requests.get(
+        response = self.http.get(
             f"{self.api_server}/api/v1/settings/{setting_type}/",
-            headers={"PersoLive-APIKey": self.api_key},
         )
 
         if response.status_code == 200:
@@ -0,0 +1,71 @@
+# barge_in.py
+import threading
+import time
+from typing import Callable, Optional
+
+from audio_capture import AudioCapture
+from vad import VoiceActivityDetector
+
+
+class TurnInterrupted(Exception):
+    """The user started speaking; the current turn was abandoned"""
+
+    def __init__(self, bytes_received: int = 0):
+        super().__init__("Turn interrupted by the user")
+        self.bytes_received = bytes_received  # Audio downloaded before aborting
+
+
+class BargeInMonitor:
+    """Keep listening while the avatar speaks and report when the user talks
+
+    Runs its own capture and VAD on a background thread and calls on_speech
+    once, as soon as speech is detected. Without echo cancellation the
+    microphone also hears the avatar, so the defaults require louder and
+    longer speech than normal endpointing; headphones work best.
+    """
+
+    def __init__(
+        self,
+        source,
+        on_speech: Callable[[], None],
+        threshold_db: float = -30.0,
+        min_speech_ms: int = 250,
+    ):
+        self.source = source
+        self.on_speech = on_speech
+        self.threshold_db = threshold_db
+        self.min_speech_ms = min_speech_ms
+        self.triggered_at: Optional[float] = None
+
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        vad = VoiceActivityDetector(
+            self.source.rate,
+            self.source.channels,
+            threshold_db=self.threshold_db,
+            min_speech_ms=self.min_speech_ms,
+        )
+        capture = AudioCapture(self.source, max_seconds=5)
+        capture.start()
+        try:
+            while not self._stopped.wait(0.02):
+                vad.feed(capture.buffer.read_new())
+                if vad.speech_start is not None:
+                    self.triggered_at = time.time()
+                    self.on_speech()
+                    break
+        finally:
+            capture.stop()
@@ -0,0 +1,291 @@
+# batch_transcribe.py
+"""Batch speech-to-text over a directory or manifest of audio files
+
+Results are appended to a JSONL file as each file finishes, so an
+interrupted run can be restarted with the same command and only the files
+without a successful result are transcribed again.
+"""
+
+import argparse
+import fnmatch
+import itertools
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from avatar_chat import AvatarChat  # noqa: E402
+from persolive_common.http_client import DEFAULT_POOL_SIZE  # noqa: E402
+
+
+def parse_arguments():
+    """Command line argument parser"""
+    parser = argparse.ArgumentParser(
+        description="Batch speech-to-text for many audio files",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Transcribe every WAV under a directory with 8 workers on 2 sessions
+  python batch_transcribe.py --api-server https://live-api.perso.ai --llm-type gpt-4 --tts-type yuri --model-style ... --prompt plp-12345 \\
+      --input-dir calls/ --output transcripts.jsonl --workers 8 --sessions 2
+
+  # Files listed in a manifest (one path per line, or JSONL with a "path" field)
+  python batch_transcribe.py ... --manifest calls.txt --output transcripts.jsonl
+
+  # After a crash, run the same command again to resume
+        """,
+    )
+
+    # API Configuration
+    parser.add_argument("--api-server", required=True, help="API server URL")
+    parser.add_argument(
+        "--api-key",
+        help="API key (if not provided, will use EST_LIVE_API_KEY environment variable)",
+    )
+
+    # Session Configuration
+    parser.add_argument("--llm-type", required=True, help="LLM type to use")
+    parser.add_argument("--tts-type", required=True, help="TTS type to use")
+    parser.add_argument(
+        "--stt-type", default="default", help="STT type to use (default: default)"
+    )
+    parser.add_argument("--model-style", required=True, help="Avatar model style")
+    parser.add_argument("--prompt", required=True, help="Prompt ID")
+    parser.add_argument(
+        "--capability",
+        nargs="+",
+        default=["STT"],
+        choices=["LLM", "TTS", "STT"],
+        help="Capabilities to enable for the sessions (default: STT)",
+    )
+
+    # Input / Output
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input-dir", help="Directory to search for audio files")
+    source.add_argument(
+        "--manifest",
+        help='File with one audio path per line, or JSONL with a "path" field',
+    )
+    parser.add_argument(
+        "--pattern",
+        default="*.wav",
+        help="Glob pattern of file names to pick up in --input-dir, case-insensitive (default: *.wav)",
+    )
+    parser.add_argument("--output", required=True, help="JSONL file for results")
+
+    # Concurrency
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help=f"Files transcribed concurrently, one STT request each, at most {DEFAULT_POOL_SIZE} (the HTTP connection pool size; default: 4)",
+    )
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=1,
+        help="Sessions to spread the workers over (default: 1)",
+    )
+
+    return parser.parse_args()
+
+
+def iter_inputs(input_dir: str, manifest: str, pattern: str) -> Iterator[str]:
+    """Audio file paths in a stable order"""
+    if input_dir:
+        pattern = pattern.lower()
+        for root, dirs, files in os.walk(input_dir):
+            dirs.sort()
+            for name in sorted(files):
+                if fnmatch.fnmatchcase(name.lower(), pattern):
+                    yield os.path.join(root, name)
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(manifest))
+    with open(manifest, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = json.loads(line)["path"] if line.startswith("{") else line
+            yield path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+
+def load_completed(output_path: str) -> set[str]:
+    """Files that already have a successful result in the output file
+
+    A partially written last line (the process died mid-write) is cut off so
+    new results start on a fresh line.
+    """
+    completed: set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if "text" in record:
+                completed.add(record["file"])
+    return completed
+
+
+def open_sessions(args, api_key: str) -> list[AvatarChat]:
+    """Create and start the sessions; ends the ones already opened on failure"""
+    sessions = []
+    try:
+        for _ in range(args.sessions):
+            chat = AvatarChat(args.api_server, api_key)
+            # Files are the unit of concurrency: the segments of a long file
+            # are recognized one after another, so --workers bounds the
+            # number of STT requests in flight
+            chat.stt_workers = 1
+            chat.create_session(
+                llm_type=args.llm_type,
+                tts_type=args.tts_type,
+                stt_type=args.stt_type,
+                model_style=args.model_style,
+                prompt=args.prompt,
+                capability=args.capability,
+            )
+            sessions.append(chat)
+            chat.start_session()
+    except BaseException:
+        for chat in sessions:
+            chat.end_session()
+        raise
+    return sessions
+
+
+def transcribe_file(chat: AvatarChat, path: str) -> dict:
+    started_at = time.time()
+    record: dict = {"file": path, "session_id": chat.session_id}
+    try:
+        with open(path, "rb") as f:
+            audio_data = f.read()
+        record["text"] = chat.transcribe(audio_data, os.path.basename(path))
+    except Exception as e:
+        record["error"] = str(e)
+    record["latency"] = round(time.time() - started_at, 3)
+    return record
+
+
+def percentile(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+def main():
+    args = parse_arguments()
+
+    api_key = args.api_key or os.environ.get("EST_LIVE_API_KEY")
+    if not api_key:
+        print(
+            "❌ Error: API key is required. Provide it via --api-key argument or EST_LIVE_API_KEY environment variable."
+        )
+        return 1
+
+    if args.workers > DEFAULT_POOL_SIZE:
+        # More threads than pooled connections only opens and drops connections
+        print(
+            f"⚠️  --workers {args.workers} is above the HTTP connection pool size, using {DEFAULT_POOL_SIZE}"
+        )
+        args.workers = DEFAULT_POOL_SIZE
+
+    completed = load_completed(args.output)
+    pending = (
+        path
+        for path in iter_inputs(args.input_dir, args.manifest, args.pattern)
+        if path not in completed
+    )
+    if completed:
+        print(f"⏩ Resuming: {len(completed)} files already transcribed")
+
+    try:
+        sessions = open_sessions(args, api_key)
+    except Exception as e:
+        print(f"❌ Error opening sessions: {e}")
+        return 1
+    session_cycle = itertools.cycle(sessions)
+    cycle_lock = threading.Lock()
+    local = threading.local()
+
+    def work(path: str) -> dict:
+        # Each worker thread sticks to one session
+        if not hasattr(local, "chat"):
+            with cycle_lock:
+                local.chat = next(session_cycle)
+        return transcribe_file(local.chat, path)
+
+    latencies: list[float] = []
+    failed = 0
+    started_at = time.time()
+    print(f"🎧 Transcribing with {args.workers} workers on {len(sessions)} session(s)")
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor, open(
+            args.output, "a", encoding="utf-8"
+        ) as output:
+            in_flight: set = set()
+            exhausted = False
+            while in_flight or not exhausted:
+                # Keep a bounded number of files in flight
+                while not exhausted and len(in_flight) < args.workers * 2:
+                    path = next(pending, None)
+                    if path is None:
+                        exhausted = True
+                    else:
+                        in_flight.add(executor.submit(work, path))
+                if not in_flight:
+                    break
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record = future.result()
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    output.flush()
+                    if "error" in record:
+                        failed += 1
+                        print(f"❌ {record['file']}: {record['error']}")
+                    else:
+                        latencies.append(record["latency"])
+                    processed = len(latencies) + failed
+                    if processed % 100 == 0:
+                        rate = processed / (time.time() - started_at)
+                        print(f"📈 {processed} files ({rate:.1f} files/s)")
+
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted, run the same command again to resume.")
+    finally:
+        for chat in sessions:
+            chat.end_session()
+
+    elapsed = time.time() - started_at
+    processed = len(latencies) + failed
+    print("=" * 50)
+    print(f"✅ Transcribed: {len(latencies)}, ❌ Failed: {failed}")
+    if processed:
+        print(f"⚡ Throughput: {processed / elapsed:.2f} files/s ({elapsed:.1f}s)")
+    if latencies:
+        print(
+            f"⏱️  Latency: p50 {percentile(latencies, 50):.2f}s, "
+            f"p95 {percentile(latencies, 95):.2f}s"
+        )
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# bench_barge_in.py
+"""Barge-in benchmark without sound hardware
+
+A local fake server streams a multi-sentence LLM reply and synthesizes each
+sentence on /streaming_tts/. The reply is played into a real-time NullSink
+while a synthetic "user" starts talking after --talk-after seconds. Reports
+how quickly playback stopped, how much of the reply was heard and what the
+interruption saved. The turn runs in a temporary working directory, so any
+audio written along the way is removed afterwards.
+
+Usage:
+    python benchmarks/bench_barge_in.py
+    python benchmarks/bench_barge_in.py --sentences 12 --talk-after 3
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_capture import SyntheticSource  # noqa: E402
+from audio_playback import NullSink, StreamingPlayer  # noqa: E402
+from avatar_chat import AvatarChat  # noqa: E402
+
+SAMPLE_RATE = 16000
+SESSION_ID = "bench"
+SECONDS_PER_CHAR = 0.06
+SENTENCE = "This is sentence number {} of a long answer from the avatar."
+
+
+def make_wav(seconds: float) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(b"\x01\x00" * int(SAMPLE_RATE * seconds))
+    return buffer.getvalue()
+
+
+def serve(sentences: int, stats: dict) -> ThreadingHTTPServer:
+    reply = [SENTENCE.format(i + 1) for i in range(sentences)]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self._reply({"status": "IN_PROGRESS"})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            try:
+                if self.path.endswith("/stt/"):
+                    self._reply({"text": "Tell me a long story."})
+                elif self.path.endswith("/llm/v2/"):
+                    self._stream_llm()
+                else:
+                    self._stream_tts(json.loads(body)["text"])
+            except (BrokenPipeError, ConnectionResetError):
+                stats["aborted_streams"] += 1
+
+        def _stream_llm(self):
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for sentence in reply:
+                for word in sentence.split(" "):
+                    event = {"status": "success", "content": word + " "}
+                    self._chunk(f"data: {json.dumps(event)}\n".encode())
+                    stats["llm_tokens_sent"] += 1
+                    time.sleep(0.03)
+            self._chunk(b"")
+
+        def _stream_tts(self, text: str):
+            audio = make_wav(len(text) * SECONDS_PER_CHAR)
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(audio)))
+            self.end_headers()
+            for start in range(0, len(audio), 4096):
+                self.wfile.write(audio[start : start + 4096])
+                stats["tts_bytes_sent"] += len(audio[start : start + 4096])
+                time.sleep(0.02)
+
+        def _chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def _reply(self, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Barge-in benchmark")
+    parser.add_argument("--sentences", type=int, default=8)
+    parser.add_argument(
+        "--talk-after", type=float, default=2.5, help="Seconds until the user talks"
+    )
+    args = parser.parse_args()
+
+    stats = {"llm_tokens_sent": 0, "tts_bytes_sent": 0, "aborted_streams": 0}
+    server = serve(args.sentences, stats)
+    sink = NullSink(realtime=True)
+
+    chat = AvatarChat(
+        f"http://127.0.0.1:{server.server_port}",
+        "bench-key",
+        player=StreamingPlayer(sink=sink),
+    )
+    chat.session_id = SESSION_ID
+    chat.llm_version = "v2"
+    chat.capture_source = SyntheticSource(0.5, 0.1, realtime=False)
+    chat.barge_in_source = SyntheticSource(
+        tone_seconds=1.0, silence_seconds=args.talk_after
+    )
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            started_at = time.time()
+            chat.voice_chat(barge_in=True)
+            elapsed = time.time() - started_at
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+            chat.close_player()
+
+    last_write = max((at for at, _ in sink.writes), default=started_at)
+    history = chat.chat_history.messages
+
+    print("=" * 50)
+    print(f"⏱️  Turn finished after {elapsed:.2f}s")
+    print(f"🔇 Last audio written {last_write - started_at:.2f}s into the turn")
+    print(f"📜 History now ends with: {history[-1]['content'][:80]!r}")
+    print(
+        f"📡 Server sent {stats['llm_tokens_sent']} LLM tokens and "
+        f"{stats['tts_bytes_sent']} TTS bytes "
+        f"({stats['aborted_streams']} streams aborted by the client)"
+    )
+
+
+if __name__ == "__main__":
+    main()
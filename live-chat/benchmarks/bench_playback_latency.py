@@ -0,0 +1,122 @@
+# bench_playback_latency.py
+"""Playback-start latency benchmark without sound hardware
+
+A local fake server streams a WAV from /streaming_tts/ at a fixed synthesis
+speed. The OS-player path (write the whole file, then spawn a player process)
+is compared with the in-process StreamingPlayer writing to a NullSink, which
+records when each chunk would have reached the sound card.
+
+Usage:
+    python benchmarks/bench_playback_latency.py
+    python benchmarks/bench_playback_latency.py --seconds 10 --speed 4 --runs 5
+"""
+
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_playback import NullSink, StreamingPlayer  # noqa: E402
+from avatar_chat import AvatarChat  # noqa: E402
+
+SAMPLE_RATE = 16000
+SESSION_ID = "bench"
+
+
+def make_wav(seconds: float) -> bytes:
+    frames = os.urandom(2 * int(SAMPLE_RATE * seconds))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(frames)
+    return buffer.getvalue()
+
+
+def serve(audio: bytes, speed: float) -> ThreadingHTTPServer:
+    """Stream the audio in 4 KB chunks, `speed` times faster than real time"""
+    chunk_size = 4096
+    chunk_delay = chunk_size / (2 * SAMPLE_RATE) / speed
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(audio)))
+            self.end_headers()
+            for start in range(0, len(audio), chunk_size):
+                self.wfile.write(audio[start : start + chunk_size])
+                self.wfile.flush()
+                time.sleep(chunk_delay)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def os_player_latency(chat: AvatarChat, save_path: str) -> float:
+    """Whole file first, then a player process ("true" stands in for aplay)"""
+    started_at = time.time()
+    chat.write_speech("passage", save_path, streaming=True)
+    subprocess.run(["true"], check=False)
+    return time.time() - started_at
+
+
+def in_process_latency(chat: AvatarChat, save_path: str) -> float:
+    started_at = time.time()
+    chat.write_speech("passage", save_path, sink=chat.player.feed, streaming=True)
+    chat.player.end_utterance()
+    chat.player.wait()
+    return chat.player.playback_started_at - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Playback-start latency benchmark")
+    parser.add_argument("--seconds", type=float, default=6, help="Utterance length")
+    parser.add_argument(
+        "--speed", type=float, default=3, help="Synthesis speed vs. real time"
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--jitter-buffer-ms", type=int, default=80)
+    args = parser.parse_args()
+
+    server = serve(make_wav(args.seconds), args.speed)
+    api_server = f"http://127.0.0.1:{server.server_port}"
+    # Realtime sink: each utterance plays out, so playback timing is realistic
+    player = StreamingPlayer(NullSink(), jitter_buffer_ms=args.jitter_buffer_ms)
+    chat = AvatarChat(api_server, "bench-key", player=player)
+    chat.session_id = SESSION_ID
+    save_path = "bench_playback.wav"
+
+    print(f"🎵 {args.seconds}s utterance synthesized at {args.speed}x real time")
+    try:
+        for label, measure in [
+            ("OS player (before)", os_player_latency),
+            ("in-process (after)", in_process_latency),
+        ]:
+            latencies = [measure(chat, save_path) for _ in range(args.runs)]
+            print(
+                f"⏱️  {label:<20} playback starts after "
+                f"{statistics.median(latencies) * 1000:7.1f} ms (median of {args.runs})"
+            )
+    finally:
+        chat.close_player()
+        server.shutdown()
+        if os.path.exists(save_path):
+            os.remove(save_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# bench_session_pool.py
+"""Time-to-session with and without SessionPool
+
+A local fake server adds a fixed delay to session creation and start and
+reports IN_PROGRESS only after a warmup period, like the real service. Users
+arriving one after another either create their own session or check one out
+of a pool kept warm in the background.
+
+Usage:
+    python benchmarks/bench_session_pool.py
+    python benchmarks/bench_session_pool.py --users 20 --think-time 1.0 --pool-size 2
+"""
+
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from avatar_chat import AvatarChat  # noqa: E402
+from session_pool import SessionPool  # noqa: E402
+
+CREATE_DELAY = 0.15
+WARMUP = 0.6
+SESSION = {
+    "llm_type": "gpt-4",
+    "tts_type": "yuri",
+    "model_style": "bench-style",
+    "prompt": "plp-bench",
+}
+
+
+def serve() -> ThreadingHTTPServer:
+    ids = itertools.count()
+    started: dict[str, float] = {}
+    ended: set[str] = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            session_id = self.path.rstrip("/").split("/")[-1]
+            if session_id in ended:
+                status = "TERMINATED"
+            elif time.time() - started.get(session_id, time.time()) >= WARMUP:
+                status = "IN_PROGRESS"
+            else:
+                status = "CREATED"
+            self._reply(200, {"status": status})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            time.sleep(CREATE_DELAY)
+            if self.path == "/api/v1/session/":
+                self._reply(201, {"session_id": f"s{next(ids)}"})
+                return
+            session_id = self.path.split("/")[4]
+            if b"SESSION_START" in body:
+                started[session_id] = time.time()
+            else:
+                ended.add(session_id)
+            self._reply(201, {})
+
+        def _reply(self, code: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def cold_start(api_server: str) -> AvatarChat:
+    chat = AvatarChat(api_server, "bench-key")
+    chat.create_session(**SESSION)
+    chat.start_session()
+    chat.wait_for_session_ready()
+    return chat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session pool benchmark")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument(
+        "--think-time", type=float, default=1.5, help="Seconds between users"
+    )
+    parser.add_argument("--pool-size", type=int, default=1)
+    args = parser.parse_args()
+
+    server = serve()
+    api_server = f"http://127.0.0.1:{server.server_port}"
+
+    cold = []
+    for _ in range(args.users):
+        started_at = time.time()
+        chat = cold_start(api_server)
+        cold.append(time.time() - started_at)
+        chat.end_session()
+
+    pool = SessionPool(api_server, "bench-key", size=args.pool_size)
+    pool.warm(**SESSION)
+    time.sleep(args.think_time)
+    for _ in range(args.users):
+        chat = pool.checkout(**SESSION)
+        pool.release(chat)
+        time.sleep(args.think_time)
+    summary = pool.summary()
+    pool.close()
+    server.shutdown()
+
+    print("=" * 50)
+    print(
+        f"🐢 Without pool: median {statistics.median(cold) * 1000:.0f} ms to a session"
+    )
+    print(f"⚡ With pool:    {summary}")
+
+
+if __name__ == "__main__":
+    main()
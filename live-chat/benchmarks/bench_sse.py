@@ -0,0 +1,130 @@
+# bench_sse.py
+"""Micro-benchmark for the LLM SSE decoder
+
+Compares the original `iter_lines()` + `json.loads` + `str +=` loop with
+SSEDecoder on a recorded 10k-token stream and reports tokens/s.
+
+Usage:
+    python benchmarks/bench_sse.py
+    python benchmarks/bench_sse.py --stream-file captured_llm_stream.txt
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from sse import JSON_BACKEND, iter_event_batches  # noqa: E402
+
+SAMPLE_TEXT = "Hello there, how can I help you today? 안녕하세요, 반갑습니다. The avatar is ready."
+WORDS = [" " + word for word in SAMPLE_TEXT.split()]
+
+
+def record_stream(tokens: int, seed: int = 0) -> bytes:
+    """Build a stream shaped like the /llm/v2/ response body"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(tokens):
+        event = {"status": "success", "content": rng.choice(WORDS)}
+        lines.append(b"data: " + json.dumps(event, ensure_ascii=False).encode("utf-8"))
+    return b"\n".join(lines) + b"\n"
+
+
+def split_chunks(stream: bytes, seed: int = 0) -> list[bytes]:
+    """Split a stream into network-sized reads"""
+    rng = random.Random(seed)
+    chunks = []
+    i = 0
+    while i < len(stream):
+        size = rng.randint(64, 1500)
+        chunks.append(stream[i : i + size])
+        i += size
+    return chunks
+
+
+def run_baseline(stream: bytes, sink) -> int:
+    """The original chat_text loop"""
+    response = requests.models.Response()
+    response.raw = io.BytesIO(stream)
+    response.status_code = 200
+
+    ai_response = ""
+    tokens = 0
+    for line in response.iter_lines():
+        if line:
+            line_str = line.decode("utf-8")
+            if line_str.startswith("data: "):
+                try:
+                    data = json.loads(line_str[6:])
+                    if data.get("status") == "success":
+                        content = data.get("content", "")
+                        if content:
+                            print(content, end="", flush=True, file=sink)
+                            ai_response += content
+                            tokens += 1
+                except json.JSONDecodeError:
+                    continue
+    return tokens
+
+
+def run_decoder(chunks: list[bytes], sink) -> int:
+    """The SSEDecoder-based chat_text loop"""
+    response_parts = []
+    for events in iter_event_batches(chunks):
+        for data in events:
+            if data.get("status") == "success":
+                content = data.get("content", "")
+                if content:
+                    sink.write(content)
+                    response_parts.append(content)
+        sink.flush()
+    "".join(response_parts)
+    return len(response_parts)
+
+
+def measure(fn, arg, repeat: int) -> tuple[int, float]:
+    best = float("inf")
+    tokens = 0
+    for _ in range(repeat):
+        sink = io.StringIO()
+        start = time.perf_counter()
+        tokens = fn(arg, sink)
+        best = min(best, time.perf_counter() - start)
+    return tokens, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE decoder micro-benchmark")
+    parser.add_argument("--tokens", type=int, default=10_000, help="Tokens to record")
+    parser.add_argument("--stream-file", help="Use a captured response body instead")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant")
+    args = parser.parse_args()
+
+    if args.stream_file:
+        with open(args.stream_file, "rb") as f:
+            stream = f.read()
+    else:
+        stream = record_stream(args.tokens)
+    chunks = split_chunks(stream)
+
+    print(f"📼 Stream: {len(stream)} bytes in {len(chunks)} chunks")
+    print(f"🧩 JSON backend: {JSON_BACKEND}")
+
+    base_tokens, base_time = measure(run_baseline, stream, args.repeat)
+    new_tokens, new_time = measure(run_decoder, chunks, args.repeat)
+    assert base_tokens == new_tokens, "Decoders disagree on token count"
+
+    print(f"🐢 iter_lines loop: {base_tokens / base_time:>12,.0f} tokens/s")
+    print(f"🚀 SSEDecoder:      {new_tokens / new_time:>12,.0f} tokens/s")
+    print(f"📈 Speedup: {base_time / new_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
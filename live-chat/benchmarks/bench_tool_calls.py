@@ -0,0 +1,173 @@
+# bench_tool_calls.py
+"""Tool-call assembly benchmark for turns with many parallel tool calls
+
+1. Reconciliation cost: the original post-stream nested loop that matched
+   tool messages to calls, against ToolCallAssembler indexed by tool_call_id.
+2. Availability: a local fake server streams a turn where each tool call and
+   its result arrive --interval seconds apart. chat_text_events hands every
+   call to the caller as it arrives; before, calls were only usable once the
+   stream had ended.
+
+Usage:
+    python benchmarks/bench_tool_calls.py
+    python benchmarks/bench_tool_calls.py --calls 50 200 1000 --interval 0.01
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from avatar_chat import AvatarChat  # noqa: E402
+from llm_stream import ToolCallAssembler  # noqa: E402
+
+
+def make_turn(calls: int, seed: int = 0) -> list[dict]:
+    """Stream events of one turn: all tool calls, then results in random order"""
+    rng = random.Random(seed)
+    tool_calls = [
+        {
+            "id": f"call_{i:05d}",
+            "type": "function",
+            "function": {"name": "get_weather", "arguments": f'{{"city": "c{i}"}}'},
+        }
+        for i in range(calls)
+    ]
+    events = [{"status": "success", "tool_calls": [tc]} for tc in tool_calls]
+    # A few results never arrive and get a placeholder
+    answered = [tc["id"] for tc in tool_calls if rng.random() > 0.05]
+    rng.shuffle(answered)
+    events += [
+        {"status": "success", "tool_call_id": i, "content": '{"temp": 21}'}
+        for i in answered
+    ]
+    return events
+
+
+def run_baseline(events: list[dict]) -> list[dict]:
+    """The original chat_text reconciliation"""
+    collected_tool_calls = []
+    collected_tool_messages = []
+    for data in events:
+        if data.get("tool_calls"):
+            collected_tool_calls.extend(data["tool_calls"])
+        if data.get("tool_call_id"):
+            collected_tool_messages.append(
+                {
+                    "role": "tool",
+                    "content": data.get("content", ""),
+                    "tool_call_id": data["tool_call_id"],
+                }
+            )
+
+    new_history = [{"role": "assistant", "tool_calls": collected_tool_calls}]
+    tool_call_ids = {tc.get("id") for tc in collected_tool_calls}
+    tool_message_ids = {tm.get("tool_call_id") for tm in collected_tool_messages}
+    for missing_id in tool_call_ids - tool_message_ids:
+        collected_tool_messages.append(
+            {
+                "role": "tool",
+                "content": "Tool execution completed",
+                "tool_call_id": missing_id,
+            }
+        )
+    for tool_call_id in [tc.get("id") for tc in collected_tool_calls]:
+        for tool_message in collected_tool_messages:
+            if tool_message.get("tool_call_id") == tool_call_id:
+                new_history.append(tool_message)
+                break
+    return new_history
+
+
+def run_assembler(events: list[dict]) -> list[dict]:
+    tool_calls = ToolCallAssembler()
+    for data in events:
+        for tool_call in data.get("tool_calls") or []:
+            tool_calls.add_call(tool_call)
+        if data.get("tool_call_id"):
+            tool_calls.add_result(data["tool_call_id"], data.get("content", ""))
+    return tool_calls.history()
+
+
+def measure(fn, events: list[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(events)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def serve(events: list[dict], interval: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for event in events:
+                data = f"data: {json.dumps(event)}\n".encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+                time.sleep(interval)
+            self.wfile.write(b"0\r\n\r\n")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool-call assembly benchmark")
+    parser.add_argument("--calls", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--interval", type=float, default=0.005, help="Seconds between stream events"
+    )
+    args = parser.parse_args()
+
+    print("🧮 Reconciliation after the stream")
+    for calls in args.calls:
+        events = make_turn(calls)
+        assert run_baseline(events) == run_assembler(events)
+        base = measure(run_baseline, events, args.repeat)
+        new = measure(run_assembler, events, args.repeat)
+        print(
+            f"   {calls:>5} calls: nested loop {base * 1000:8.2f} ms, "
+            f"indexed {new * 1000:6.2f} ms ({base / new:.0f}x)"
+        )
+
+    events = make_turn(args.calls[0])
+    server = serve(events, args.interval)
+    chat = AvatarChat(f"http://127.0.0.1:{server.server_port}", "bench-key")
+    chat.session_id = "bench"
+
+    started_at = time.perf_counter()
+    available = []
+    for event in chat.chat_text_events("What's the weather in every city?"):
+        if event.type == "tool_call":
+            available.append(time.perf_counter() - started_at)
+    ended = time.perf_counter() - started_at
+    server.shutdown()
+
+    print(f"📡 Streamed turn with {args.calls[0]} tool calls ({ended:.2f}s)")
+    print(
+        f"   First call usable after {available[0] * 1000:.0f} ms (before: {ended * 1000:.0f} ms)"
+    )
+    print(f"   Last call usable after {available[-1] * 1000:.0f} ms")
+    print(f"   History entries: {len(chat.chat_history) - 1}")
+
+
+if __name__ == "__main__":
+    main()
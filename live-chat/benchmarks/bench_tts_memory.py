@@ -0,0 +1,159 @@
+# bench_tts_memory.py
+"""Peak-memory benchmark for TTS on a 5-minute passage
+
+Serves a synthetic 5-minute WAV from a local fake server, both as the
+base64 JSON document of /tts/ and as the raw stream of /streaming_tts/, and
+runs each client variant in its own process so peak RSS can be compared.
+
+Usage:
+    python benchmarks/bench_tts_memory.py
+    python benchmarks/bench_tts_memory.py --seconds 600
+"""
+
+import argparse
+import base64
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_RATE = 32000
+SESSION_ID = "bench"
+VARIANTS = {
+    "buffered (before)": "old-buffered",
+    "streaming (before)": "old-streaming",
+    "write_speech buffered": "new-buffered",
+    "write_speech streaming": "new-streaming",
+}
+
+
+def make_wav(seconds: int) -> bytes:
+    """Pseudo-random 16-bit mono WAV of the given length"""
+    import io
+    import wave
+
+    frames = os.urandom(2 * SAMPLE_RATE * seconds)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(frames)
+    return buffer.getvalue()
+
+
+def serve(audio: bytes) -> ThreadingHTTPServer:
+    tts_body = json.dumps({"audio": base64.b64encode(audio).decode("ascii")}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            body = audio if self.path.endswith("/streaming_tts/") else tts_body
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            for start in range(0, len(body), 65536):
+                self.wfile.write(body[start : start + 65536])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB
+
+    On Linux ru_maxrss carries over the parent's peak across fork/exec, so the
+    per-process high-water mark from /proc is used instead.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_variant(variant: str, api_server: str, save_path: str):
+    """Child process: run one client variant and print its peak RSS growth"""
+    import requests
+
+    from avatar_chat import AvatarChat
+
+    chat = AvatarChat(api_server, "bench-key")
+    chat.session_id = SESSION_ID
+    session_url = f"{api_server}/api/v1/session/{SESSION_ID}"
+    baseline = peak_rss_mb()
+
+    if variant == "old-buffered":
+        response = requests.post(f"{session_url}/tts/", json={"text": "passage"})
+        audio_data = base64.b64decode(response.json()["audio"])
+        with open(save_path, "wb") as f:
+            f.write(audio_data)
+    elif variant == "old-streaming":
+        response = requests.post(
+            f"{session_url}/streaming_tts/", json={"text": "passage"}, stream=True
+        )
+        audio_chunks = []
+        for chunk in response.iter_content(chunk_size=4096):
+            if chunk:
+                audio_chunks.append(chunk)
+        audio_data = b"".join(audio_chunks)
+        with open(save_path, "wb") as f:
+            f.write(audio_data)
+    elif variant == "new-buffered":
+        chat.write_speech("passage", save_path)
+    elif variant == "new-streaming":
+        chat.write_speech("passage", save_path, streaming=True)
+
+    print(json.dumps({"peak_growth_mb": peak_rss_mb() - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS peak memory benchmark")
+    parser.add_argument("--seconds", type=int, default=300, help="Passage length")
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    parser.add_argument("--api-server", help=argparse.SUPPRESS)
+    parser.add_argument("--save-path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.api_server, args.save_path)
+        return
+
+    audio = make_wav(args.seconds)
+    server = serve(audio)
+    api_server = f"http://127.0.0.1:{server.server_port}"
+    print(f"🎵 Passage: {args.seconds}s, {len(audio) / 1e6:.1f} MB of audio")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        save_path = os.path.join(tmp_dir, "passage.wav")
+        for label, variant in VARIANTS.items():
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--variant", variant]
+                + ["--api-server", api_server, "--save-path", save_path],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            assert os.path.getsize(save_path) == len(audio), "Audio mismatch"
+            print(f"📈 {label:<24} peak RSS +{result['peak_growth_mb']:7.1f} MB")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# bench_vad.py
+"""Hands-free endpointing on recorded WAV fixtures
+
+Replays each WAV as microphone input in real time, lets the VAD end the turn
+and sends the detected utterance to a local fake /stt/ endpoint. Reports where
+speech was detected, the endpointing delay, the STT latency and how much of
+the recording was uploaded. Without arguments a synthetic utterance (noise,
+tone, trailing silence) is used.
+
+Usage:
+    python benchmarks/bench_vad.py
+    python benchmarks/bench_vad.py fixtures/*.wav --trailing-silence-ms 500
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_capture import WavFileSource  # noqa: E402
+from avatar_chat import AvatarChat  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def make_fixture(path: str, lead: float = 0.6, speech: float = 1.5, tail: float = 2.0):
+    """Low background noise, a 'spoken' tone with a syllable envelope, silence"""
+    random.seed(0)
+    samples = []
+    total = int((lead + speech + tail) * SAMPLE_RATE)
+    for i in range(total):
+        t = i / SAMPLE_RATE
+        value = random.gauss(0, 60)  # About -55 dBFS of noise
+        if lead <= t < lead + speech:
+            envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 4 * (t - lead))
+            value += 9000 * envelope * math.sin(2 * math.pi * 180 * t)
+        samples.append(max(-32768, min(32767, int(value))))
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+
+
+def serve_stt(seconds_per_audio_second: float = 0.1) -> ThreadingHTTPServer:
+    """Fake /stt/ whose processing time grows with the uploaded audio"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self._reply({"status": "IN_PROGRESS"})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            audio_seconds = len(body) / (2 * SAMPLE_RATE)
+            time.sleep(audio_seconds * seconds_per_audio_second)
+            self._reply({"text": f"{audio_seconds:.2f}s of audio"})
+
+        def _reply(self, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_turn(chat: AvatarChat, path: str) -> dict:
+    source = WavFileSource(path)
+    started_at = time.time()
+    audio_data = chat.record_until_silence(source)
+    recorded = time.time() - started_at
+    if audio_data is None:
+        return {"file": path, "speech": False}
+
+    stt_started = time.time()
+    chat.recognize_speech(audio_data)
+    with wave.open(io.BytesIO(audio_data), "rb") as wf:
+        uploaded = wf.getnframes() / wf.getframerate()
+    with wave.open(path, "rb") as wf:
+        total = wf.getnframes() / wf.getframerate()
+    return {
+        "file": path,
+        "speech": True,
+        "recorded": recorded,
+        "total": total,
+        "uploaded": uploaded,
+        "endpointing_delay": chat.endpointing_delay,
+        "stt_latency": time.time() - stt_started,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hands-free endpointing benchmark")
+    parser.add_argument("fixtures", nargs="*", help="16-bit WAV files")
+    parser.add_argument("--trailing-silence-ms", type=int, default=700)
+    parser.add_argument("--vad-threshold-db", type=float, default=-40.0)
+    args = parser.parse_args()
+
+    server = serve_stt()
+    chat = AvatarChat(f"http://127.0.0.1:{server.server_port}", "bench-key")
+    chat.session_id = "bench"
+    chat.trailing_silence_ms = args.trailing_silence_ms
+    chat.vad_threshold_db = args.vad_threshold_db
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fixtures = args.fixtures
+        if not fixtures:
+            fixtures = [os.path.join(tmp_dir, "synthetic.wav")]
+            make_fixture(fixtures[0])
+        results = [run_turn(chat, path) for path in fixtures]
+
+    server.shutdown()
+    print()
+    for result in results:
+        name = os.path.basename(result["file"])
+        if not result["speech"]:
+            print(f"🔇 {name}: no speech detected")
+            continue
+        print(
+            f"📊 {name}: turn ended after {result['recorded']:.2f}s of "
+            f"{result['total']:.2f}s, uploaded {result['uploaded']:.2f}s, "
+            f"endpointing delay {result['endpointing_delay'] * 1000:.0f} ms, "
+            f"STT latency {result['stt_latency'] * 1000:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
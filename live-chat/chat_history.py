@@ -0,0 +1,218 @@
+# chat_history.py
+import json
+from collections import deque
+from typing import Callable, Optional
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators
+
+
+def dumps_compact(value) -> bytes:
+    """Serialize to compact UTF-8 JSON (no spaces, no \\u escapes)"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def estimate_tokens(encoded: bytes) -> int:
+    """Rough token estimate from a compact JSON encoding
+
+    ASCII text averages about four bytes per token; multi-byte characters
+    (Korean, Japanese) are closer to one token each.
+    """
+    multibyte_chars = (len(encoded) - len(encoded.decode("utf-8"))) // 2
+    ascii_bytes = len(encoded) - 3 * multibyte_chars
+    return ascii_bytes // 4 + multibyte_chars + MESSAGE_OVERHEAD_TOKENS
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Rough token estimate of plain text (no message overhead)"""
+    return estimate_tokens(text.encode("utf-8")) - MESSAGE_OVERHEAD_TOKENS
+
+
+def extractive_summary(
+    previous: str, dropped: list[dict], max_chars: int = 1500
+) -> str:
+    """Fold dropped messages into a running summary without calling a model"""
+    lines = [previous] if previous else []
+    for message in dropped:
+        content = message.get("content")
+        if message.get("role") in ("user", "assistant") and content:
+            lines.append(f"- {message['role']}: {content[:200]}")
+    return "\n".join(lines)[-max_chars:]
+
+
+class ChatHistory:
+    """Client-side chat history for LLM v2 with a token/byte budget
+
+    The full conversation is kept for display, but only a sliding window of
+    recent messages is sent to the server. Messages are evicted from the front
+    one turn at a time (a user message with its assistant reply, tool calls
+    and tool results), so tool-call and tool messages are never separated.
+    Evicted turns can optionally be folded into a summary that is sent as a
+    system message at the start of the window; the summary is limited to
+    summary_ratio of the budget.
+
+    Each message is serialized once when it is added, so building the request
+    payload only joins pre-encoded bytes.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        summarizer: Optional[Callable[[str, list[dict]], str]] = None,
+        summary_ratio: float = 0.25,
+    ):
+        self.max_tokens = max_tokens
+        self.max_bytes = max_bytes
+        self.summarizer = summarizer
+        self.summary_ratio = summary_ratio
+        self.summary = ""
+
+        self.messages: list[dict] = []  # Full conversation
+        self.window_start = 0  # Index of the first message sent to the server
+        self.evicted_count = 0
+        # Optional SessionStore that records every change (session resume)
+        self.log = None
+
+        # Window bookkeeping: [start index, tokens, bytes] per turn
+        self._units: deque[list[int]] = deque()
+        self._encoded: list[Optional[bytes]] = []
+        self._window_tokens = 0
+        self._window_bytes = 0
+        self._summary_encoded = b""
+        self._summary_tokens = 0
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def __getitem__(self, index):
+        return self.messages[index]
+
+    def append(self, message: dict):
+        encoded = dumps_compact(message)
+        tokens = estimate_tokens(encoded)
+
+        if message.get("role") in ("assistant", "tool") and self._units:
+            # Replies and tool results stay with the user message they answer
+            unit = self._units[-1]
+            unit[1] += tokens
+            unit[2] += len(encoded)
+        else:
+            self._units.append([len(self.messages), tokens, len(encoded)])
+
+        self.messages.append(message)
+        self._encoded.append(encoded)
+        self._window_tokens += tokens
+        self._window_bytes += len(encoded)
+        if self.log is not None:
+            self.log.append_message(encoded)
+        self._enforce_budget()
+
+    def replace_last(self, message: dict):
+        """Replace the newest message, e.g. with the part of a reply actually heard"""
+        encoded = dumps_compact(message)
+        tokens = estimate_tokens(encoded) - estimate_tokens(self._encoded[-1])
+        size = len(encoded) - len(self._encoded[-1])
+
+        unit = self._units[-1]  # The newest turn is never evicted
+        unit[1] += tokens
+        unit[2] += size
+        self.messages[-1] = message
+        self._encoded[-1] = encoded
+        self._window_tokens += tokens
+        self._window_bytes += size
+        if self.log is not None:
+            self.log.replace_last(message)
+
+    def pop(self) -> dict:
+        """Remove and return the newest message"""
+        encoded = self._encoded.pop()
+        tokens = estimate_tokens(encoded)
+        unit = self._units[-1]
+        if unit[0] == len(self.messages) - 1:
+            self._units.pop()  # It was the only message of its turn
+        else:
+            unit[1] -= tokens
+            unit[2] -= len(encoded)
+        self._window_tokens -= tokens
+        self._window_bytes -= len(encoded)
+        if self.log is not None:
+            self.log.pop()
+        return self.messages.pop()
+
+    def extend(self, messages: list[dict]):
+        for message in messages:
+            self.append(message)
+
+    def window(self) -> list[dict]:
+        """Messages that will be sent on the next request"""
+        messages = self.messages[self.window_start :]
+        if self.summary:
+            return [self._summary_message()] + messages
+        return messages
+
+    def build_payload(self, tools: list) -> bytes:
+        """Compact JSON body for the /llm/v2/ endpoint"""
+        encoded = self._encoded[self.window_start :]
+        if self._summary_encoded:
+            encoded = [self._summary_encoded] + encoded
+        return (
+            b'{"messages":['
+            + b",".join(encoded)
+            + b'],"tools":'
+            + dumps_compact(tools)
+            + b"}"
+        )
+
+    def _over_budget(self) -> bool:
+        tokens = self._window_tokens + self._summary_tokens
+        size = self._window_bytes + len(self._summary_encoded)
+        return (self.max_tokens is not None and tokens > self.max_tokens) or (
+            self.max_bytes is not None and size > self.max_bytes
+        )
+
+    def _enforce_budget(self):
+        # Always keep the newest turn, even if it alone exceeds the budget
+        while len(self._units) > 1 and self._over_budget():
+            start, tokens, size = self._units.popleft()
+            end = self._units[0][0]
+            for index in range(start, end):
+                self._encoded[index] = None  # No longer sent, free the encoding
+            self._window_tokens -= tokens
+            self._window_bytes -= size
+            self.window_start = end
+            self.evicted_count += end - start
+
+            if self.summarizer:
+                self._set_summary(
+                    self.summarizer(self.summary, self.messages[start:end])
+                )
+
+    def _set_summary(self, summary: str):
+        while True:
+            self.summary = summary
+            if not summary:
+                # Nothing to send: no summary message in window() or the payload
+                self._summary_encoded = b""
+                self._summary_tokens = 0
+                return
+            self._summary_encoded = dumps_compact(self._summary_message())
+            self._summary_tokens = estimate_tokens(self._summary_encoded)
+            if not self._summary_over_budget():
+                return
+            summary = summary[len(summary) // 4 + 1 :]  # Drop the oldest quarter
+
+    def _summary_over_budget(self) -> bool:
+        return (
+            self.max_tokens is not None
+            and self._summary_tokens > self.max_tokens * self.summary_ratio
+        ) or (
+            self.max_bytes is not None
+            and len(self._summary_encoded) > self.max_bytes * self.summary_ratio
+        )
+
+    def _summary_message(self) -> dict:
+        return {"role": "system", "content": SUMMARY_PREFIX + self.summary}
@@ -0,0 +1,254 @@
+# llm_stream.py
+import json
+import statistics
+import time
+from typing import Callable, Optional
+
+
+class ContentDelta:
+    """A piece of the assistant's reply text"""
+
+    type = "content"
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __repr__(self):
+        return f"ContentDelta({self.text!r})"
+
+
+class ToolCall:
+    """A complete tool call requested by the model"""
+
+    type = "tool_call"
+
+    def __init__(self, tool_call: dict):
+        self.tool_call = tool_call  # Assembled from the stream: id, type, function
+        self.id = tool_call.get("id")
+
+    @property
+    def name(self) -> Optional[str]:
+        return (self.tool_call.get("function") or {}).get("name")
+
+    @property
+    def arguments(self) -> Optional[dict]:
+        """The decoded JSON arguments, or None if they do not parse"""
+        function = self.tool_call.get("function") or {}
+        try:
+            return json.loads(function.get("arguments") or "{}")
+        except ValueError:
+            return None
+
+    def __repr__(self):
+        return f"ToolCall({self.id!r})"
+
+
+class ToolResult:
+    """The result of a tool call executed on the server"""
+
+    type = "tool_result"
+
+    def __init__(self, tool_call_id: str, content: str):
+        self.tool_call_id = tool_call_id
+        self.content = content
+
+    def __repr__(self):
+        return f"ToolResult({self.tool_call_id!r})"
+
+
+class StreamError:
+    """An error event inside an otherwise successful stream"""
+
+    type = "error"
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+    def __repr__(self):
+        return f"StreamError({self.reason!r})"
+
+
+def parse_llm_event(data: dict, tool_calls: "ToolCallAssembler") -> list:
+    """Typed events carried by one decoded /llm/ stream event
+
+    Tool call fragments are merged into tool_calls; a ToolCall event is only
+    produced once a call is complete.
+    """
+    if data.get("status") != "success":
+        return [StreamError(data.get("reason", "Unknown error"))]
+
+    events: list = []
+    for fragment in data.get("tool_calls") or []:
+        events += tool_calls.add_call(fragment)
+    content = data.get("content", "")
+    if data.get("tool_call_id"):
+        events += tool_calls.add_result(data["tool_call_id"], content)
+    elif content:
+        events.append(ContentDelta(content))
+    if data.get("finish_reason"):
+        events += tool_calls.finish()
+    return events
+
+
+class TokenTimer:
+    """Time-to-first-token and inter-token latency of one LLM call
+
+    Arrival times are taken when a content delta is parsed, so deltas that
+    arrive in the same network read have a zero gap between them.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()  # Request sent
+        self.first_token_at: Optional[float] = None
+        self.tokens = 0
+        self.gaps: list[float] = []
+        self._last_token_at: Optional[float] = None
+
+    def token(self):
+        now = time.perf_counter()
+        if self._last_token_at is None:
+            self.first_token_at = now
+        else:
+            self.gaps.append(now - self._last_token_at)
+        self._last_token_at = now
+        self.tokens += 1
+
+    def summary(self) -> dict:
+        """Latencies in seconds; None when there were too few tokens"""
+        gaps = self.gaps
+        return {
+            "tokens": self.tokens,
+            "time_to_first_token": (
+                self.first_token_at - self.started_at
+                if self.first_token_at is not None
+                else None
+            ),
+            "inter_token_mean": statistics.fmean(gaps) if gaps else None,
+            "inter_token_p95": (
+                statistics.quantiles(gaps, n=100)[94] if len(gaps) >= 2 else None
+            ),
+            "total": time.perf_counter() - self.started_at,
+        }
+
+
+def format_token_timings(timings: dict) -> str:
+    """One-line summary of TokenTimer.summary()"""
+    if timings["time_to_first_token"] is None:
+        return f"⏱️  LLM: no content in {timings['total']:.2f}s"
+    text = f"⏱️  LLM: first token {timings['time_to_first_token']:.2f}s"
+    if timings["inter_token_mean"] is not None:
+        text += f", inter-token mean {timings['inter_token_mean'] * 1000:.1f} ms"
+    if timings["inter_token_p95"] is not None:
+        text += f", p95 {timings['inter_token_p95'] * 1000:.1f} ms"
+    return text + f", {timings['tokens']} deltas in {timings['total']:.2f}s"
+
+
+class ToolCallAssembler:
+    """Tool calls and their results of one turn, assembled as they stream in
+
+    Call fragments are merged by their index (by id when the server sends no
+    index), so a call whose arguments stream in pieces stays one call. A call
+    is complete once a later call starts, a tool result arrives, the model
+    reports a finish_reason or finish() is called at the end of the stream.
+    Each complete call is returned once as a ToolCall event and passed to
+    on_tool_call, a local executor; a string it returns is recorded as the
+    call's result. Results are indexed by tool_call_id, and the v2 history
+    entries are built in a single pass once the stream ends.
+    """
+
+    def __init__(
+        self, on_tool_call: Optional[Callable[[ToolCall], Optional[str]]] = None
+    ):
+        self.on_tool_call = on_tool_call
+        self.calls: dict = {}  # Index (or id) -> call, in the order the model made them
+        self.results: dict[str, dict] = {}
+        self._open: list = []  # Keys of calls not yet complete
+
+    def __bool__(self) -> bool:
+        return bool(self.calls)
+
+    def add_call(self, fragment: dict) -> list:
+        """Merge a streamed tool call fragment; returns the events of calls it completed"""
+        key = fragment.get("index")
+        if key is None:
+            key = fragment.get("id")
+        if key is None:
+            key = next(reversed(self.calls), 0)  # Continues the latest call
+
+        call = self.calls.get(key)
+        if call is None:
+            # Calls stream one after another: a new one completes the others
+            events = self._complete() if self._open else []
+            call = dict(fragment)
+            call.pop("index", None)
+            call["function"] = dict(fragment.get("function") or {})
+            self.calls[key] = call
+            self._open.append(key)
+            return events
+
+        if fragment.get("id") and not call.get("id"):
+            call["id"] = fragment["id"]
+        function = fragment.get("function") or {}
+        target = call.setdefault("function", {})
+        if function.get("name") and not target.get("name"):
+            target["name"] = function["name"]
+        if function.get("arguments"):
+            target["arguments"] = target.get("arguments", "") + function["arguments"]
+        return []
+
+    def add_result(self, tool_call_id: str, content: str) -> list:
+        """Record a tool result; the model has finished its calls by then"""
+        events = self._complete() if self._open else []
+        self._store_result(tool_call_id, content)
+        events.append(ToolResult(tool_call_id, content))
+        return events
+
+    def finish(self) -> list:
+        """Events of the calls still open when the model or the stream ends"""
+        return self._complete()
+
+    def _complete(self) -> list:
+        events = []
+        keys, self._open = self._open, []
+        for key in keys:
+            call = self.calls[key]
+            event = ToolCall({**call, "function": dict(call.get("function") or {})})
+            events.append(event)
+            if self.on_tool_call is None:
+                continue
+            content = self.on_tool_call(event)
+            if content is not None and event.id not in self.results:
+                self._store_result(event.id, content)
+                events.append(ToolResult(event.id, content))
+        return events
+
+    def _store_result(self, tool_call_id: str, content: str):
+        self.results[tool_call_id] = {
+            "role": "tool",
+            "content": content,
+            "tool_call_id": tool_call_id,
+        }
+
+    def pending(self) -> list[str]:
+        """Ids of calls that have no result yet"""
+        return [
+            call.get("id")
+            for call in self.calls.values()
+            if call.get("id") not in self.results
+        ]
+
+    def history(self) -> list[dict]:
+        """The v2 history entries: the assistant tool_calls message, then one
+        tool message per call in call order (a placeholder if none arrived)"""
+        calls = list(self.calls.values())
+        entries = [{"role": "assistant", "tool_calls": calls}]
+        for tool_call_id in (call.get("id") for call in calls):
+            entries.append(
+                self.results.get(tool_call_id)
+                or {
+                    "role": "tool",
+                    "content": "Tool execution completed",
+                    "tool_call_id": tool_call_id,
+                }
+            )
+        return entries
@@ -2,7 +2,11 @@ import argparse
 import os
 import time
 
+from audio_capture import WavFileSource
 from avatar_chat import AUDIO_AVAILABLE, AvatarChat
+from chat_history import ChatHistory, extractive_summary
+from session_store import SessionStore
+from tts_cache import TTSCache
 
 
 def parse_arguments():
@@ -23,6 +27,30 @@ Examples:
   
   # Specify capabilities
   python main.py --capability LLM TTS STT
+
+  # Start speaking the reply while it is still generating
+  python main.py --pipelined-tts --tts-workers 3
+
+  # Voice chat from a recorded WAV instead of the microphone
+  python main.py --input-wav question.wav
+
+  # Hands-free voice chat: the turn ends after 0.5s of silence
+  python main.py --hands-free --trailing-silence-ms 500
+
+  # Interrupt the avatar by talking over it (headphones recommended)
+  python main.py --hands-free --barge-in
+
+  # Kiosk: after a crash or restart, reattach to the running session and its history
+  python main.py --state-file kiosk-session.jsonl
+
+  # Use the OS audio player instead of in-process playback
+  python main.py --os-player
+
+  # Pre-synthesize expected phrases right after the session starts
+  python main.py --phrasebook "Hello! How can I help you?" "One moment please."
+
+  # Keep long sessions fast: send at most ~2000 tokens of history per turn
+  python main.py --history-max-tokens 2000 --history-summary
   
   # Check available settings
   python main.py --list-settings llm_type
@@ -98,6 +126,116 @@ Examples:
         help="Text normalization locale (optional)",
     )
 
+    # Voice Pipeline
+    parser.add_argument(
+        "--pipelined-tts",
+        action="store_true",
+        help="Stream LLM sentences into TTS and start playback on the first sentence (voice chat)",
+    )
+    parser.add_argument(
+        "--tts-workers",
+        type=int,
+        default=3,
+        help="Maximum concurrent TTS requests in pipelined mode (default: 3)",
+    )
+
+    # Chat History (LLM v2)
+    parser.add_argument(
+        "--history-max-tokens",
+        type=int,
+        help="Estimated token budget for the history sent on each turn (default: unlimited)",
+    )
+    parser.add_argument(
+        "--history-max-bytes",
+        type=int,
+        help="Byte budget for the history sent on each turn (default: unlimited)",
+    )
+    parser.add_argument(
+        "--history-summary",
+        action="store_true",
+        help="Fold turns that leave the history window into a short summary",
+    )
+
+    # TTS Cache
+    parser.add_argument(
+        "--tts-cache-dir",
+        help="Directory for the on-disk TTS audio cache (default: memory only)",
+    )
+    parser.add_argument(
+        "--tts-cache-memory-mb",
+        type=int,
+        default=32,
+        help="In-memory TTS cache size in MB, 0 to disable caching (default: 32)",
+    )
+    parser.add_argument(
+        "--tts-cache-disk-mb",
+        type=int,
+        default=512,
+        help="On-disk TTS cache size in MB (default: 512)",
+    )
+
+    # Capture
+    parser.add_argument(
+        "--input-wav",
+        help="Replay this 16-bit WAV file as microphone input for voice chat",
+    )
+
+    parser.add_argument(
+        "--hands-free",
+        action="store_true",
+        help="End voice turns automatically when you stop speaking (VAD)",
+    )
+    parser.add_argument(
+        "--trailing-silence-ms",
+        type=int,
+        default=700,
+        help="Silence that ends a hands-free turn (default: 700)",
+    )
+    parser.add_argument(
+        "--vad-threshold-db",
+        type=float,
+        default=-40.0,
+        help="Minimum speech energy in dBFS for the VAD (default: -40)",
+    )
+    parser.add_argument(
+        "--barge-in",
+        action="store_true",
+        help="Stop the reply as soon as you start talking over it (voice chat)",
+    )
+    parser.add_argument(
+        "--barge-in-threshold-db",
+        type=float,
+        default=-30.0,
+        help="Speech energy in dBFS that interrupts the reply (default: -30)",
+    )
+
+    # Playback
+    parser.add_argument(
+        "--os-player",
+        action="store_true",
+        help="Play audio with the OS player (afplay/aplay) instead of in-process",
+    )
+    parser.add_argument(
+        "--jitter-buffer-ms",
+        type=int,
+        default=80,
+        help="Audio buffered before in-process playback starts (default: 80)",
+    )
+
+    # Phrasebook
+    parser.add_argument(
+        "--phrasebook",
+        nargs="+",
+        default=[],
+        help="Phrases to pre-synthesize in the background after the session starts",
+    )
+
+    # Session resume
+    parser.add_argument(
+        "--state-file",
+        help="Save the session and chat history here and resume them after a restart",
+    )
+
     # Settings Query
     parser.add_argument(
         "--list-settings",
@@ -123,6 +261,8 @@ def print_menu():
 
 
 def main():
+    started_at = time.time()
+
     # Parse command line arguments
     args = parse_arguments()
 
@@ -154,46 +294,84 @@ def main():
     print(f"🔗 API Server: {args.api_server}")
     print("=" * 50)
 
-    # Initialize avatar chat instance (but don't create session yet)
-    chat = AvatarChat(args.api_server, API_KEY)
+    # Initialize avatar chat instance
+    history = ChatHistory(
+        max_tokens=args.history_max_tokens,
+        max_bytes=args.history_max_bytes,
+        summarizer=extractive_summary if args.history_summary else None,
+    )
+    tts_cache = None
+    if args.tts_cache_memory_mb > 0:
+        tts_cache = TTSCache(
+            memory_max_bytes=args.tts_cache_memory_mb * 1024 * 1024,
+            disk_dir=args.tts_cache_dir,
+            disk_max_bytes=args.tts_cache_disk_mb * 1024 * 1024,
+        )
+    chat = AvatarChat(
+        args.api_server,
+        API_KEY,
+        history=history,
+        tts_cache=tts_cache,
+        phrases=args.phrasebook,
+        in_process_playback=not args.os_player,
+        jitter_buffer_ms=args.jitter_buffer_ms,
+    )
+    if args.input_wav:
+        chat.capture_source = WavFileSource(args.input_wav)
+    chat.trailing_silence_ms = args.trailing_silence_ms
+    chat.vad_threshold_db = args.vad_threshold_db
+    chat.barge_in_threshold_db = args.barge_in_threshold_db
+    # One long-lived session that idles between turns: keep its status fresh
+    chat.background_status_refresh = True
+
+    print(f"🤖 LLM Type: {args.llm_type}")
+    print(f"🔊 TTS Type: {args.tts_type}")
+    print(f"🎤 STT Type: {args.stt_type}")
+    print(f"👤 Model Style: {args.model_style}")
+    print(f"📝 Prompt ID: {args.prompt}")
+    if args.document:
+        print(f"📄 Document ID: {args.document}")
+    print(f"📝 Text Normalization Config: {args.text_normalization_config}")
+    print(f"📝 Text Normalization Locale: {args.text_normalization_locale}")
+    print(f"⚡ Capabilities: {', '.join(args.capability)}")
+    print("=" * 50)
+
+    # Create and start the session while the menu is shown
+    store = SessionStore(args.state_file) if args.state_file else None
+    session_future = chat.open_session_in_background(
+        store=store,
+        llm_type=args.llm_type,
+        tts_type=args.tts_type,
+        stt_type=args.stt_type,
+        model_style=args.model_style,
+        prompt=args.prompt,
+        document=args.document,
+        capability=args.capability,
+        agent=args.agent,
+        mcp_servers=args.mcp_servers,
+        tools=args.tools,
+        text_normalization_config=args.text_normalization_config,
+        text_normalization_locale=args.text_normalization_locale,
+    )
     session_created = False
+    exited = False
 
     try:
         while True:
             print_menu()
             choice = input("Choose option (1-7): ").strip()
 
-            # For options that need Python session, create it if not exists
+            # For options that need Python session, wait for the one being started
             if choice in ["1", "2", "3", "4", "6"] and not session_created:
-                print(f"🤖 LLM Type: {args.llm_type}")
-                print(f"🔊 TTS Type: {args.tts_type}")
-                print(f"🎤 STT Type: {args.stt_type}")
-                print(f"👤 Model Style: {args.model_style}")
-                print(f"📝 Prompt ID: {args.prompt}")
-                if args.document:
-                    print(f"📄 Document ID: {args.document}")
-                print(f"📝 Text Normalization Config: {args.text_normalization_config}")
-                print(f"📝 Text Normalization Locale: {args.text_normalization_locale}")
-                print(f"⚡ Capabilities: {', '.join(args.capability)}")
-                print("=" * 50)
-
-                # Create and start session
-                chat.create_session(
-                    llm_type=args.llm_type,
-                    tts_type=args.tts_type,
-                    stt_type=args.stt_type,
-                    model_style=args.model_style,
-                    prompt=args.prompt,
-                    document=args.document,
-                    capability=args.capability,
-                    agent=args.agent,
-                    mcp_servers=args.mcp_servers,
-                    tools=args.tools,
-                    text_normalization_config=args.text_normalization_config,
-                    text_normalization_locale=args.text_normalization_locale,
-                )
-                chat.start_session()
+                if not session_future.done():
+                    print("⏳ Waiting for the session to start...")
+                waited_from = time.time()
+                ready_at = session_future.result()
                 session_created = True
+                print(
+                    f"⏱️  Startup to session ready: {ready_at - started_at:.2f}s "
+                    f"(waited {max(0.0, ready_at - waited_from):.2f}s)"
+                )
                 print("✅ Ready! Start chatting with the avatar.")
 
             if choice == "1":
@@ -214,12 +392,11 @@ def main():
                         )
                         if tts_choice == "y":
                             tts_file = f"ai_response_{int(time.time())}.wav"
-                            chat.generate_speech(ai_response, tts_file)
-                            chat.play_audio(tts_file)
+                            chat.speak(ai_response, tts_file)
 
             elif choice == "2":
                 # Voice chat
-                if not AUDIO_AVAILABLE:
+                if not AUDIO_AVAILABLE and not args.input_wav:
                     print(
                         "❌ pyaudio is not installed, voice features are unavailable."
                     )
@@ -230,7 +407,12 @@ def main():
                 print("Press Enter below to start recording.")
                 input("Press Enter when ready...")
 
-                ai_response = chat.voice_chat()
+                ai_response = chat.voice_chat(
+                    pipelined=args.pipelined_tts,
+                    max_tts_workers=args.tts_workers,
+                    hands_free=args.hands_free,
+                    barge_in=args.barge_in,
+                )
                 if ai_response:
                     print("\n✅ Chat completed!")
 
@@ -245,8 +427,7 @@ def main():
 
                     # Generate TTS
                     tts_file = f"ai_response_{int(time.time())}.wav"
-                    chat.generate_speech(ai_response, tts_file)
-                    chat.play_audio(tts_file)
+                    chat.speak(ai_response, tts_file)
 
                 except Exception as e:
                     print(f"❌ Error: {e}")
@@ -323,6 +504,7 @@ def main():
             elif choice == "7":
                 # Exit
                 print("\n👋 Exiting program.")
+                exited = True
                 break
 
             else:
@@ -333,12 +515,27 @@ def main():
     except Exception as e:
         print(f"\n❌ Error occurred: {e}")
     finally:
-        # Clean up session only if it was created
-        if session_created:
-            chat.end_session()
-            print("🧹 Resource cleanup completed")
-        else:
+        # The session may still be starting; end it once it exists
+        try:
+            session_future.result()
+        except Exception:
             print("🧹 No session to clean up")
+        else:
+            if store is not None and not exited:
+                # Interrupted or crashed: keep the session for the next run
+                store.close()
+                print(
+                    "💾 Session left running; start again with the same "
+                    "--state-file to resume it"
+                )
+            else:
+                chat.end_session()
+                if store is not None:
+                    store.clear()
+                print("🧹 Resource cleanup completed")
+        if tts_cache:
+            print(f"⚡ TTS cache: {tts_cache.summary()}")
+        chat.close_player()
 
     return 0
 
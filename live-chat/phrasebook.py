@@ -0,0 +1,75 @@
+# phrasebook.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+
+class PhrasebookWarmup:
+    """Pre-synthesize expected phrases in the background after session start
+
+    The first utterances of a session (greeting, "one moment please",
+    fallbacks) are synthesized concurrently on a small worker pool and kept in
+    memory for the lifetime of the session. Lookups never wait for the warmup:
+    a phrase that is not ready yet is simply synthesized on demand.
+    """
+
+    def __init__(self, chat, phrases: list[str], max_workers: int = 2):
+        self.chat = chat
+        self.phrases = list(dict.fromkeys(p for p in phrases if p))  # Dedupe
+        self.max_workers = max_workers
+        self.audio: dict[str, bytes] = {}
+        self.failed: list[str] = []
+        self.elapsed: Optional[float] = None
+
+        self._cancelled = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start warming up without blocking the caller"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Stop the warmup; phrases already synthesized stay available"""
+        self._cancelled.set()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get(self, text: str) -> Optional[bytes]:
+        return self.audio.get(text)
+
+    @property
+    def done(self) -> bool:
+        return self._thread is not None and not self._thread.is_alive()
+
+    def _run(self):
+        started_at = time.time()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for phrase in self.phrases:
+                if self._cancelled.is_set():
+                    break
+                try:
+                    self._executor.submit(self._synthesize, phrase)
+                except RuntimeError:
+                    break  # Cancelled while submitting
+        finally:
+            self._executor.shutdown(wait=True)
+        self.elapsed = time.time() - started_at
+
+        if not self._cancelled.is_set():
+            print(
+                f"\n🔥 Phrasebook ready: {len(self.audio)}/{len(self.phrases)} phrases "
+                f"in {self.elapsed:.2f}s"
+            )
+
+    def _synthesize(self, phrase: str):
+        if self._cancelled.is_set():
+            return
+        try:
+            self.audio[phrase] = self.chat.synthesize_speech(phrase)
+        except Exception as e:
+            self.failed.append(phrase)
+            print(f"\n⚠️  Phrasebook warmup failed for {phrase!r}: {e}")
@@ -0,0 +1,231 @@
+# session_pool.py
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from avatar_chat import AvatarChat
+
+
+def config_key(session_kwargs: dict) -> tuple:
+    """Hashable key of create_session arguments"""
+    return tuple(
+        sorted(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in session_kwargs.items()
+            if value is not None
+        )
+    )
+
+
+class SessionPool:
+    """Keep started sessions ready so a conversation can begin immediately
+
+    For each configuration (the create_session arguments: llm_type, tts_type,
+    model_style, prompt, ...) the pool keeps `size` sessions created, started
+    and IN_PROGRESS. checkout() hands out an idle one without any round trip
+    and a replacement is warmed in the background. A maintenance thread
+    health-checks idle sessions and retires terminated ones, and ones older
+    than max_idle_seconds, with end_session.
+
+    Warm sessions count against the active-session and per-session-minute
+    quotas while they wait, so keep size and max_idle_seconds small.
+    """
+
+    def __init__(
+        self,
+        api_server: str,
+        api_key: str,
+        size: int = 1,
+        max_idle_seconds: float = 300.0,
+        health_check_interval: float = 15.0,
+        max_workers: int = 4,
+        chat_factory: Optional[Callable[[], AvatarChat]] = None,
+    ):
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_interval = health_check_interval
+        self.chat_factory = chat_factory or (lambda: AvatarChat(api_server, api_key))
+
+        self.stats = {"hits": 0, "misses": 0, "created": 0, "retired": 0, "failed": 0}
+        self.checkout_latencies: list[float] = []
+
+        self._configs: dict[tuple, dict] = {}
+        self._idle: dict[tuple, deque] = {}  # key -> deque of (chat, ready_at)
+        self._warming: dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)  # A warmed session was added
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._closed = threading.Event()
+        self._maintenance = threading.Thread(target=self._maintain, daemon=True)
+        self._maintenance.start()
+
+    def warm(self, **session_kwargs):
+        """Register a configuration and start warming sessions for it"""
+        key = config_key(session_kwargs)
+        with self._lock:
+            self._configs.setdefault(key, session_kwargs)
+            self._idle.setdefault(key, deque())
+            self._warming.setdefault(key, 0)
+        self._replenish(key)
+
+    def checkout(self, timeout: Optional[float] = None, **session_kwargs) -> AvatarChat:
+        """Take a ready session
+
+        If none is idle but one is warming, waits for it (it is further along
+        than a new one would be); otherwise creates one on the spot. Raises
+        TimeoutError if no warming session is ready within timeout seconds.
+        """
+        started_at = time.time()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        key = config_key(session_kwargs)
+        self.warm(**session_kwargs)
+
+        chat = None
+        while chat is None:
+            with self._lock:
+                remaining = None
+                if deadline is not None:
+                    remaining = max(0.0, deadline - time.monotonic())
+                ready = self._ready.wait_for(
+                    lambda: self._idle[key] or not self._warming[key], remaining
+                )
+                if not ready:
+                    raise TimeoutError(f"No session ready within {timeout}s")
+                if not self._idle[key]:
+                    break
+                candidate, _ = self._idle[key].popleft()
+            if self._is_healthy(candidate):
+                chat = candidate
+            else:
+                self._executor.submit(self._retire, candidate)
+
+        if chat is not None:
+            self._count("hits")
+        else:
+            self._count("misses")
+            chat = self._create(session_kwargs)
+
+        self._replenish(key)
+        self.checkout_latencies.append(time.time() - started_at)
+        return chat
+
+    def release(self, chat: AvatarChat):
+        """Give back a checked-out session; it is ended, not reused
+
+        A used session carries conversation state, so it is retired instead
+        of being handed to the next user.
+        """
+        self._executor.submit(self._retire, chat)
+
+    def summary(self) -> str:
+        checkouts = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / checkouts if checkouts else 0.0
+        text = (
+            f"hit rate {hit_rate:.0%} ({self.stats['hits']}/{checkouts}), "
+            f"created {self.stats['created']}, retired {self.stats['retired']}"
+        )
+        if self.checkout_latencies:
+            median = statistics.median(self.checkout_latencies)
+            text += f", checkout p50 {median * 1000:.1f} ms"
+        if len(self.checkout_latencies) >= 2:
+            p95 = statistics.quantiles(self.checkout_latencies, n=100)[94]
+            text += f", p95 {p95 * 1000:.1f} ms"
+        return text
+
+    def close(self):
+        """End all idle sessions and stop warming"""
+        self._closed.set()
+        with self._lock:
+            idle = [chat for sessions in self._idle.values() for chat, _ in sessions]
+            for sessions in self._idle.values():
+                sessions.clear()
+        for chat in idle:
+            self._executor.submit(self._retire, chat)
+        self._executor.shutdown(wait=True)
+
+    def _create(self, session_kwargs: dict) -> AvatarChat:
+        chat = self.chat_factory()
+        chat.create_session(**session_kwargs)
+        chat.start_session()
+        chat.wait_for_session_ready()
+        self._count("created")
+        return chat
+
+    def _warm_one(self, key: tuple):
+        chat = None
+        try:
+            chat = self._create(self._configs[key])
+        except Exception as e:
+            self._count("failed")
+            print(f"⚠️  Session warmup failed: {e}")
+
+        with self._lock:
+            self._warming[key] -= 1
+            keep = chat is not None and not self._closed.is_set()
+            if keep:
+                self._idle[key].append((chat, time.time()))
+            self._ready.notify_all()
+        if chat is not None and not keep:
+            self._retire(chat)  # Pool closed while warming
+
+    def _replenish(self, key: tuple):
+        if self._closed.is_set():
+            return
+        with self._lock:
+            missing = self.size - len(self._idle[key]) - self._warming[key]
+            self._warming[key] += max(0, missing)
+        for _ in range(missing):
+            try:
+                self._executor.submit(self._warm_one, key)
+            except RuntimeError:
+                break  # Pool closed
+
+    def _retire(self, chat: AvatarChat):
+        try:
+            chat.end_session()
+        except Exception as e:
+            print(f"⚠️  Session end failed: {e}")
+        self._count("retired")
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    @staticmethod
+    def _is_healthy(chat: AvatarChat) -> bool:
+        try:
+            # Cached: only queries the server once the status lease has expired
+            return chat.get_session_status(cached=True) == "IN_PROGRESS"
+        except Exception:
+            return False
+
+    def _maintain(self):
+        while not self._closed.wait(self.health_check_interval):
+            with self._lock:
+                idle = {key: list(sessions) for key, sessions in self._idle.items()}
+
+            now = time.time()
+            retired = set()
+            for sessions in idle.values():
+                for chat, ready_at in sessions:
+                    expired = now - ready_at >= self.max_idle_seconds
+                    if expired or not self._is_healthy(chat):
+                        retired.add(id(chat))
+
+            with self._lock:
+                if self._closed.is_set():
+                    return  # close() retires the idle sessions
+                for key, sessions in self._idle.items():
+                    for chat, ready_at in list(sessions):
+                        if id(chat) in retired:
+                            sessions.remove((chat, ready_at))
+                            try:
+                                self._executor.submit(self._retire, chat)
+                            except RuntimeError:
+                                return  # Executor shut down by close()
+
+            for key in idle:
+                self._replenish(key)
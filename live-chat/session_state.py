@@ -0,0 +1,133 @@
+# session_state.py
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+ALIVE_STATUS = "IN_PROGRESS"
+FINAL_STATUSES = {"TERMINATED"}
+
+
+class SessionState:
+    """Cached session status with a short lease and background refresh
+
+    A status is trusted for lease_seconds after it was observed. Successful
+    STT/LLM/TTS responses count as observations of IN_PROGRESS (mark_alive),
+    so an active conversation never has to query the status endpoint. Once
+    the lease has expired, the next get() queries it again. Optionally
+    (start_refresh) a background thread refreshes the status shortly before
+    the lease runs out while the session is idle, so get() rarely blocks on
+    the network, at the cost of one polling thread per session.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], str],
+        lease_seconds: float = 10.0,
+        session_id: Optional[str] = None,
+    ):
+        self.fetch = fetch  # Queries the status endpoint
+        self.session_id = session_id
+        self.lease_seconds = lease_seconds
+        self.status: Optional[str] = None
+        self.updated_at = 0.0  # time.monotonic() of the last observation
+        self.fetches = 0
+
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def fresh(self) -> bool:
+        return (
+            self.status in FINAL_STATUSES
+            or time.monotonic() - self.updated_at < self.lease_seconds
+        )
+
+    def get(self) -> str:
+        """Status within the lease, fetching it only if the lease has expired"""
+        if self.status is not None and self.fresh:
+            return self.status
+        return self.refresh()
+
+    def refresh(self) -> str:
+        """Query the status endpoint now"""
+        status = self.fetch()
+        self.fetches += 1
+        self.update(status)
+        return status
+
+    def update(self, status: str):
+        with self._lock:
+            if self.status in FINAL_STATUSES:
+                return  # A terminated session never comes back
+            self.status = status
+            self.updated_at = time.monotonic()
+
+    def mark_alive(self):
+        """Record a successful API response as proof the session is running"""
+        self.update(ALIVE_STATUS)
+
+    def invalidate(self):
+        """Distrust the cached status, e.g. after a failed request"""
+        with self._lock:
+            self.updated_at = 0.0
+
+    def wait_until(
+        self,
+        status: str = ALIVE_STATUS,
+        timeout: float = 30.0,
+        initial_interval: float = 0.1,
+        max_interval: float = 2.0,
+    ) -> bool:
+        """Poll until the session reaches status, backing off adaptively
+
+        Polls quickly at first (sessions are often ready within a few hundred
+        milliseconds) and doubles the interval with jitter up to max_interval.
+        Returns False on timeout; raises if the session is terminated.
+        """
+        deadline = time.monotonic() + timeout
+        interval = initial_interval
+        while True:
+            try:
+                current = self.refresh()
+            except Exception as e:
+                print(f"⚠️  Error during status check: {e}")
+                current = None
+
+            if current == status:
+                return True
+            if current in FINAL_STATUSES:
+                raise Exception("Session has been terminated.")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, random.uniform(interval / 2, interval)))
+            interval = min(max_interval, interval * 2)
+
+    def start_refresh(self):
+        """Keep the cached status fresh from a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._thread.start()
+
+    def stop_refresh(self):
+        self._stopped.set()
+
+    def _refresh_loop(self):
+        while not self._stopped.is_set():
+            # Wake up shortly before the lease expires
+            expires_in = self.updated_at + self.lease_seconds - time.monotonic()
+            if self._stopped.wait(max(0.05, expires_in - 0.2 * self.lease_seconds)):
+                break
+            if time.monotonic() - self.updated_at < 0.8 * self.lease_seconds:
+                continue  # Renewed by API activity in the meantime
+            try:
+                if self.refresh() in FINAL_STATUSES:
+                    break
+            except Exception:
+                self.invalidate()
+                self._stopped.wait(self.lease_seconds)
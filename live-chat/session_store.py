@@ -0,0 +1,121 @@
+# session_store.py
+import json
+import os
+from typing import Optional
+
+from chat_history import dumps_compact
+
+
+class SessionStore:
+    """State file for reattaching to a session after a restart
+
+    The file is JSON Lines and append-only. The first record describes the
+    session (session_id, create_session arguments and LLM version). Every
+    later record is a v2 history change: a message as sent to the server, or
+    a {"op": "replace_last"} / {"op": "pop"} record when a reply is cut back.
+    Each change costs one small write. Records are written with os.write, so
+    they survive a crash of the process (not of the machine). The log is
+    rewritten compactly whenever a session is started or resumed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def load(self) -> Optional[dict]:
+        """The saved session with its history replayed, or None
+
+        Returns {"session_id", "config", "llm_version", "messages"}. A
+        partially written last record (the process died mid-write) is ignored.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                lines = f.read().split(b"\n")
+        except FileNotFoundError:
+            return None
+
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return None
+        if header.get("op") != "session":
+            return None
+
+        messages: list[dict] = []
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Empty or truncated line
+            op = record.get("op")
+            if op is None:
+                messages.append(record)
+            elif op == "replace_last" and messages:
+                messages[-1] = record["message"]
+            elif op == "pop" and messages:
+                messages.pop()
+
+        return {
+            "session_id": header["session_id"],
+            "config": header["config"],
+            "llm_version": header.get("llm_version", "v2"),
+            "messages": messages,
+        }
+
+    def start(
+        self,
+        session_id: str,
+        config: dict,
+        llm_version: str,
+        messages: Optional[list[dict]] = None,
+    ):
+        """Replace the file with a new session header (and history), then log to it"""
+        self.close()
+        header = {
+            "op": "session",
+            "session_id": session_id,
+            "config": config,
+            "llm_version": llm_version,
+        }
+        lines = [dumps_compact(header)]
+        lines.extend(dumps_compact(message) for message in messages or [])
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(b"\n".join(lines) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)  # Atomic: never a half-written header
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+
+    def append_message(self, encoded: bytes):
+        """Log a message already serialized with dumps_compact"""
+        self._write(encoded)
+
+    def replace_last(self, message: dict):
+        self._write(dumps_compact({"op": "replace_last", "message": message}))
+
+    def pop(self):
+        self._write(b'{"op":"pop"}')
+
+    def clear(self):
+        """Forget the saved session (it was ended)"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _write(self, record: bytes):
+        if self._fd is not None:
+            os.write(self._fd, record + b"\n")
+
+
+def normalize_config(session_kwargs: dict) -> dict:
+    """create_session arguments as they read back from the state file"""
+    return json.loads(dumps_compact(session_kwargs))
@@ -0,0 +1,132 @@
+# sse.py
+import json
+from typing import Optional
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    json_loads = json.loads
+    JSON_BACKEND = "json"
+
+JSON_ERRORS = (ValueError,)  # json.JSONDecodeError and orjson.JSONDecodeError
+
+
+def truncated(value: bytes, error: ValueError) -> bool:
+    """True if value is the start of a JSON object or array that ended early"""
+    if value.lstrip()[:1] not in (b"{", b"["):
+        return False
+    doc = getattr(error, "doc", None)
+    if not isinstance(doc, str):
+        return False
+    if getattr(error, "msg", "").startswith("Unterminated string"):
+        return True  # json reports where the string started
+    return error.pos >= len(doc.rstrip())
+
+
+class SSEDecoder:
+    """Incremental decoder for the LLM Server-Sent Events stream
+
+    Works on raw byte chunks as they come off the socket, so events may be
+    split anywhere, including inside a UTF-8 sequence. Each `data:` field is
+    parsed as JSON as soon as it is complete. The server does not always
+    separate events with a blank line, so a single `data:` line that already
+    holds a full JSON document is dispatched immediately; a payload spread over
+    several `data:` lines is joined with newlines until it parses or a blank
+    line ends the event. Only a value that is the cut-off start of a JSON
+    object or array is held back this way; other values that do not parse
+    (such as `[DONE]`) are skipped.
+    """
+
+    def __init__(self, loads=json_loads):
+        self.loads = loads
+        self._buffer = bytearray()
+        self._data = bytearray()  # Pending multi-line data field
+        self._has_data = False
+
+    def feed(self, chunk: bytes) -> list[dict]:
+        """Add a chunk of the response body and return the events it completed"""
+        buffer = self._buffer
+        buffer += chunk
+        events = []
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            line_end = end - 1 if end > start and buffer[end - 1] == 0x0D else end
+            self._process_line(buffer[start:line_end], events)
+            start = end + 1
+        if start:
+            del buffer[:start]
+        return events
+
+    def flush(self) -> list[dict]:
+        """Dispatch whatever is left once the stream has ended"""
+        events = []
+        if self._buffer:
+            line = bytes(self._buffer).rstrip(b"\r")
+            self._buffer.clear()
+            self._process_line(line, events)
+        self._dispatch(events)
+        return events
+
+    def _process_line(self, line, events: list[dict]):
+        if not line:
+            # Blank line ends the event
+            self._dispatch(events)
+            return
+        if not line.startswith(b"data:"):
+            return  # Comments, event names, ids and retry hints are not used
+
+        value = line[6:] if line[5:6] == b" " else line[5:]
+        if self._has_data:
+            self._data += b"\n"
+            self._data += value
+            try:
+                events.append(self.loads(self._data))
+            except JSON_ERRORS as e:
+                if truncated(self._data, e):
+                    return  # Still incomplete
+                self._reset()  # Not a continuation after all: parse it alone
+            else:
+                self._reset()
+                return
+
+        try:
+            events.append(self.loads(value))
+        except JSON_ERRORS as e:
+            if truncated(value, e):
+                # Start of a payload that continues on the next data line
+                self._data += value
+                self._has_data = True
+
+    def _dispatch(self, events: list[dict]):
+        if self._has_data:
+            try:
+                events.append(self.loads(self._data))
+            except JSON_ERRORS:
+                pass  # Incomplete or non-JSON payloads are skipped
+            self._reset()
+
+    def _reset(self):
+        self._data.clear()
+        self._has_data = False
+
+
+def iter_event_batches(chunks, decoder: Optional[SSEDecoder] = None):
+    """Decode an iterable of byte chunks, yielding the events of each chunk
+
+    Events are yielded per chunk so callers can flush output once per network
+    read rather than once per token.
+    """
+    decoder = decoder or SSEDecoder()
+    for chunk in chunks:
+        events = decoder.feed(chunk)
+        if events:
+            yield events
+    events = decoder.flush()
+    if events:
+        yield events
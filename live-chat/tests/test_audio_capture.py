@@ -0,0 +1,92 @@
+# test_audio_capture.py
+import os
+import random
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_capture import RingBuffer  # noqa: E402
+
+
+def stream(length: int, seed: int = 0) -> bytes:
+    return random.Random(seed).randbytes(length)
+
+
+def test_retains_the_newest_bytes_and_counts_drops():
+    data = stream(1000)
+    for capacity in (1, 7, 64, 999, 1000, 1001):
+        buffer = RingBuffer(capacity)
+        rng = random.Random(capacity)
+        written = 0
+        while written < len(data):
+            size = rng.randint(0, capacity * 2)  # Some writes exceed capacity
+            buffer.write(data[written : written + size])
+            written = min(len(data), written + size)
+            retained = data[max(0, written - capacity) : written]
+            assert buffer.getvalue() == retained
+            assert len(buffer) == len(retained)
+            assert buffer.dropped_bytes == written - len(retained)
+
+
+def test_offsets_count_from_the_start_even_after_drops():
+    buffer = RingBuffer(8)
+    data = stream(20)
+    buffer.write(data[:5])
+    buffer.write(data[5:])  # Larger than the buffer
+    assert buffer.getvalue(12, 16) == data[12:16]
+    assert buffer.getvalue(0, 14) == data[12:14]  # Dropped part is skipped
+    assert buffer.getvalue(18) == data[18:]
+    assert buffer.getvalue(19, 40) == data[19:]
+    assert buffer.getvalue(16, 10) == b""
+
+
+def test_read_new_returns_each_byte_once():
+    buffer = RingBuffer(16)
+    data = stream(40)
+    buffer.write(data[:10])
+    assert buffer.read_new() == data[:10]
+    assert buffer.read_new() == b""
+    buffer.write(data[10:14])
+    buffer.write(data[14:18])
+    assert buffer.read_new() == data[10:18]
+
+    # Unread bytes that were overwritten are skipped
+    buffer.write(data[18:40])
+    assert buffer.read_new() == data[24:40]
+
+
+def test_clear_resets_offsets_and_reads():
+    buffer = RingBuffer(16)
+    data = stream(30)
+    buffer.write(data[:12])
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.getvalue() == b""
+    assert buffer.read_new() == b""
+
+    buffer.write(data[12:30])  # Wraps around
+    assert buffer.getvalue() == data[14:30]
+    assert buffer.getvalue(2, 6) == data[14:18]
+    assert buffer.read_new() == data[14:30]
+
+
+def test_concurrent_writer_and_reader():
+    buffer = RingBuffer(1 << 16)
+    data = stream(1 << 20)
+    received = bytearray()
+
+    def writer():
+        for start in range(0, len(data), 2048):
+            buffer.write(data[start : start + 2048])
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    while thread.is_alive():
+        received += buffer.read_new()
+    thread.join()
+    received += buffer.read_new()
+
+    # Whatever the reader missed was overwritten and counted as dropped
+    assert len(received) + buffer.dropped_bytes >= len(data) - buffer.capacity
+    assert data.endswith(bytes(received[-buffer.capacity :]))
@@ -0,0 +1,132 @@
+# test_audio_preprocess.py
+import io
+import os
+import sys
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_preprocess import (  # noqa: E402
+    FRAME_MS,
+    load_wav,
+    prepare_for_stt,
+    split_on_silence,
+    trim_silence,
+)
+
+RATE = 16000
+
+
+def tone(seconds: float, rate: int = RATE, amplitude: float = 0.3):
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def silence(seconds: float, rate: int = RATE):
+    return np.zeros(int(seconds * rate), dtype=np.float32)
+
+
+def make_wav(samples, rate: int = RATE, channels: int = 1, sample_width: int = 2):
+    pcm = np.repeat(samples, channels).astype(np.float64)
+    if sample_width == 1:
+        raw = (pcm * 127 + 128).astype(np.uint8).tobytes()
+    elif sample_width == 2:
+        raw = (pcm * 32767).astype("<i2").tobytes()
+    else:
+        ints = (pcm * (2**31 - 1)).astype("<i4").view(np.uint8).reshape(-1, 4)
+        raw = ints[:, 4 - sample_width :].tobytes()  # 24-bit keeps the top bytes
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(rate)
+        wf.writeframes(raw)
+    return output.getvalue()
+
+
+def duration(wav: bytes) -> float:
+    with wave.open(io.BytesIO(wav), "rb") as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+@pytest.mark.parametrize("sample_width", [1, 2, 3, 4])
+@pytest.mark.parametrize("channels", [1, 2])
+def test_load_wav_sample_widths_and_channels(sample_width, channels):
+    original = tone(0.1)
+    samples, rate = load_wav(
+        make_wav(original, channels=channels, sample_width=sample_width)
+    )
+    assert rate == RATE
+    assert len(samples) == len(original)
+    assert np.max(np.abs(samples - original)) < 0.02
+
+
+def test_split_segments_cover_the_audio_and_stay_under_the_limit():
+    speech = np.concatenate([tone(7), silence(0.5), tone(7), silence(0.3), tone(4)])
+    segments = split_on_silence(speech, RATE, max_seconds=10)
+
+    assert np.array_equal(np.concatenate(segments), speech)
+    assert all(len(segment) <= 10 * RATE for segment in segments)
+    # Both cuts fall in the pauses, not in the middle of a word
+    cuts = np.cumsum([len(segment) for segment in segments])[:-1] / RATE
+    assert len(cuts) == 2
+    assert 7.0 <= cuts[0] <= 7.5
+    assert 14.5 <= cuts[1] <= 14.8
+
+
+def test_split_without_pauses_cuts_at_the_limit():
+    speech = tone(25)
+    segments = split_on_silence(speech, RATE, max_seconds=10)
+    assert [len(s) for s in segments] == [10 * RATE, 10 * RATE, 5 * RATE]
+
+
+def test_split_keeps_a_partial_last_frame():
+    frame = RATE * FRAME_MS // 1000
+    speech = tone(0.05)[: 2 * frame + 3]
+    segments = split_on_silence(speech, RATE, max_seconds=10)
+    assert len(segments) == 1 and len(segments[0]) == len(speech)
+
+
+def test_split_of_empty_audio_has_no_segments():
+    assert split_on_silence(silence(0), RATE) == []
+
+
+def test_trim_silence_keeps_a_margin():
+    speech = np.concatenate([silence(1), tone(1), silence(1)])
+    trimmed = trim_silence(speech, RATE, margin_ms=200)
+    assert abs(len(trimmed) / RATE - 1.4) < 0.05
+
+
+def test_trim_silence_leaves_silent_and_tiny_audio_unchanged():
+    assert len(trim_silence(silence(1), RATE)) == RATE
+    assert len(trim_silence(tone(0.005), RATE)) == 80  # Shorter than one frame
+
+
+def test_prepare_for_stt_converts_to_16k_mono_and_splits():
+    audio = np.concatenate(
+        [silence(2, 44100), tone(20, 44100), silence(1, 44100), tone(20, 44100)]
+    )
+    segments = prepare_for_stt(make_wav(audio, rate=44100, channels=2))
+
+    assert len(segments) == 2
+    for segment in segments:
+        with wave.open(io.BytesIO(segment), "rb") as wf:
+            assert wf.getframerate() == 16000
+            assert wf.getnchannels() == 1
+            assert wf.getsampwidth() == 2
+        assert duration(segment) <= 28
+    # Leading silence beyond the 200 ms margin is gone
+    assert abs(sum(duration(s) for s in segments) - 41.2) < 0.1
+
+
+def test_prepare_for_stt_of_empty_wav():
+    assert prepare_for_stt(make_wav(silence(0))) == []
+
+
+def test_prepare_for_stt_rejects_non_wav():
+    with pytest.raises((wave.Error, EOFError, ValueError)):
+        prepare_for_stt(b"ID3" + bytes(100))
@@ -0,0 +1,128 @@
+# test_chat_history.py
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_history import (  # noqa: E402
+    ChatHistory,
+    dumps_compact,
+    estimate_tokens,
+    extractive_summary,
+)
+
+TOOLS = ["weather"]
+
+
+def window_tokens(history: ChatHistory) -> int:
+    return sum(estimate_tokens(dumps_compact(m)) for m in history.window())
+
+
+def payload(history: ChatHistory) -> dict:
+    return json.loads(history.build_payload(TOOLS))
+
+
+def add_turn(history: ChatHistory, n: int, tool: bool = False):
+    history.append({"role": "user", "content": f"Question {n} " + "word " * 20})
+    if tool:
+        call = {"id": f"call_{n}", "type": "function", "function": {"name": "weather"}}
+        history.append({"role": "assistant", "content": None, "tool_calls": [call]})
+        history.append(
+            {"role": "tool", "tool_call_id": f"call_{n}", "content": "Sunny"}
+        )
+    history.append({"role": "assistant", "content": f"Answer {n} " + "text " * 20})
+
+
+def test_unbounded_history_sends_everything():
+    history = ChatHistory()
+    for n in range(5):
+        add_turn(history, n)
+    assert history.window() == history.messages
+    assert payload(history) == {"messages": history.messages, "tools": TOOLS}
+
+
+def test_budget_evicts_whole_turns_from_the_front():
+    history = ChatHistory(max_tokens=200)
+    for n in range(10):
+        add_turn(history, n, tool=n % 2 == 0)
+
+    window = history.window()
+    assert window_tokens(history) <= 200
+    assert window[0]["role"] == "user"  # Never starts mid-turn
+    assert window[-1] == history.messages[-1]
+    assert history.evicted_count == len(history.messages) - len(window)
+    assert payload(history) == {"messages": window, "tools": TOOLS}
+
+
+def test_tool_messages_stay_with_their_call():
+    history = ChatHistory(max_tokens=150)
+    for n in range(6):
+        add_turn(history, n, tool=True)
+
+    window = history.window()
+    call_ids = {
+        call["id"] for message in window for call in message.get("tool_calls") or []
+    }
+    results = [m["tool_call_id"] for m in window if m["role"] == "tool"]
+    assert results and set(results) == call_ids
+
+
+def test_newest_turn_is_kept_even_over_budget():
+    history = ChatHistory(max_tokens=20)
+    add_turn(history, 0)
+    add_turn(history, 1)
+    assert history.window() == history.messages[-2:]
+    assert window_tokens(history) > 20
+
+
+def test_byte_budget():
+    history = ChatHistory(max_bytes=600)
+    for n in range(8):
+        add_turn(history, n)
+    assert history.window_start > 0
+    assert sum(len(dumps_compact(m)) for m in history.window()) <= 600
+
+
+def test_summary_of_evicted_turns_fits_its_share_of_the_budget():
+    history = ChatHistory(max_tokens=400, summarizer=extractive_summary)
+    for n in range(10):
+        add_turn(history, n)
+
+    summary_message = history.window()[0]
+    assert summary_message["role"] == "system"
+    assert history.summary and summary_message["content"].endswith(history.summary)
+    assert estimate_tokens(dumps_compact(summary_message)) <= 400 * 0.25
+    assert payload(history)["messages"][0] == summary_message
+    assert window_tokens(history) <= 400
+
+
+def test_summary_trimmed_to_nothing_is_not_sent():
+    # At 60 tokens the summary share (15) cannot even hold the prefix
+    history = ChatHistory(max_tokens=60, summarizer=extractive_summary)
+    for n in range(4):
+        add_turn(history, n)
+
+    assert history.window_start > 0
+    assert history.summary == ""
+    assert history.window() == history.messages[history.window_start :]
+    assert payload(history) == {"messages": history.window(), "tools": TOOLS}
+
+
+def test_pop_and_replace_last_keep_the_payload_in_sync():
+    history = ChatHistory(max_tokens=300)
+    for n in range(6):
+        add_turn(history, n)
+
+    history.replace_last({"role": "assistant", "content": "Answer, cut short"})
+    assert payload(history)["messages"][-1]["content"] == "Answer, cut short"
+
+    popped = history.pop()
+    assert popped["content"] == "Answer, cut short"
+    assert history.messages[-1]["role"] == "user"
+    assert payload(history) == {"messages": history.window(), "tools": TOOLS}
+
+    # The accounting still holds after further appends
+    for n in range(6, 12):
+        add_turn(history, n)
+    assert window_tokens(history) <= 300
@@ -0,0 +1,134 @@
+# test_llm_stream.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_stream import ToolCallAssembler, parse_llm_event  # noqa: E402
+
+
+def fragment(index=None, id=None, name=None, arguments=None) -> dict:
+    frag: dict = {"function": {}}
+    if index is not None:
+        frag["index"] = index
+    if id is not None:
+        frag["id"] = id
+        frag["type"] = "function"
+    if name is not None:
+        frag["function"]["name"] = name
+    if arguments is not None:
+        frag["function"]["arguments"] = arguments
+    return frag
+
+
+def parse(assembler: ToolCallAssembler, *events: dict) -> list:
+    parsed = []
+    for data in events:
+        parsed += parse_llm_event({"status": "success", **data}, assembler)
+    return parsed
+
+
+def test_arguments_streamed_in_pieces_make_one_call():
+    assembler = ToolCallAssembler()
+    events = parse(
+        assembler,
+        {"tool_calls": [fragment(0, "call_1", "weather", '{"ci')]},
+        {"tool_calls": [fragment(0, arguments='ty": "Se')]},
+        {"tool_calls": [fragment(0, arguments='oul"}')]},
+        {"finish_reason": "tool_calls"},
+    )
+    assert [e.type for e in events] == ["tool_call"]
+    assert events[0].id == "call_1"
+    assert events[0].name == "weather"
+    assert events[0].arguments == {"city": "Seoul"}
+
+
+def test_next_call_completes_the_previous_one():
+    assembler = ToolCallAssembler()
+    first = parse(assembler, {"tool_calls": [fragment(0, "a", "f", "{}")]})
+    second = parse(assembler, {"tool_calls": [fragment(1, "b", "g", "{}")]})
+    last = assembler.finish()
+    assert first == []
+    assert [e.id for e in second] == ["a"]
+    assert [e.id for e in last] == ["b"]
+    assert assembler.finish() == []  # Each call is reported once
+
+
+def test_fragments_without_index_merge_by_id_or_latest_call():
+    assembler = ToolCallAssembler()
+    parse(
+        assembler,
+        {"tool_calls": [fragment(id="a", name="f", arguments='{"x"')]},
+        {"tool_calls": [fragment(arguments=": 1}")]},
+    )
+    (call,) = assembler.finish()
+    assert call.arguments == {"x": 1}
+
+
+def test_unparsable_arguments_are_none():
+    assembler = ToolCallAssembler()
+    parse(assembler, {"tool_calls": [fragment(0, "a", "f", '{"x": ')]})
+    (call,) = assembler.finish()
+    assert call.arguments is None
+
+
+def test_server_results_complete_calls_and_fill_history():
+    assembler = ToolCallAssembler()
+    events = parse(
+        assembler,
+        {"tool_calls": [fragment(0, "a", "f", "{}"), fragment(1, "b", "g", "{}")]},
+        {"tool_call_id": "b", "content": "B done"},
+    )
+    assert [(e.type, getattr(e, "id", None)) for e in events] == [
+        ("tool_call", "a"),
+        ("tool_call", "b"),
+        ("tool_result", None),
+    ]
+    assert assembler.pending() == ["a"]
+
+    history = assembler.history()
+    assert history[0]["role"] == "assistant"
+    assert [c["id"] for c in history[0]["tool_calls"]] == ["a", "b"]
+    assert "index" not in history[0]["tool_calls"][0]
+    # One tool message per call in call order, a placeholder for the missing one
+    assert [(m["tool_call_id"], m["content"]) for m in history[1:]] == [
+        ("a", "Tool execution completed"),
+        ("b", "B done"),
+    ]
+
+
+def test_local_executor_results_are_recorded():
+    executed = []
+
+    def run(call):
+        executed.append(call.name)
+        return None if call.name == "skip" else f"{call.name}: ok"
+
+    assembler = ToolCallAssembler(run)
+    events = parse(
+        assembler,
+        {"tool_calls": [fragment(0, "a", "f", "{}")]},
+        {"tool_calls": [fragment(1, "b", "skip", "{}")]},
+        {"finish_reason": "tool_calls"},
+    )
+    assert executed == ["f", "skip"]
+    assert [e.type for e in events] == ["tool_call", "tool_result", "tool_call"]
+    assert events[1].content == "f: ok"
+    assert assembler.pending() == ["b"]
+
+
+def test_server_result_replaces_the_local_one():
+    assembler = ToolCallAssembler(lambda call: "local")
+    parse(assembler, {"tool_calls": [fragment(0, "a", "f", "{}")]})
+    events = parse(assembler, {"tool_call_id": "a", "content": "server"})
+    assert [e.type for e in events] == ["tool_call", "tool_result", "tool_result"]
+    assert assembler.results["a"]["content"] == "server"
+
+
+def test_content_and_errors_are_typed():
+    assembler = ToolCallAssembler()
+    events = parse(assembler, {"content": "Hi"}, {"content": ""})
+    assert [(e.type, e.text) for e in events] == [("content", "Hi")]
+    (error,) = parse_llm_event({"status": "error", "reason": "quota"}, assembler)
+    assert (error.type, error.reason) == ("error", "quota")
+    assert not assembler
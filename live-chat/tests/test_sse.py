@@ -0,0 +1,93 @@
+# test_sse.py
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sse import SSEDecoder, iter_event_batches  # noqa: E402
+
+try:
+    import orjson
+
+    LOADS = [json.loads, orjson.loads]
+except ImportError:
+    LOADS = [json.loads]
+
+
+def event(content: str) -> bytes:
+    payload = {"status": "success", "content": content}
+    return b"data: " + json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def decode(stream: bytes, chunk_size: int, loads=json.loads) -> list[dict]:
+    decoder = SSEDecoder(loads)
+    events = []
+    for start in range(0, len(stream), chunk_size):
+        events += decoder.feed(stream[start : start + chunk_size])
+    return events + decoder.flush()
+
+
+@pytest.fixture(params=LOADS, ids=lambda loads: loads.__module__)
+def loads(request):
+    return request.param
+
+
+def test_events_split_anywhere_including_inside_utf8(loads):
+    stream = b"\n\n".join(event(text) for text in ["안녕", " 하세요", "!"]) + b"\n\n"
+    for chunk_size in range(1, len(stream) + 1):
+        events = decode(stream, chunk_size, loads)
+        assert [e["content"] for e in events] == ["안녕", " 하세요", "!"]
+
+
+def test_events_without_blank_line_separators(loads):
+    stream = event("a") + b"\n" + event("b") + b"\n" + event("c")
+    assert [e["content"] for e in decode(stream, 7, loads)] == ["a", "b", "c"]
+
+
+def test_crlf_line_endings(loads):
+    stream = event("a") + b"\r\n\r\n" + event("b") + b"\r\n"
+    assert [e["content"] for e in decode(stream, 3, loads)] == ["a", "b"]
+
+
+def test_payload_spread_over_several_data_lines(loads):
+    stream = b'data: {"status": "success",\ndata:  "content": "hi"}\n\n' + event("x")
+    assert decode(stream, 5, loads) == [
+        {"status": "success", "content": "hi"},
+        {"status": "success", "content": "x"},
+    ]
+
+
+def test_done_marker_and_other_fields_are_skipped(loads):
+    stream = (
+        b": keep-alive\nevent: message\nid: 1\nretry: 100\n"
+        + event("a")
+        + b"\ndata: [DONE]\n"
+        + event("b")
+        + b"\n"
+    )
+    assert [e["content"] for e in decode(stream, 4, loads)] == ["a", "b"]
+
+
+def test_data_field_without_space(loads):
+    assert decode(b'data:{"content": "x"}\n', 2, loads) == [{"content": "x"}]
+
+
+def test_truncated_payload_is_dropped_at_end_of_stream(loads):
+    stream = event("a") + b'\n\ndata: {"status": "succ'
+    assert [e["content"] for e in decode(stream, 6, loads)] == ["a"]
+
+
+def test_truncated_payload_not_continued_is_parsed_alone(loads):
+    # A cut-off object followed by a complete event: the second line is not a
+    # continuation, so it is dispatched on its own
+    stream = b'data: {"status": "succ\n' + event("b") + b"\n\n"
+    assert [e["content"] for e in decode(stream, 5, loads)] == ["b"]
+
+
+def test_iter_event_batches_yields_once_per_chunk():
+    chunks = [event("a") + b"\n" + event("b") + b"\n", b"", event("c")]
+    batches = list(iter_event_batches(chunks))
+    assert [[e["content"] for e in batch] for batch in batches] == [["a", "b"], ["c"]]
@@ -0,0 +1,171 @@
+# tts_cache.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+def tts_cache_key(
+    kind: str,
+    tts_type: Optional[str],
+    text: str,
+    text_normalization_config: Optional[str] = None,
+    text_normalization_locale: Optional[str] = None,
+) -> str:
+    """Content address of a synthesis request
+
+    kind names the TTS endpoint, since the audio encodings returned by the
+    buffered and streaming endpoints may differ.
+    """
+    material = json.dumps(
+        [
+            kind,
+            tts_type,
+            text,
+            text_normalization_config,
+            text_normalization_locale,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Two-tier (memory LRU + size-bounded disk) cache for synthesized audio
+
+    Thread-safe, so one instance can be shared by every AvatarChat in the
+    process. Disk entries are stored as one file per key and evicted in least
+    recently used order (by modification time across restarts).
+    """
+
+    def __init__(
+        self,
+        memory_max_bytes: int = 32 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: OrderedDict[str, int] = OrderedDict()  # key -> file size
+        self._disk_bytes = 0
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio or None"""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return audio
+
+            if key in self._disk:
+                path = self._disk_path(key)
+                try:
+                    with open(path, "rb") as f:
+                        audio = f.read()
+                    os.utime(path)  # Record use for LRU across restarts
+                except OSError:
+                    self._forget_disk(key)
+                else:
+                    self._disk.move_to_end(key)
+                    self.stats["disk_hits"] += 1
+                    self._put_memory(key, audio)
+                    return audio
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, audio: bytes):
+        """Store audio in both tiers"""
+        with self._lock:
+            self._put_memory(key, audio)
+            if self.disk_dir and key not in self._disk:
+                self._put_disk(key, audio)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def summary(self) -> str:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        hit_rate = hits / lookups * 100 if lookups else 0.0
+        return (
+            f"{hit_rate:.1f}% hit rate ({self.stats['memory_hits']} memory, "
+            f"{self.stats['disk_hits']} disk, {self.stats['misses']} misses, "
+            f"{self.stats['memory_evictions'] + self.stats['disk_evictions']} evictions)"
+        )
+
+    def _put_memory(self, key: str, audio: bytes):
+        if len(audio) > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.stats["memory_evictions"] += 1
+
+    def _put_disk(self, key: str, audio: bytes):
+        if len(audio) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)  # Atomic, readers never see partial files
+        except OSError as e:
+            print(f"⚠️  TTS cache write failed: {e}")
+            return
+
+        self._disk[key] = len(audio)
+        self._disk_bytes += len(audio)
+        while self._disk_bytes > self.disk_max_bytes:
+            evicted_key = next(iter(self._disk))
+            try:
+                os.remove(self._disk_path(evicted_key))
+            except OSError:
+                pass
+            self._forget_disk(evicted_key)
+            self.stats["disk_evictions"] += 1
+
+    def _forget_disk(self, key: str):
+        self._disk_bytes -= self._disk.pop(key, 0)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.audio")
+
+    def _load_disk_index(self):
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.is_file() and entry.name.endswith(".audio"):
+                stat = entry.stat()
+                entries.append(
+                    (stat.st_mtime, entry.name[: -len(".audio")], stat.st_size)
+                )
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
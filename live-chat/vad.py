@@ -0,0 +1,114 @@
+# vad.py
+import math
+import sys
+import time
+from array import array
+from typing import Optional
+
+
+class VoiceActivityDetector:
+    """Energy / zero-crossing voice activity detector with endpointing
+
+    Feeds on 16-bit PCM as it is captured and classifies 20 ms frames. A frame
+    is speech when its energy is above both threshold_db and the adaptive
+    noise floor, and its zero-crossing rate is below max_zcr (broadband
+    hiss crosses zero far more often than voiced speech). The turn ends once
+    trailing_silence_ms of non-speech follows at least min_speech_ms of speech.
+
+    Positions (speech_start, speech_end, endpoint) are in frames of audio
+    since the first feed, so results on recorded WAV files are deterministic.
+    """
+
+    def __init__(
+        self,
+        rate: int = 16000,
+        channels: int = 1,
+        frame_ms: int = 20,
+        threshold_db: float = -40.0,
+        noise_margin_db: float = 12.0,
+        max_zcr: float = 0.35,
+        trailing_silence_ms: int = 700,
+        min_speech_ms: int = 120,
+    ):
+        self.rate = rate
+        self.channels = channels
+        self.frame_samples = rate * frame_ms // 1000
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.max_zcr = max_zcr
+        self.trailing_frames = max(1, trailing_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+
+        self.noise_db = -90.0
+        self.speech_start: Optional[int] = None  # First frame of the utterance
+        self.speech_end: Optional[int] = None  # Frame after the last speech frame
+        self.endpoint: Optional[int] = None  # Frame at which the turn ended
+        self.last_speech_at: Optional[float] = None  # time.time() of last speech
+        self.endpoint_at: Optional[float] = None
+
+        self._pending = b""
+        self._position = 0  # Frames processed
+        self._speech_run = 0
+        self._silence_run = 0
+
+    @property
+    def endpointing_delay(self) -> Optional[float]:
+        """Seconds between the end of speech being captured and the endpoint"""
+        if self.endpoint_at is None or self.last_speech_at is None:
+            return None
+        return self.endpoint_at - self.last_speech_at
+
+    def feed(self, pcm: bytes) -> bool:
+        """Process captured audio; returns True once the turn has ended"""
+        if self.endpoint is not None:
+            return True
+
+        data = self._pending + pcm
+        frame_bytes = self.frame_samples * self.channels * 2
+        usable = len(data) - len(data) % frame_bytes
+        self._pending = data[usable:]
+
+        for offset in range(0, usable, frame_bytes):
+            samples = array("h", data[offset : offset + frame_bytes])
+            if sys.byteorder == "big":
+                samples.byteswap()
+            if self.channels > 1:
+                samples = samples[:: self.channels]
+            self._process(samples)
+            if self.endpoint is not None:
+                return True
+        return False
+
+    def _process(self, samples: array):
+        energy_db, zcr = frame_features(samples)
+        threshold = max(self.threshold_db, self.noise_db + self.noise_margin_db)
+        is_speech = energy_db > threshold and zcr < self.max_zcr
+        end_of_frame = self._position + self.frame_samples
+
+        if is_speech:
+            self._speech_run += 1
+            self._silence_run = 0
+            if self.speech_start is None and self._speech_run >= self.min_speech_frames:
+                self.speech_start = end_of_frame - self._speech_run * self.frame_samples
+            if self.speech_start is not None:
+                self.speech_end = end_of_frame
+                self.last_speech_at = time.time()
+        else:
+            self._speech_run = 0
+            self._silence_run += 1
+            if self.speech_start is None:
+                # Track background noise before the user starts speaking
+                self.noise_db = 0.95 * self.noise_db + 0.05 * energy_db
+            elif self._silence_run >= self.trailing_frames:
+                self.endpoint = end_of_frame
+                self.endpoint_at = time.time()
+
+        self._position = end_of_frame
+
+
+def frame_features(samples: array) -> tuple[float, float]:
+    """Energy in dBFS and zero-crossing rate of one frame"""
+    count = len(samples)
+    rms = math.sqrt(sum(x * x for x in samples) / count)
+    crossings = sum(1 for a, b in zip(samples, samples[1:]) if (a >= 0) != (b >= 0))
+    return 20 * math.log10(rms / 32768 + 1e-10), crossings / count
@@ -0,0 +1,278 @@
+# voice_pipeline.py
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Optional
+
+from barge_in import TurnInterrupted
+
+# Sentence-ending punctuation (Latin and CJK) followed by whitespace, or a newline
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+
+WAV_HEADER_BYTES = 44
+
+
+class SentenceSplitter:
+    """Split streamed LLM content into sentences as they arrive"""
+
+    def __init__(self, min_length: int = 8):
+        self.min_length = min_length  # Avoid sending very short fragments to TTS
+        self._buffer = ""
+
+    def feed(self, content: str) -> list[str]:
+        """Add a content delta and return the sentences completed by it"""
+        self._buffer += content
+        sentences = []
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(self._buffer):
+            sentence = self._buffer[start : match.start()].strip()
+            if len(sentence) < self.min_length:
+                continue  # Merge with the next sentence
+            sentences.append(sentence)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> list[str]:
+        """Return whatever is left once the stream has ended"""
+        sentence = self._buffer.strip()
+        self._buffer = ""
+        return [sentence] if sentence else []
+
+
+class PipelinedSpeaker:
+    """Synthesize sentences concurrently and play them back in order
+
+    Sentences are sent to the streaming TTS endpoint on a bounded worker pool
+    while the LLM reply is still generating. Their audio stays in memory: a
+    playback thread hands the sentences to the in-process player in
+    submission order, each one chunk by chunk as it is synthesized, so the
+    first sentence is heard before its synthesis has finished. Without the
+    in-process player each sentence goes to a temporary directory for the OS
+    player and is deleted after playback. Nothing is printed while the reply
+    streams.
+
+    If the turn is interrupted (chat.interrupted), pending sentences are
+    cancelled and the speaker records how much of the reply was heard.
+
+    Use it as a context manager: leaving the block without finish() (the
+    LLM call raised) cancels pending sentences and stops both threads.
+    """
+
+    def __init__(self, chat, max_workers: int = 3):
+        self.chat = chat
+        self.splitter = SentenceSplitter()
+        self.sentences: list[str] = []
+        self.started_at = time.time()
+        self.first_audio_at: Optional[float] = None
+
+        # What was heard, and audio bytes per sentence (for barge-in accounting)
+        self.spoken: list[str] = []
+        self.received_bytes: dict[int, int] = {}
+        self.flushed_bytes = 0
+        self._played: set[int] = set()
+        self._cut_off: set[int] = set()  # Synthesis aborted mid-stream
+        self._closed = False
+        self._aborted = threading.Event()
+
+        self._player = chat.get_player()
+        self._temp_dir = (
+            None if self._player else tempfile.mkdtemp(prefix="persolive_tts_")
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._pending: queue.Queue = queue.Queue()  # Sentences in submission order
+        self._playback = threading.Thread(target=self._play_loop, daemon=True)
+        self._playback.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def feed(self, content: str):
+        """Consume an LLM content delta"""
+        if self.chat.interrupted.is_set():
+            return
+        for sentence in self.splitter.feed(content):
+            self._submit(sentence)
+
+    def finish(self) -> dict:
+        """Flush the last sentence, wait for playback and return timings"""
+        if not self.chat.interrupted.is_set():
+            for sentence in self.splitter.flush():
+                self._submit(sentence)
+
+        self._pending.put(None)  # End of sentences
+        self._playback.join()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._cleanup()
+
+        finished_at = time.time()
+        return {
+            "segments": len(self.sentences),
+            "time_to_first_audio": (
+                self.first_audio_at - self.started_at if self.first_audio_at else None
+            ),
+            "end_to_end": finished_at - self.started_at,
+            "interrupted": self.chat.interrupted.is_set(),
+            "spoken_text": " ".join(self.spoken),
+        }
+
+    def close(self):
+        """Cancel what has not been played and stop the threads (after finish(): no-op)"""
+        if self._closed:
+            return
+        self._aborted.set()
+        self._pending.put(None)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._playback.join()
+        self._cleanup()
+
+    def _cleanup(self):
+        self._closed = True
+        if self._temp_dir:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+
+    def bytes_saved(self) -> int:
+        """Estimated TTS audio never downloaded because the turn was interrupted
+
+        Sentences that were cancelled or cut off are estimated from the
+        audio-bytes-per-character ratio of the sentences that completed.
+        """
+        per_char = self._bytes_per_char()
+        if per_char is None:
+            return 0
+        saved = 0
+        for index, sentence in enumerate(self.sentences):
+            if self._completed(index):
+                continue
+            estimate = int(len(sentence) * per_char)
+            saved += max(0, estimate - self.received_bytes.get(index, 0))
+        return saved
+
+    def _completed(self, index: int) -> bool:
+        return self.received_bytes.get(index) is not None and index not in self._cut_off
+
+    def _bytes_per_char(self) -> Optional[float]:
+        """Audio bytes per character of the sentences synthesized completely"""
+        completed = [i for i in range(len(self.sentences)) if self._completed(i)]
+        if not completed:
+            return None
+        return sum(self.received_bytes[i] for i in completed) / sum(
+            len(self.sentences[i]) for i in completed
+        )
+
+    def _submit(self, sentence: str):
+        index = len(self.sentences)
+        self.sentences.append(sentence)
+        chunks: queue.Queue = queue.Queue()  # Audio chunks, then None
+        future = self._executor.submit(self._synthesize, index, sentence, chunks)
+        self._pending.put((index, future, chunks))
+
+    def _synthesize(self, index: int, sentence: str, chunks: queue.Queue) -> int:
+        try:
+            size = self.chat.write_speech(sentence, sink=chunks.put, streaming=True)
+        except TurnInterrupted as e:
+            self.received_bytes[index] = e.bytes_received
+            self._cut_off.add(index)
+            raise
+        finally:
+            chunks.put(None)
+        self.received_bytes[index] = size
+        return size
+
+    def _stopping(self) -> bool:
+        return self.chat.interrupted.is_set() or self._aborted.is_set()
+
+    def _play_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+
+            index, future, chunks = item
+            if self._stopping():
+                future.cancel()
+                continue
+            try:
+                size = self._play(index, future, chunks)
+            except (TurnInterrupted, CancelledError):
+                continue
+            except Exception as e:
+                print(f"⚠️  Segment synthesis failed, skipping: {e}")
+                continue
+            if size is not None:
+                self._record_spoken(index, size)
+
+        # Audio downloaded but never played
+        for index, size in self.received_bytes.items():
+            if index not in self._played and index not in self._cut_off:
+                self.flushed_bytes += size
+
+    def _play(self, index: int, future, chunks: queue.Queue) -> Optional[int]:
+        """Play one sentence; returns its audio size, or None if it was skipped"""
+        if self._player is not None:
+            self._player.play(self._stream(chunks))
+            if self._aborted.is_set():
+                return None
+            try:
+                size = future.result()
+            except TurnInterrupted:
+                if not self._player.played_bytes:
+                    raise
+                # Heard in part while it was still synthesizing
+                per_char = self._bytes_per_char()
+                size = self.received_bytes.get(index, 0)
+                if per_char is not None:
+                    size = max(size, int(len(self.sentences[index]) * per_char))
+            started_at = self._player.playback_started_at
+        else:
+            path = os.path.join(self._temp_dir, f"sentence_{index:03d}.wav")
+            with open(path, "wb") as f:
+                for chunk in self._stream(chunks):
+                    f.write(chunk)
+            if self._stopping():
+                return None
+            size = future.result()
+            started_at = time.time()
+            self.chat.play_audio(path, quiet=True)
+            os.remove(path)
+
+        if self.first_audio_at is None and started_at is not None:
+            self.first_audio_at = started_at
+        return size
+
+    def _stream(self, chunks: queue.Queue):
+        """Audio chunks of one sentence as they are synthesized"""
+        while True:
+            chunk = chunks.get()
+            if chunk is None or self._stopping():
+                return
+            yield chunk
+
+    def _record_spoken(self, index: int, size: int):
+        self._played.add(index)
+        sentence = self.sentences[index]
+        player = self.chat.player
+        if not self.chat.interrupted.is_set() or player is None:
+            self.spoken.append(sentence)
+            return
+
+        # Cut off mid-sentence: keep the words heard, by share of audio played
+        pcm_bytes = max(1, size - WAV_HEADER_BYTES)
+        heard = sentence[
+            : int(len(sentence) * min(1.0, player.played_bytes / pcm_bytes))
+        ]
+        if len(heard) < len(sentence):
+            heard = heard[: heard.rfind(" ") + 1].rstrip() if " " in heard else ""
+            received = self.received_bytes.get(index, size) - WAV_HEADER_BYTES
+            self.flushed_bytes += max(0, received - player.played_bytes)
+        if heard:
+            self.spoken.append(heard)
@@ -0,0 +1 @@
+"""Shared helpers for the Persolive example clients"""
@@ -0,0 +1,147 @@
+# http_client.py
+import random
+import threading
+from typing import Optional, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (10, 30)  # (connect, read) seconds
+DEFAULT_POOL_SIZE = 20  # Keep-alive connections per base URL
+DEFAULT_RETRIES = 3
+USER_AGENT = "PersoLive-Python-Client/1.0"
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+_sessions: dict[tuple[str, Optional[str]], "PersoSession"] = {}
+_sessions_lock = threading.Lock()
+
+
+class JitteredRetry(Retry):
+    """Retry policy with full-jitter backoff
+
+    Idempotent methods are retried on connection/read errors and on 429/5xx.
+    Other methods (POST, PATCH) are only retried when the server rejected the
+    request without processing it (connection failures and 429).
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if status_code == 429 and self.total:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
+
+class PersoSession(requests.Session):
+    """requests.Session bound to one base URL with pooled keep-alive connections
+
+    Auth headers are set once on the session and every request gets a
+    default timeout unless the caller passes one.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        timeout: Union[float, tuple[float, float]] = DEFAULT_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        retries: int = DEFAULT_RETRIES,
+    ):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        self.headers["User-Agent"] = USER_AGENT
+        if api_key:
+            self.headers["PersoLive-APIKey"] = api_key
+
+        retry = JitteredRetry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=IDEMPOTENT_METHODS,
+            raise_on_status=False,  # Hand the last response back to the caller
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, *args, **kwargs)
+
+    def prewarm(self, connections: int = 1) -> int:
+        """Open pooled connections ahead of the first real request
+
+        Resolves DNS and completes the TCP/TLS handshakes with concurrent HEAD
+        requests to the base URL, whose response status does not matter. The
+        connections stay in the keep-alive pool. Returns how many succeeded.
+        """
+        opened = []
+
+        def connect():
+            try:
+                self.head(self.base_url + "/", allow_redirects=False).close()
+                opened.append(True)
+            except requests.RequestException:
+                pass
+
+        threads = [threading.Thread(target=connect) for _ in range(connections)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(opened)
+
+
+def never_reached_server(error: BaseException) -> bool:
+    """True if a failed request provably never reached the server
+
+    That is a connection that could not be opened, or a 429 response raised
+    as requests.HTTPError with the response attached. These are the only
+    failures after which a POST is safe to send again.
+    """
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code == 429
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError):
+        reason = error.args[0] if error.args else None
+        return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+    return False
+
+
+def get_session(base_url: str, api_key: Optional[str] = None) -> PersoSession:
+    """Return the shared session for a base URL, creating it on first use"""
+    key = (base_url.rstrip("/"), api_key)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = PersoSession(base_url, api_key)
+        return session
+
+
+def get_session_for_url(url: str) -> PersoSession:
+    """Return an unauthenticated shared session for the origin of a URL
+
+    Used for downloads from storage hosts, which must not receive the API key.
+    """
+    parsed_url = urlparse(url)
+    return get_session(f"{parsed_url.scheme}://{parsed_url.netloc}")
+
+
+def close_sessions():
+    """Close every shared session"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
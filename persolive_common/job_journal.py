@@ -0,0 +1,256 @@
+# job_journal.py
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+TERMINAL_STATUSES = frozenset({"COMPLETED", "FAILED"})
+SUBMITTING = "SUBMITTING"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    label TEXT,
+    parent_id TEXT,
+    remote_id TEXT UNIQUE,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transitions (
+    job_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_kind_status ON jobs (kind, status);
+CREATE INDEX IF NOT EXISTS jobs_status_updated ON jobs (status, updated_at);
+CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (updated_at);
+CREATE INDEX IF NOT EXISTS transitions_job ON transitions (job_key);
+"""
+
+# Request fields that differ between runs of the same job
+VOLATILE_FIELDS = ("webhook_url",)
+
+
+def job_key(kind: str, request: dict) -> str:
+    """Stable identity of a submission: the same request gives the same key"""
+    stable = {k: v for k, v in request.items() if k not in VOLATILE_FIELDS}
+    encoded = json.dumps([kind, stable], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:32]
+
+
+class JobJournal:
+    """SQLite record of submitted projects, exports and studio tasks
+
+    A row is written before a request is sent (status SUBMITTING) and gets
+    the server's ID once it is accepted, so after a crash a rerun of the same
+    command finds the ID and re-attaches instead of paying for the work
+    again. Every status change updates the row and appends to the
+    transitions table in one transaction. Jobs are keyed by job_key(), so
+    re-attaching needs no extra bookkeeping from the caller.
+
+    The connection is shared by the caller's threads behind a lock; WAL mode
+    keeps `status` readers from blocking a running job.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def resumable(self, key: str) -> Optional[dict]:
+        """The earlier submission of this job, if it can be re-attached to
+
+        That is any submission the server accepted, unless it FAILED. A row
+        left in SUBMITTING (the process died before the server answered) is
+        not resumable: whether the server got the request is unknown.
+        """
+        job = self.get(key)
+        if job and job["remote_id"] and job["status"] != "FAILED":
+            return job
+        return None
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._one("SELECT * FROM jobs WHERE key = ?", (key,))
+
+    def get_by_remote_id(self, remote_id: str) -> Optional[dict]:
+        return self._one("SELECT * FROM jobs WHERE remote_id = ?", (remote_id,))
+
+    def begin(
+        self,
+        key: str,
+        kind: str,
+        request: dict,
+        label: Optional[str] = None,
+        parent_id: Optional[str] = None,
+    ):
+        """Record a submission about to be sent (replaces a failed attempt)"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (key, kind, label, parent_id, remote_id,"
+                " status, request, result, error, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, NULL, ?, ?, NULL, NULL, ?, ?)",
+                (
+                    key,
+                    kind,
+                    label,
+                    parent_id,
+                    SUBMITTING,
+                    json.dumps(request, ensure_ascii=False),
+                    now,
+                    now,
+                ),
+            )
+            self._transition(key, SUBMITTING, now)
+
+    def submitted(self, key: str, remote_id: str, status: str = "PENDING"):
+        """The server accepted the submission and assigned remote_id"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET remote_id = ?, status = ?, updated_at = ? WHERE key = ?",
+                (remote_id, status, now, key),
+            )
+            self._transition(key, status, now)
+
+    def fail(self, key: str, error: str):
+        """The submission was rejected"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'FAILED', error = ?, updated_at = ? WHERE key = ?",
+                (error, now, key),
+            )
+            self._transition(key, "FAILED", now)
+
+    def update(self, remote_id: str, status: str, result: Optional[dict] = None):
+        """Record a status from the server; unchanged statuses write nothing
+
+        The full response is stored once the job is COMPLETED or FAILED.
+        """
+        now = time.time()
+        encoded = None
+        if result is not None and status in TERMINAL_STATUSES:
+            encoded = json.dumps(result, ensure_ascii=False)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT key, status FROM jobs WHERE remote_id = ?", (remote_id,)
+            ).fetchone()
+            if row is None or row["status"] == status:
+                return
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = COALESCE(?, result), updated_at = ?"
+                " WHERE key = ?",
+                (status, encoded, now, row["key"]),
+            )
+            self._transition(row["key"], status, now)
+
+    def counts(self) -> list[tuple[str, str, int]]:
+        """(kind, status, jobs) for every combination, from the index"""
+        with self._lock:
+            return [
+                tuple(row)
+                for row in self._conn.execute(
+                    "SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status"
+                )
+            ]
+
+    def recent(
+        self,
+        limit: int = 20,
+        status: Optional[str] = None,
+        kind: Optional[str] = None,
+    ) -> list[dict]:
+        """Most recently updated jobs, newest first"""
+        where, params = [], []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if kind:
+            where.append("kind = ?")
+            params.append(kind)
+        query = "SELECT * FROM jobs"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY updated_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (*params, limit)).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def _transition(self, key: str, status: str, at: float):
+        self._conn.execute(
+            "INSERT INTO transitions (job_key, status, at) VALUES (?, ?, ?)",
+            (key, status, at),
+        )
+
+    def _one(self, query: str, params: tuple) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return self._decode(row) if row else None
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        if job["result"]:
+            job["result"] = json.loads(job["result"])
+        return job
+
+
+def status_command(argv: list[str], prog: str) -> int:
+    """`status` subcommand: job counts and the most recent jobs in a journal"""
+    parser = argparse.ArgumentParser(
+        prog=f"{prog} status", description="Show the jobs recorded in a journal"
+    )
+    parser.add_argument("--journal", required=True, help="Journal file (SQLite)")
+    parser.add_argument("--status", help="Only list jobs with this status")
+    parser.add_argument("--kind", help="Only list jobs of this kind")
+    parser.add_argument(
+        "--limit", type=int, default=20, help="Jobs to list (default: 20)"
+    )
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.journal):
+        print(f"❌ Journal not found: {args.journal}")
+        return 1
+
+    journal = JobJournal(args.journal)
+    try:
+        counts = journal.counts()
+        print(f"📒 {args.journal}: {sum(n for _, _, n in counts)} jobs")
+        for kind, status, n in sorted(counts):
+            print(f"   {kind:<12} {status:<12} {n:>8}")
+
+        jobs = journal.recent(args.limit, args.status, args.kind)
+        if jobs:
+            print(f"\n🕒 Latest {len(jobs)}:")
+        for job in jobs:
+            updated = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(job["updated_at"])
+            )
+            print(
+                f"   {updated}  {job['kind']:<12} {job['status']:<12} "
+                f"{job['remote_id'] or '-':<40} {job['label'] or ''}"
+            )
+            if job["error"]:
+                print(f"      {job['error']}")
+    finally:
+        journal.close()
+    return 0
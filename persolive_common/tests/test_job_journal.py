@@ -0,0 +1,138 @@
+# test_job_journal.py
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from persolive_common.job_journal import (  # noqa: E402
+    JobJournal,
+    job_key,
+    status_command,
+)
+
+REQUEST = {"text": "Hello", "tts_type": "yuri", "webhook_url": "http://a/hook"}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+@pytest.fixture
+def journal(path):
+    journal = JobJournal(path)
+    yield journal
+    journal.close()
+
+
+def transitions(path: str, key: str) -> list[str]:
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute(
+            "SELECT status FROM transitions WHERE job_key = ? ORDER BY rowid", (key,)
+        )
+        return [status for (status,) in rows]
+
+
+def test_job_key_ignores_volatile_fields_and_order():
+    moved = {"webhook_url": "http://b/hook", "tts_type": "yuri", "text": "Hello"}
+    assert job_key("tts", REQUEST) == job_key("tts", moved)
+    assert job_key("tts", REQUEST) != job_key("stf", REQUEST)
+    assert job_key("tts", REQUEST) != job_key("tts", {**REQUEST, "text": "Hi"})
+
+
+def test_resumable_only_after_the_server_accepted(journal):
+    key = job_key("tts", REQUEST)
+    assert journal.resumable(key) is None
+
+    journal.begin(key, "tts", REQUEST, "TTS")
+    assert journal.resumable(key) is None  # Unknown whether the server got it
+
+    journal.submitted(key, "task-1")
+    job = journal.resumable(key)
+    assert (job["remote_id"], job["status"]) == ("task-1", "PENDING")
+    assert job["request"] == REQUEST
+
+    journal.update("task-1", "COMPLETED", {"url": "https://x/a.wav"})
+    assert journal.resumable(key)["result"] == {"url": "https://x/a.wav"}
+
+
+def test_failed_jobs_are_not_resumable_and_can_be_retried(journal, path):
+    key = job_key("tts", REQUEST)
+    journal.begin(key, "tts", REQUEST)
+    journal.fail(key, "502 - <html>Bad Gateway</html>")
+    assert journal.resumable(key) is None
+    assert journal.get(key)["error"] == "502 - <html>Bad Gateway</html>"
+
+    journal.begin(key, "tts", REQUEST)  # Retry replaces the failed attempt
+    journal.submitted(key, "task-2")
+    assert journal.resumable(key)["remote_id"] == "task-2"
+    assert journal.get(key)["error"] is None
+
+    journal.update("task-2", "FAILED", {"reason": "bad input"})
+    assert journal.resumable(key) is None
+    assert transitions(path, key) == [
+        "SUBMITTING",
+        "FAILED",
+        "SUBMITTING",
+        "PENDING",
+        "FAILED",
+    ]
+
+
+def test_update_writes_only_status_changes(journal, path):
+    key = job_key("export", {"project": 1})
+    journal.begin(key, "export", {"project": 1})
+    journal.submitted(key, "e-1", "CREATED")
+
+    journal.update("e-1", "CREATED")
+    journal.update("e-1", "PROCESSING", {"progress": 10})
+    journal.update("e-1", "PROCESSING", {"progress": 50})
+    journal.update("unknown", "COMPLETED")
+
+    job = journal.get_by_remote_id("e-1")
+    assert job["status"] == "PROCESSING"
+    assert job["result"] is None  # Only terminal responses are stored
+    assert transitions(path, key) == ["SUBMITTING", "CREATED", "PROCESSING"]
+
+    journal.update("e-1", "COMPLETED", {"url": "https://x/v.mp4"})
+    journal.update("e-1", "COMPLETED")  # No result: keeps the stored one
+    assert journal.get(key)["result"] == {"url": "https://x/v.mp4"}
+    assert transitions(path, key)[-1] == "COMPLETED"
+
+
+def test_journal_survives_a_restart(path):
+    key = job_key("tts", REQUEST)
+    first = JobJournal(path)
+    first.begin(key, "tts", REQUEST)
+    first.submitted(key, "task-1")
+    first.close()
+
+    second = JobJournal(path)
+    try:
+        assert second.resumable(key)["remote_id"] == "task-1"
+    finally:
+        second.close()
+
+
+def test_status_command(journal, path, capsys):
+    for n in range(3):
+        key = job_key("tts", {"n": n})
+        journal.begin(key, "tts", {"n": n}, f"TTS {n}")
+        journal.submitted(key, f"task-{n}")
+    journal.fail(job_key("tts", {"n": 0}), "boom")
+
+    assert status_command(["--journal", path, "--status", "FAILED"], "main.py") == 0
+    output = capsys.readouterr().out
+    assert "3 jobs" in output
+    assert "boom" in output and "TTS 0" in output and "TTS 1" not in output
+
+
+def test_status_command_missing_journal(tmp_path, capsys):
+    missing = str(tmp_path / "missing.db")
+    assert status_command(["--journal", missing], "main.py") == 1
+    assert not os.path.exists(missing)
@@ -0,0 +1,142 @@
+# test_webhook.py
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from persolive_common import webhook  # noqa: E402
+from persolive_common.webhook import WebhookReceiver  # noqa: E402
+
+
+def request(
+    path: str,
+    body: bytes = b"",
+    method: str = "POST",
+    content_type: str = "application/json",
+    length=None,
+) -> bytes:
+    length = len(body) if length is None else length
+    return (
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: {content_type}\r\nContent-Length: {length}\r\n\r\n"
+    ).encode() + body
+
+
+async def send(receiver: WebhookReceiver, raw: bytes) -> str:
+    reader, writer = await asyncio.open_connection("127.0.0.1", receiver.port)
+    writer.write(raw)
+    await writer.drain()
+    writer.write_eof()
+    status_line = await reader.readline()
+    writer.close()
+    return status_line.decode().split(" ", 2)[1]
+
+
+def run(test):
+    async def main():
+        async with WebhookReceiver() as receiver:
+            return await test(receiver)
+
+    return asyncio.run(main())
+
+
+def test_notification_resolves_expect_even_when_it_came_first():
+    async def test(receiver):
+        body = {"projectexport_id": 7, "status": "COMPLETED"}
+        assert (
+            await send(receiver, request(receiver.path, json.dumps(body).encode()))
+            == "200"
+        )
+        assert await asyncio.wait_for(receiver.expect("7"), 1) == body
+
+        future = receiver.expect("8")
+        nested = {"data": {"task_id": "8"}, "status": "FAILED"}
+        query = receiver.path + "?attempt=2"
+        assert (
+            await send(receiver, request(query, json.dumps(nested).encode())) == "200"
+        )
+        assert await asyncio.wait_for(future, 1) == nested
+        assert "notified_at" in receiver.jobs["8"]
+
+    run(test)
+
+
+def test_form_encoded_notification():
+    async def test(receiver):
+        raw = request(
+            receiver.path,
+            b"task_id=abc&status=COMPLETED",
+            content_type="application/x-www-form-urlencoded",
+        )
+        assert await send(receiver, raw) == "200"
+        assert (await receiver.expect("abc"))["status"] == "COMPLETED"
+
+    run(test)
+
+
+@pytest.mark.parametrize(
+    "raw, status",
+    [
+        (lambda path: request("/webhook/wrong", b"{}"), "404"),
+        (lambda path: request(path, method="GET"), "404"),
+        (lambda path: request(path, b"not json"), "400"),
+        (lambda path: request(path, b"[1, 2]"), "400"),
+        (lambda path: request(path, b'{"status": "COMPLETED"}'), "400"),  # No ID
+        (lambda path: request(path, b'{"task_id": 1}', length=50), "400"),
+        (lambda path: request(path, b"{}", length="abc"), "400"),
+        (lambda path: b"garbage\r\n\r\n", "400"),
+        (lambda path: request(path, length=webhook.MAX_BODY_BYTES + 1), "413"),
+    ],
+    ids=[
+        "wrong-path",
+        "get",
+        "invalid-json",
+        "not-an-object",
+        "no-id",
+        "truncated-body",
+        "bad-length",
+        "bad-request-line",
+        "too-large",
+    ],
+)
+def test_rejected_requests(raw, status):
+    async def test(receiver):
+        assert await send(receiver, raw(receiver.path)) == status
+        assert receiver.jobs == {}
+
+    run(test)
+
+
+def test_listener_errors_do_not_affect_the_sender():
+    async def test(receiver):
+        calls = []
+
+        def broken(job_id, body):
+            raise RuntimeError("listener bug")
+
+        receiver.add_listener(broken)
+        receiver.add_listener(lambda job_id, body: calls.append(job_id))
+        raw = request(receiver.path, b'{"task_id": "t1"}')
+        assert await send(receiver, raw) == "200"
+        assert calls == ["t1"]
+        assert receiver._early == {}  # Handled by listeners, not kept
+
+    run(test)
+
+
+def test_early_notifications_are_bounded(monkeypatch):
+    monkeypatch.setattr(webhook, "MAX_EARLY_NOTIFICATIONS", 3)
+
+    async def test(receiver):
+        for n in range(1, 6):
+            raw = request(receiver.path, json.dumps({"task_id": n}).encode())
+            assert await send(receiver, raw) == "200"
+        assert list(receiver._early) == ["3", "4", "5"]  # Oldest dropped
+
+    run(test)
@@ -0,0 +1,281 @@
+# webhook.py
+import asyncio
+import json
+import math
+import secrets
+import threading
+import time
+from typing import Callable, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+TERMINAL_STATUSES = frozenset({"COMPLETED", "FAILED"})
+ID_FIELDS = ("projectexport_id", "task_id")
+MAX_BODY_BYTES = 1 << 20
+MAX_EARLY_NOTIFICATIONS = 1000
+
+
+def notification_id(body: dict) -> Optional[str]:
+    """The export or task ID a notification is about"""
+    for candidate in (body, body.get("data")):
+        if isinstance(candidate, dict):
+            for field in ID_FIELDS:
+                if candidate.get(field):
+                    return str(candidate[field])
+    return None
+
+
+class WebhookReceiver:
+    """Embeddable asyncio HTTP server for export and studio task webhooks
+
+    Pass receiver.url as webhook_url when submitting an export or a task. The
+    URL contains a random token; notifications to any other path are
+    rejected. Each notification is matched to its job by projectexport_id or
+    task_id and resolves the Future returned by expect(). Notifications that
+    arrive before expect() is called (the job finished quickly) are kept,
+    up to MAX_EARLY_NOTIFICATIONS, unless listeners have handled them.
+
+    wait() combines the webhook with slow polling as a safety net, so a lost
+    or undeliverable notification only delays the result by poll_interval.
+    Listeners added with add_listener(fn) are called as fn(job_id, body) on
+    the event loop for every notification; an exception from a listener is
+    printed and does not affect the response to the sender.
+
+    Sync scripts can run the receiver on its own thread with
+    serve_in_thread() and wait with wait_blocking().
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 0, public_url: Optional[str] = None
+    ):
+        self.host = host
+        self.port = port
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.path = f"/webhook/{secrets.token_urlsafe(16)}"
+        self.jobs: dict[str, dict] = {}  # job_id -> timings and how it finished
+        self._futures: dict[str, asyncio.Future] = {}
+        self._early: dict[str, dict] = {}
+        self._listeners: list[Callable[[str, dict], None]] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Callback URL to register as webhook_url"""
+        host = "127.0.0.1" if self.host in ("", "0.0.0.0") else self.host
+        base = self.public_url or f"http://{host}:{self.port}"
+        return base + self.path
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for future in self._futures.values():
+            future.cancel()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def add_listener(self, listener: Callable[[str, dict], None]):
+        self._listeners.append(listener)
+
+    def register(self, job_id: str):
+        """Note that job_id was submitted with this receiver's URL"""
+        self.jobs.setdefault(str(job_id), {"registered_at": time.time()})
+
+    def record_finished(self, job_id: str, source: Optional[str] = None):
+        """Note that job_id reached a final status, by "webhook" or by "poll"
+
+        Without a source, the job counts as finished by webhook if a
+        notification for it was received.
+        """
+        job = self.jobs.setdefault(str(job_id), {"registered_at": time.time()})
+        job["finished_at"] = time.time()
+        job["source"] = source or ("webhook" if "notified_at" in job else "poll")
+
+    def expect(self, job_id: str) -> asyncio.Future:
+        """Future resolved with the body of the next notification for job_id"""
+        job_id = str(job_id)
+        self.register(job_id)
+        future = self._futures.get(job_id)
+        if future is None or future.done():
+            future = self._loop.create_future()
+            self._futures[job_id] = future
+            if job_id in self._early:
+                future.set_result(self._early.pop(job_id))
+        return future
+
+    async def wait(
+        self,
+        job_id: str,
+        poll: Optional[Callable[[], dict]] = None,
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+    ) -> dict:
+        """Final state of a job, from its webhook or from the safety-net poll
+
+        poll is a blocking function returning the job's current state (it runs
+        in a worker thread). A notification triggers one poll, so the result
+        always has the same shape as a status response; without poll the
+        notification body itself is returned.
+        """
+        job_id = str(job_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            future = self.expect(job_id)
+            wait_for = poll_interval if poll else None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No final status for {job_id}")
+                wait_for = remaining if wait_for is None else min(wait_for, remaining)
+            done, _ = await asyncio.wait({future}, timeout=wait_for)
+
+            if done:
+                data = future.result()
+                source = "webhook"
+                if poll is not None:
+                    data = await asyncio.to_thread(poll)
+            elif poll is not None:
+                data = await asyncio.to_thread(poll)
+                source = "poll"
+            else:
+                continue
+
+            # A notification without a status is taken as the final one
+            if data.get("status") in TERMINAL_STATUSES or "status" not in data:
+                self.record_finished(job_id, source)
+                self._futures.pop(job_id, None)
+                return data
+
+    def serve_in_thread(self) -> "WebhookReceiver":
+        """Start the receiver on a private event loop thread (for sync code)"""
+        started = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def wait_blocking(self, job_id: str, **kwargs) -> dict:
+        """wait() for code running outside the receiver's event loop"""
+        return asyncio.run_coroutine_threadsafe(
+            self.wait(job_id, **kwargs), self._loop
+        ).result()
+
+    def close(self):
+        """Stop a receiver started with serve_in_thread()"""
+        if self._thread is not None:
+            asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def summary(self, reference_interval: float = 5.0) -> dict:
+        """How jobs finished, and the polling delay the webhooks avoided
+
+        For every job finished by webhook, the delay avoided is the time from
+        the notification to the next check a fixed reference_interval poll
+        (started at registration) would have made.
+        """
+        finished = [job for job in self.jobs.values() if "finished_at" in job]
+        saved = []
+        for job in finished:
+            if job.get("source") == "webhook" and "notified_at" in job:
+                elapsed = job["notified_at"] - job["registered_at"]
+                ticks = max(1, math.ceil(elapsed / reference_interval))
+                saved.append(ticks * reference_interval - elapsed)
+        return {
+            "jobs": len(finished),
+            "by_webhook": sum(1 for job in finished if job["source"] == "webhook"),
+            "by_poll": sum(1 for job in finished if job["source"] == "poll"),
+            "poll_delay_avoided_mean": sum(saved) / len(saved) if saved else None,
+        }
+
+    def _notify(self, body: dict) -> bool:
+        job_id = notification_id(body)
+        if job_id is None:
+            return False
+        job = self.jobs.setdefault(job_id, {"registered_at": time.time()})
+        job.setdefault("notified_at", time.time())
+
+        future = self._futures.get(job_id)
+        if future is not None and not future.done():
+            future.set_result(body)
+        elif not self._listeners:  # Keep it for a later expect()
+            self._early.pop(job_id, None)
+            self._early[job_id] = body
+            while len(self._early) > MAX_EARLY_NOTIFICATIONS:
+                del self._early[next(iter(self._early))]
+        for listener in self._listeners:
+            try:
+                listener(job_id, body)
+            except Exception as e:
+                print(f"⚠️  Webhook listener failed for {job_id}: {e}")
+        return True
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length") or 0)
+            if length > MAX_BODY_BYTES:
+                status = 413
+            elif method != "POST" or urlsplit(target).path != self.path:
+                status = 404
+            else:
+                raw = await reader.readexactly(length)
+                status = 200 if self._notify(self._parse(raw, headers)) else 400
+        except (ValueError, asyncio.IncompleteReadError):
+            status = 400
+
+        reason = {
+            200: "OK",
+            400: "Bad Request",
+            404: "Not Found",
+            413: "Payload Too Large",
+        }[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Length: 0\r\n"
+            f"Connection: close\r\n\r\n".encode()
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _parse(raw: bytes, headers: dict) -> dict:
+        if "application/x-www-form-urlencoded" in headers.get("content-type", ""):
+            return dict(parse_qsl(raw.decode()))
+        body = json.loads(raw)
+        if not isinstance(body, dict):
+            raise ValueError("Notification body is not an object")
+        return body
@@ -0,0 +1,488 @@
+"""Batch video translation from a CSV or JSONL manifest
+
+Every manifest row is one video: its URL, source language, target languages
+and lipsync/watermark flags. Projects and exports are created under separate
+concurrency limits, so a batch of hundreds of videos never holds more
+in-flight exports than the plan allows. Queued work is ordered by priority,
+then by known video duration, so short videos finish first.
+
+Results are appended to a JSONL file as each video finishes (all of its
+exports COMPLETED or FAILED). An interrupted run can be restarted with the
+same command; videos that already have a COMPLETED record are skipped.
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export_poller import ExportPoller  # noqa: E402
+from main import (  # noqa: E402
+    create_export,
+    create_project,
+    export_payload,
+    extract_filename_from_url,
+    format_duration,
+    project_payload,
+)
+from persolive_common.http_client import (  # noqa: E402
+    get_session,
+    never_reached_server,
+)
+
+TRUE_VALUES = {"1", "true", "yes", "y", "on"}
+
+
+def parse_arguments():
+    """Command line argument parser"""
+    parser = argparse.ArgumentParser(
+        description="Batch video translation from a manifest",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Manifest columns (CSV header or JSONL keys):
+  url, source_language, target_languages   required; CSV languages separated by spaces, "|" or ";"
+  lipsync, watermark                       optional flags (default: no lipsync, watermark on)
+  priority                                 optional export priority, lower runs first (default: 1)
+  duration_sec                             optional video duration; shorter videos run first
+  id, input_file_name                      optional (id defaults to the URL)
+
+Examples:
+  python batch_translate.py --manifest videos.csv --output results.jsonl
+  python batch_translate.py --manifest videos.jsonl --output results.jsonl --max-projects 2 --max-exports 4
+
+  # After a crash, run the same command again to resume
+        """,
+    )
+
+    parser.add_argument(
+        "--base-url",
+        default="https://platform.perso.ai",
+        help="API base URL (default: https://platform.perso.ai)",
+    )
+    parser.add_argument(
+        "--api-key",
+        help="API key (if not provided, will use EST_LIVE_API_KEY environment variable)",
+    )
+    parser.add_argument("--manifest", required=True, help="CSV or JSONL manifest")
+    parser.add_argument("--output", required=True, help="JSONL file for results")
+
+    # Concurrency per stage
+    parser.add_argument(
+        "--max-projects",
+        type=int,
+        default=2,
+        help="Projects created (source analysis) at the same time (default: 2)",
+    )
+    parser.add_argument(
+        "--max-exports",
+        type=int,
+        default=4,
+        help="Exports in flight at the same time, i.e. the plan quota (default: 4)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5,
+        help="Seconds before the first status check of an export; later checks adapt to its progress (default: 5)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Retries for a project or export request that never reached the server (default: 3)",
+    )
+
+    parser.add_argument(
+        "--server-label",
+        default="",
+        help="Server label (default: empty - use any available server)",
+    )
+    parser.add_argument(
+        "--perso-plan-name",
+        default="",
+        help="Perso plan name (default: empty - use any available server)",
+    )
+    return parser.parse_args()
+
+
+def parse_flag(value, default):
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def load_manifest(path):
+    """Jobs from a CSV (with header) or JSONL manifest, in file order"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [
+                json.loads(line)
+                for line in f
+                if line.strip() and not line.lstrip().startswith("#")
+            ]
+
+    jobs = []
+    for order, row in enumerate(rows):
+        targets = row.get("target_languages") or row.get("target_language") or []
+        if isinstance(targets, str):
+            targets = re.split(r"[\s|;,]+", targets.strip())
+        if not any(targets):
+            raise ValueError(f"Manifest row {order + 1} has no target languages")
+        duration = row.get("duration_sec")
+        jobs.append(
+            {
+                "id": row.get("id") or row["url"],
+                "url": row["url"],
+                "source_language": row["source_language"],
+                "target_languages": list(dict.fromkeys(t for t in targets if t)),
+                "lipsync": parse_flag(row.get("lipsync"), False),
+                "watermark": parse_flag(row.get("watermark"), True),
+                "priority": int(row.get("priority") or 1),
+                "duration_sec": float(duration) if duration not in (None, "") else None,
+                "input_file_name": row.get("input_file_name")
+                or extract_filename_from_url(row["url"]),
+                "order": order,
+            }
+        )
+    return jobs
+
+
+def load_completed(output_path):
+    """Job ids that already have a COMPLETED record in the output file
+
+    A partially written last line (the process died mid-write) is cut off so
+    new results start on a fresh line.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") == "COMPLETED":
+                completed.add(record["id"])
+    return completed
+
+
+def unconfirmed(error):
+    """Error text for a request that may have been processed despite failing"""
+    return f"{error} (not retried: the server may have accepted the request)"
+
+
+def sort_key(job):
+    """Lower priority value first, then known short videos, then manifest order"""
+    duration = job["duration_sec"]
+    return (job["priority"], duration if duration is not None else float("inf"))
+
+
+class BatchRunner:
+    """Moves jobs through project creation, export creation and polling
+
+    At most max_projects projects are being created and at most max_exports
+    exports are in flight. Failed requests are retried only if they never
+    reached the server (connection failure or 429).
+    """
+
+    def __init__(self, client, args, output):
+        self.client = client
+        self.args = args
+        self.output = output
+        self.project_queue = []  # heap of (priority, duration, order, job)
+        self.export_queue = []  # heap of (priority, duration, order, language, job)
+        self.creating = 0
+        self.submitting = 0
+        self.in_flight = {}  # export_id -> (job, language)
+        self.poller = ExportPoller(
+            client,
+            initial_interval=args.poll_interval,
+            min_interval=min(2.0, args.poll_interval),
+        )
+        self.futures = {}
+        self.delayed = []  # heap of (ready time, kind, item) waiting to retry
+        self.finished = []
+
+    def add(self, job):
+        job["exports"] = {}
+        job["attempts"] = 0
+        heapq.heappush(self.project_queue, (*sort_key(job), job["order"], job))
+
+    def run(self):
+        executor = ThreadPoolExecutor(
+            max_workers=self.args.max_projects + self.args.max_exports
+        )
+        try:
+            while self.busy():
+                self.release_delayed()
+                self.start_projects(executor)
+                self.start_exports(executor)
+                done, _ = wait(
+                    self.futures,
+                    timeout=self.next_wakeup(),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    self.handle(future, *self.futures.pop(future))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.poller.stop()
+
+    def busy(self):
+        return bool(
+            self.project_queue
+            or self.export_queue
+            or self.in_flight
+            or self.futures
+            or self.delayed
+        )
+
+    def next_wakeup(self):
+        if not self.delayed:
+            return None
+        return max(0.05, self.delayed[0][0] - time.time())
+
+    def release_delayed(self):
+        now = time.time()
+        while self.delayed and self.delayed[0][0] <= now:
+            _, _, kind, entry = heapq.heappop(self.delayed)
+            heapq.heappush(
+                self.project_queue if kind == "project" else self.export_queue, entry
+            )
+
+    def retry_later(self, kind, entry, attempts):
+        delay = min(60, 2**attempts)
+        heapq.heappush(self.delayed, (time.time() + delay, id(entry), kind, entry))
+
+    ########## Stage 1: projects
+
+    def start_projects(self, executor):
+        while (
+            self.project_queue
+            and self.creating < self.args.max_projects
+            and len(self.export_queue) < self.args.max_exports
+        ):
+            entry = heapq.heappop(self.project_queue)
+            job = entry[-1]
+            job.setdefault("started_at", time.time())
+            payload = project_payload(
+                job["url"],
+                job["source_language"],
+                job["input_file_name"],
+                video_duration_sec=job["duration_sec"] or 0,
+            )
+            self.creating += 1
+            future = executor.submit(create_project, self.client, payload)
+            self.futures[future] = ("project", entry)
+
+    def project_created(self, entry, data):
+        job = entry[-1]
+        job["project_id"] = data["project_id"]
+        print(f"✅ {job['id']}: project {job['project_id']} created")
+        for language in job["target_languages"]:
+            job["exports"][language] = {"attempts": 0}
+            heapq.heappush(self.export_queue, (*entry[:-1], language, job))
+
+    ########## Stage 2: exports
+
+    def start_exports(self, executor):
+        while (
+            self.export_queue
+            and len(self.in_flight) + self.submitting < self.args.max_exports
+        ):
+            entry = heapq.heappop(self.export_queue)
+            language, job = entry[-2:]
+            payload = export_payload(
+                job["project_id"],
+                language,
+                lipsync=job["lipsync"],
+                watermark=job["watermark"],
+                priority=job["priority"],
+                server_label=self.args.server_label,
+                perso_plan_name=self.args.perso_plan_name,
+            )
+            job["exports"][language].setdefault("submitted_at", time.time())
+            self.submitting += 1
+            future = executor.submit(create_export, self.client, payload)
+            self.futures[future] = ("export", entry)
+
+    def export_created(self, entry, data):
+        language, job = entry[-2:]
+        export_id = data["projectexport_id"]
+        job["exports"][language]["export_id"] = export_id
+        self.in_flight[export_id] = (job, language)
+        self.futures[self.poller.watch(export_id)] = ("poll", export_id)
+        print(f"🚀 {job['id']}: {language} export {export_id} created")
+
+    def finish_export(self, job, language, data=None, error=None):
+        export = job["exports"][language]
+        export["finished_at"] = time.time()
+        if error:
+            export["status"] = "FAILED"
+            export["error"] = error
+        else:
+            export["status"] = data["status"]
+            if data["status"] == "COMPLETED":
+                export["output"] = data.get(
+                    "video_output_video_with_lipsync"
+                    if job["lipsync"]
+                    else "video_output_video_without_lipsync"
+                )
+            else:
+                export["error"] = data.get("failure_reason") or data.get(
+                    "status_detail"
+                )
+        icon = "🎉" if export["status"] == "COMPLETED" else "❌"
+        print(f"{icon} {job['id']}: {language} {export['status']}")
+        if all("finished_at" in e for e in job["exports"].values()):
+            self.write_result(job)
+
+    ########## Results
+
+    def handle(self, future, kind, item):
+        try:
+            data = future.result()
+            error, retryable = None, False
+        except Exception as e:
+            data, error, retryable = None, str(e), never_reached_server(e)
+
+        if kind == "poll":
+            job, language = self.in_flight.pop(item)
+            if error:
+                self.finish_export(
+                    job, language, error=f"Could not check export status: {error}"
+                )
+            else:
+                self.finish_export(job, language, data)
+            return
+
+        if kind == "project":
+            self.creating -= 1
+            job = item[-1]
+            if not error:
+                self.project_created(item, data)
+            elif retryable and job["attempts"] < self.args.retries:
+                job["attempts"] += 1
+                print(f"⚠️  {job['id']}: project creation failed, retrying: {error}")
+                self.retry_later("project", item, job["attempts"])
+            else:
+                job["error"] = error if retryable else unconfirmed(error)
+                print(f"❌ {job['id']}: project creation failed: {job['error']}")
+                self.write_result(job)
+            return
+
+        self.submitting -= 1
+        language, job = item[-2:]
+        export = job["exports"][language]
+        if not error:
+            self.export_created(item, data)
+        elif retryable and export["attempts"] < self.args.retries:
+            export["attempts"] += 1
+            print(f"⚠️  {job['id']}: {language} export failed, retrying: {error}")
+            self.retry_later("export", item, export["attempts"])
+        else:
+            self.finish_export(
+                job, language, error=error if retryable else unconfirmed(error)
+            )
+
+    def write_result(self, job):
+        finished_at = time.time()
+        exports = {}
+        for language, export in job["exports"].items():
+            exports[language] = {
+                "export_id": export.get("export_id"),
+                "status": export["status"],
+                "duration_sec": round(
+                    export["finished_at"] - export["submitted_at"], 1
+                ),
+                "output": export.get("output"),
+            }
+            if export.get("error"):
+                exports[language]["error"] = export["error"]
+
+        statuses = {export["status"] for export in exports.values()}
+        record = {
+            "id": job["id"],
+            "url": job["url"],
+            "project_id": job.get("project_id"),
+            "status": "COMPLETED" if statuses == {"COMPLETED"} else "FAILED",
+            "elapsed_sec": round(finished_at - job["started_at"], 1),
+            "exports": exports,
+        }
+        if job.get("error"):
+            record["error"] = job["error"]
+
+        self.output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.output.flush()
+        self.finished.append(record)
+
+
+def main():
+    args = parse_arguments()
+
+    api_key = args.api_key or os.environ.get("EST_LIVE_API_KEY")
+    if not api_key:
+        print(
+            "❌ Error: API key is required. Provide it via --api-key argument or EST_LIVE_API_KEY environment variable."
+        )
+        return 1
+
+    jobs = load_manifest(args.manifest)
+    completed = load_completed(args.output)
+    pending = [job for job in jobs if job["id"] not in completed]
+    print(
+        f"📂 {len(jobs)} videos in manifest, {len(jobs) - len(pending)} already completed, {len(pending)} to translate"
+    )
+    print(
+        f"🧵 Up to {args.max_projects} project(s) and {args.max_exports} export(s) at a time"
+    )
+    if not pending:
+        return 0
+
+    client = get_session(args.base_url, api_key)
+    started_at = time.time()
+    with open(args.output, "a", encoding="utf-8") as output:
+        runner = BatchRunner(client, args, output)
+        for job in pending:
+            runner.add(job)
+        try:
+            runner.run()
+        except KeyboardInterrupt:
+            print("\n⚠️  Interrupted, submitted exports keep running on the server.")
+
+    wall_clock = time.time() - started_at
+    finished = runner.finished
+    ok = sum(1 for record in finished if record["status"] == "COMPLETED")
+    exports = sum(len(record["exports"]) for record in finished)
+    print("=" * 50)
+    print(
+        f"📊 {ok}/{len(finished)} videos completed, {exports} exports in {format_duration(wall_clock)}"
+    )
+    if finished:
+        print(
+            f"   Mean time to result: {format_duration(sum(r['elapsed_sec'] for r in finished) / len(finished))}, "
+            f"throughput {len(finished) / wall_clock * 3600:.1f} videos/hour"
+        )
+    print(f"📝 Results: {args.output}")
+    return 0 if ok == len(pending) else 1
+
+
+if __name__ == "__main__":
+    exit(main())
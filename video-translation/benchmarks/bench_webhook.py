@@ -0,0 +1,233 @@
+# bench_webhook.py
+"""Completion-notification latency: webhooks against polling
+
+A local fake server accepts exports and studio TTS tasks, finishes each one
+after a random duration and then POSTs a notification to its webhook_url
+(a --drop share of notifications is never sent). The same jobs are awaited
+twice:
+
+1. Polling: one GET per job every --interval seconds, as the clients did.
+2. Webhook: a WebhookReceiver resolves each job when its notification
+   arrives; polling every --safety-interval seconds catches dropped ones.
+
+Latency is the time from the server finishing a job to the client seeing it.
+
+Usage:
+    python benchmarks/bench_webhook.py
+    python benchmarks/bench_webhook.py --jobs 40 --interval 5 --drop 0.3
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from export_poller import get_export  # noqa: E402
+from persolive_common.http_client import (  # noqa: E402
+    get_session,
+    get_session_for_url,
+)
+from persolive_common.webhook import WebhookReceiver  # noqa: E402
+
+EXPORT_PATH = "/api/video_translator/v2/export/"
+TTS_PATH = "/api/studio/v1/task/tts/"
+
+
+class FakeServer:
+    """Exports and TTS tasks that finish after a set duration, with webhooks"""
+
+    def __init__(self, durations, drop):
+        self.durations = iter(durations)
+        self.drop = drop
+        self.ids = itertools.count()
+        self.jobs = {}  # job_id -> {"done_at", "id_field"}
+        self.gets = 0
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                self.reply(201, server.submit(self.path, body))
+
+            def do_GET(self):
+                job_id = self.path.rstrip("/").rsplit("/", 1)[-1]
+                self.reply(200, server.status(job_id))
+
+            def reply(self, code, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def submit(self, path, body):
+        id_field = "projectexport_id" if path == EXPORT_PATH else "task_id"
+        n = next(self.ids)
+        job_id = f"{'pvte' if path == EXPORT_PATH else 'pst'}-{n}"
+        dropped = int(n * self.drop) != int((n + 1) * self.drop)  # Evenly spread
+        duration = next(self.durations)
+        with self.lock:
+            self.jobs[job_id] = {
+                "done_at": time.time() + duration,
+                "id_field": id_field,
+            }
+        if body.get("webhook_url") and not dropped:
+            timer = threading.Timer(
+                duration, self.notify, (body["webhook_url"], id_field, job_id)
+            )
+            timer.daemon = True
+            timer.start()
+        return {id_field: job_id, "status": "PENDING"}
+
+    def status(self, job_id):
+        with self.lock:
+            self.gets += 1
+            job = self.jobs[job_id]
+        done = time.time() >= job["done_at"]
+        return {
+            job["id_field"]: job_id,
+            "status": "COMPLETED" if done else "PROCESSING",
+            "progress": 100 if done else 50,
+            "progress_total": 100,
+        }
+
+    @staticmethod
+    def notify(url, id_field, job_id):
+        get_session_for_url(url).post(
+            url, json={id_field: job_id, "status": "COMPLETED"}
+        )
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def submit(client, kind, webhook_url=None):
+    if kind == "export":
+        payload = {"export_type": "INITIAL_EXPORT", "project": "pvtp-bench"}
+        path, id_field = EXPORT_PATH, "projectexport_id"
+    else:
+        payload = {"tts_type": "yuri", "tts_text": ["hello"]}
+        path, id_field = TTS_PATH, "task_id"
+    if webhook_url:
+        payload["webhook_url"] = webhook_url
+    return client.post(client.base_url + path, json=payload).json()[id_field]
+
+
+def get_status(client, job_id):
+    if job_id.startswith("pvte-"):
+        return get_export(client, job_id)
+    return client.get(f"{client.base_url}{TTS_PATH}{job_id}/").json()
+
+
+async def run_polling(client, kinds, interval):
+    async def track(job_id):
+        while True:
+            await asyncio.sleep(interval)
+            data = await asyncio.to_thread(get_status, client, job_id)
+            if data["status"] == "COMPLETED":
+                return job_id, time.time()
+
+    ids = [submit(client, kind) for kind in kinds]
+    return await asyncio.gather(*(track(job_id) for job_id in ids))
+
+
+async def run_webhook(client, kinds, safety_interval):
+    async with WebhookReceiver() as receiver:
+
+        async def track(job_id):
+            await receiver.wait(
+                job_id,
+                poll=lambda: get_status(client, job_id),
+                poll_interval=safety_interval,
+            )
+            return job_id, time.time()
+
+        ids = []
+        for kind in kinds:
+            job_id = submit(client, kind, receiver.url)
+            receiver.register(job_id)
+            ids.append(job_id)
+        results = await asyncio.gather(*(track(job_id) for job_id in ids))
+        return results, receiver.summary()
+
+
+def report(label, server, results):
+    latencies = sorted(
+        seen - server.jobs[job_id]["done_at"] for job_id, seen in results
+    )
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"   {label:<8} mean {statistics.mean(latencies):5.2f}s  p95 {p95:5.2f}s  "
+        f"max {latencies[-1]:5.2f}s  status requests {server.gets}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook vs polling latency")
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument(
+        "--interval", type=float, default=5, help="Polling interval (default: 5)"
+    )
+    parser.add_argument(
+        "--safety-interval",
+        type=float,
+        default=15,
+        help="Safety-net poll interval with webhooks (default: 15)",
+    )
+    parser.add_argument(
+        "--drop", type=float, default=0.2, help="Share of webhooks never sent"
+    )
+    parser.add_argument("--max-duration", type=float, default=12)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    durations = [rng.uniform(1, args.max_duration) for _ in range(args.jobs)]
+    kinds = ["export" if i % 2 == 0 else "tts" for i in range(args.jobs)]
+    print(
+        f"⏱️  {args.jobs} jobs (exports and TTS tasks), 1-{args.max_duration:.0f}s each, "
+        f"{args.drop:.0%} of webhooks dropped"
+    )
+
+    server = FakeServer(durations, args.drop)
+    client = get_session(server.base_url, "bench-key")
+    results = asyncio.run(run_polling(client, kinds, args.interval))
+    report(f"poll {args.interval:g}s", server, results)
+    server.close()
+
+    server = FakeServer(durations, args.drop)
+    client = get_session(server.base_url, "bench-key")
+    results, summary = asyncio.run(run_webhook(client, kinds, args.safety_interval))
+    report("webhook", server, results)
+    server.close()
+    print(
+        f"   {summary['by_webhook']} by webhook, {summary['by_poll']} by the "
+        f"{args.safety_interval:g}s safety-net poll"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""One poller for many video translation exports
+
+Exports report progress/progress_total while they run. The poller keeps a
+short history of those samples per export, estimates its remaining time and
+schedules the next status check from that estimate: rarely while an export
+has a long way to go, often when it is about to finish. Failed checks back
+off exponentially. All exports share one scheduler thread and a small pool
+of request threads.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+TERMINAL_STATUSES = {"COMPLETED", "FAILED"}
+
+
+def get_export(client, export_id):
+    """Get the current state of an export"""
+    url = f"{client.base_url}/api/video_translator/v2/export/{export_id}/"
+    response = client.get(url, timeout=120)
+
+    if response.status_code >= 400:
+        raise Exception(
+            f"Failed to check export status: {response.status_code} - {response.text}"
+        )
+
+    return response.json()
+
+
+def export_progress(data):
+    """Fraction done (0..1) from an export response, or None if not reported"""
+    total = data.get("progress_total")
+    progress = data.get("progress")
+    if not total or progress is None:
+        return None
+    return min(1.0, max(0.0, progress / total))
+
+
+class WatchedExport:
+    """Polling state of one export"""
+
+    def __init__(self, export_id, on_update=None, on_complete=None):
+        self.export_id = export_id
+        self.on_update = on_update
+        self.on_complete = on_complete
+        self.future = Future()
+        self.data = None
+        self.samples = deque(maxlen=8)  # (time, fraction done)
+        self.interval = None
+        self.errors = 0
+        self.due = None  # Time of the next scheduled check, None while checking
+        self.checking = False
+        self.recheck = False  # check_now() during a check: check again after it
+
+    def record(self, data, now):
+        self.data = data
+        fraction = export_progress(data)
+        if fraction is not None:
+            if self.samples and fraction < self.samples[-1][1]:
+                self.samples.clear()  # Progress restarted (next stage)
+            self.samples.append((now, fraction))
+
+    def rate(self):
+        """Progress per second over the recent samples, or None"""
+        if len(self.samples) < 2:
+            return None
+        (t0, f0), (t1, f1) = self.samples[0], self.samples[-1]
+        if t1 <= t0 or f1 <= f0:
+            return None
+        return (f1 - f0) / (t1 - t0)
+
+    def eta(self, now=None):
+        """Estimated seconds until the export finishes, or None"""
+        rate = self.rate()
+        if rate is None:
+            return None
+        t1, f1 = self.samples[-1]
+        now = time.time() if now is None else now
+        return max(0.0, (1.0 - f1) / rate - (now - t1))
+
+
+class ExportPoller:
+    """Tracks many export IDs with adaptive per-export poll intervals
+
+    watch() returns a Future that resolves to the final export data once the
+    export is COMPLETED or FAILED. on_update(export_id, data) is called after
+    every successful check and on_complete(export_id, data) once at the end;
+    both run on the poller's threads, one callback at a time.
+
+    The next check of an export is scheduled at half its estimated remaining
+    time, clamped to [min_interval, max_interval]. Without a progress estimate
+    it is polled every initial_interval seconds; while the progress does not
+    move the interval may grow but never past initial_interval, and from 95%
+    on (finalizing) it drops to min_interval. A failed check doubles the
+    interval; after max_errors failures in a row the Future fails, as it does
+    when a callback raises. Only one check per export runs at a time.
+    """
+
+    def __init__(
+        self,
+        client,
+        initial_interval=5.0,
+        min_interval=2.0,
+        max_interval=60.0,
+        max_errors=10,
+        max_workers=8,
+    ):
+        self.client = client
+        self.initial_interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_errors = max_errors
+        self.requests = 0
+        self._exports = {}
+        self._schedule = []  # heap of (due time, seq, export_id)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._callback_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._thread = None
+        self._stopped = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def watch(self, export_id, on_update=None, on_complete=None, delay=None):
+        """Start tracking an export; returns a Future of its final data"""
+        with self._cond:
+            watched = self._exports.get(export_id)
+            if watched is None:
+                watched = WatchedExport(export_id, on_update, on_complete)
+                self._exports[export_id] = watched
+                first = self.initial_interval if delay is None else delay
+                self._push(export_id, time.time() + first)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return watched.future
+
+    def eta(self, export_id):
+        """Estimated seconds until the export finishes, or None if unknown"""
+        watched = self._exports.get(export_id)
+        return watched.eta() if watched else None
+
+    def progress(self, export_id):
+        """Fraction done (0..1) at the last check, or None"""
+        watched = self._exports.get(export_id)
+        if watched is None or watched.data is None:
+            return None
+        return export_progress(watched.data)
+
+    def check_now(self, export_id):
+        """Check an export right away (e.g. a webhook said it changed)"""
+        with self._cond:
+            watched = self._exports.get(export_id)
+            if watched is None or watched.future.done():
+                return
+            if watched.checking:
+                watched.recheck = True
+            else:
+                self._push(export_id, time.time())
+
+    def pending(self):
+        """IDs of exports that have not finished yet"""
+        with self._cond:
+            return [i for i, w in self._exports.items() if not w.future.done()]
+
+    def stop(self):
+        """Stop polling; unfinished Futures are cancelled"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for watched in list(self._exports.values()):
+            watched.future.cancel()
+
+    def _push(self, export_id, due):
+        self._exports[export_id].due = due
+        heapq.heappush(self._schedule, (due, next(self._seq), export_id))
+        self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    timeout = None
+                    if self._schedule:
+                        timeout = self._schedule[0][0] - time.time()
+                        if timeout <= 0:
+                            break
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+                due, _, export_id = heapq.heappop(self._schedule)
+                watched = self._exports[export_id]
+                if watched.due != due:
+                    continue  # Replaced by check_now()
+                watched.due = None
+                watched.checking = True
+            try:
+                self._executor.submit(self._check, watched)
+            except RuntimeError:
+                return  # Executor shut down by stop()
+
+    def _check(self, watched):
+        try:
+            due = self._poll(watched)
+        except Exception as e:  # Raised by a callback
+            self._resolve(watched, error=e)
+            due = None
+        with self._cond:
+            watched.checking = False
+            if watched.future.done():
+                return
+            if watched.recheck:
+                watched.recheck = False
+                due = time.time()
+            self._push(watched.export_id, due)
+
+    def _poll(self, watched):
+        """One status check; returns when to check next, or None when finished"""
+        if watched.future.done():
+            return None  # Cancelled by stop()
+        with self._cond:
+            self.requests += 1  # Checks run concurrently on the executor
+        try:
+            data = get_export(self.client, watched.export_id)
+        except Exception as e:
+            watched.errors += 1
+            if self.max_errors and watched.errors >= self.max_errors:
+                self._resolve(watched, error=e)
+                return None
+            base = watched.interval or self.initial_interval
+            return time.time() + min(self.max_interval, base * 2**watched.errors)
+
+        now = time.time()
+        watched.errors = 0
+        moved = watched.data is None or export_progress(data) != export_progress(
+            watched.data
+        )
+        watched.record(data, now)
+        finished = data["status"] in TERMINAL_STATUSES
+        with self._callback_lock:
+            if watched.on_update:
+                watched.on_update(watched.export_id, data)
+            if finished and watched.on_complete:
+                watched.on_complete(watched.export_id, data)
+        if finished:
+            self._resolve(watched, data)
+            return None
+
+        watched.interval = self._next_interval(watched, moved, now)
+        return now + watched.interval
+
+    @staticmethod
+    def _resolve(watched, data=None, error=None):
+        if watched.future.done():
+            return  # Already finished, or cancelled by stop()
+        if error is not None:
+            watched.future.set_exception(error)
+        else:
+            watched.future.set_result(data)
+
+    def _next_interval(self, watched, moved, now):
+        eta = watched.eta(now)
+        if eta is not None and moved:
+            interval = eta / 2
+        elif watched.interval is None or moved:
+            interval = self.initial_interval
+        else:
+            # Stalled or no progress reported: look a little less often, but
+            # no less often than a fixed poll would
+            interval = min(self.initial_interval, watched.interval * 1.5)
+        fraction = export_progress(watched.data)
+        if fraction is not None and fraction >= 0.95:
+            interval = self.min_interval  # Finalizing: completion is imminent
+        return min(self.max_interval, max(self.min_interval, interval))
@@ -1,11 +1,23 @@
 import argparse
-import json
 import os
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
 import requests
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export_poller import TERMINAL_STATUSES, ExportPoller  # noqa: E402
+from persolive_common.http_client import get_session  # noqa: E402
+from persolive_common.job_journal import (  # noqa: E402
+    JobJournal,
+    job_key,
+    status_command,
+)
+from persolive_common.webhook import WebhookReceiver  # noqa: E402
+
 
 def parse_arguments():
     """Command line argument parser"""
@@ -16,6 +28,11 @@ def parse_arguments():
 Examples:
   python main.py --input-file-url "https://example.com/video.mp4" --source-lang ko --target-lang en
   python main.py --input-file-url "https://example.com/video.mp4" --source-lang ko --target-lang en --lipsync --no-watermark
+  python main.py --input-file-url "https://example.com/video.mp4" --source-lang ko --target-lang en ja es fr de
+
+  # Record submissions; rerunning the same command after a crash re-attaches to them
+  python main.py --input-file-url "https://example.com/video.mp4" --target-lang en ja --journal jobs.db
+  python main.py status --journal jobs.db
         """,
     )
 
@@ -41,8 +58,9 @@ Examples:
     )
     parser.add_argument(
         "--target-language",
-        default="en",
-        help="Target language code (e.g., 'ko', 'en', 'ja')",
+        nargs="+",
+        default=["en"],
+        help="Target language code(s); one export per language (e.g., 'en' or 'en ja es')",
     )
 
     # Optional arguments
@@ -79,6 +97,19 @@ Examples:
         default="",
         help="Perso plan name (default: empty - use any available server)",
     )
+    parser.add_argument(
+        "--webhook-port",
+        type=int,
+        help="Receive completion webhooks on this local port; polling becomes a slow safety net",
+    )
+    parser.add_argument(
+        "--webhook-public-url",
+        help="Public URL that forwards to --webhook-port (default: http://127.0.0.1:PORT)",
+    )
+    parser.add_argument(
+        "--journal",
+        help="SQLite file recording the project and exports; a rerun re-attaches instead of resubmitting",
+    )
     parser.add_argument(
         "--input-number-of-speakers",
         default=1,
@@ -103,7 +134,267 @@ def extract_filename_from_url(url):
     return filename if filename else "video.mp4"
 
 
+def project_payload(
+    input_file_url,
+    source_language,
+    input_file_name,
+    video_duration_sec=0,
+    number_of_speakers=1,
+    experiments=None,
+    subtitle_url=None,
+):
+    """Create-project request body"""
+    return {
+        "input_file_name": input_file_name,
+        "input_file_url": input_file_url,
+        "source_language": source_language,
+        "input_file_video_duration_sec": video_duration_sec,
+        "input_number_of_speakers": number_of_speakers,
+        "experiments": experiments or [],
+        "input_file_source_language_subtitle_url": subtitle_url,
+    }
+
+
+def export_payload(
+    project_id,
+    target_language,
+    lipsync=False,
+    watermark=True,
+    priority=1,
+    server_label="",
+    perso_plan_name="",
+    dictionary_url=None,
+    webhook_url=None,
+):
+    """INITIAL_EXPORT request body for one target language"""
+    payload = {
+        "export_type": "INITIAL_EXPORT",
+        "priority": priority,
+        "server_label": server_label,
+        "perso_plan_name": perso_plan_name,
+        "project": project_id,
+        "target_language": target_language,
+        "lipsync": lipsync,
+        "watermark": watermark,
+    }
+    if dictionary_url:
+        payload["input_dictionary_url"] = dictionary_url
+    if webhook_url:
+        payload["webhook_url"] = webhook_url
+    return payload
+
+
+def create_project(client, payload):
+    """Create a translation project (source analysis runs once per project)"""
+    url = f"{client.base_url}/api/video_translator/v2/project/"
+
+    response = client.post(url, json=payload)
+    if response.status_code >= 400:
+        raise requests.HTTPError(
+            f"Failed to create project: {response.status_code} - {response.text}",
+            response=response,
+        )
+
+    return response.json()
+
+
+def create_export(client, payload):
+    """Request an export of a project into one target language"""
+    url = f"{client.base_url}/api/video_translator/v2/export/"
+
+    response = client.post(url, json=payload)
+    if response.status_code >= 400:
+        raise requests.HTTPError(
+            f"Failed to create export: {response.status_code} - {response.text}",
+            response=response,
+        )
+
+    return response.json()
+
+
+def submit_exports(client, payloads, journal=None):
+    """Create the exports concurrently, one per target language
+
+    payloads maps each language to its export request body. Returns
+    {language: job} where job holds the export_id (or the submission error)
+    and the time it was submitted. Exports already in the journal are
+    re-attached to instead of being created again.
+    """
+
+    jobs = {}
+    if journal:
+        for target_language, payload in payloads.items():
+            previous = journal.resumable(job_key("export", payload))
+            if previous:
+                jobs[target_language] = reattach_export(target_language, previous)
+
+    def submit(target_language):
+        payload = payloads[target_language]
+        key = job_key("export", payload)
+        job = {"language": target_language, "submitted_at": time.time()}
+        if journal:
+            journal.begin(
+                key, "export", payload, target_language, parent_id=payload["project"]
+            )
+        try:
+            data = create_export(client, payload)
+            job["export_id"] = data["projectexport_id"]
+            print(
+                f"🚀 Translation request {job['export_id']} ({target_language}) created"
+            )
+        except Exception as e:
+            job["error"] = str(e)
+            job["finished_at"] = time.time()
+            print(f"❌ Translation request for {target_language} failed: {e}")
+            if journal:
+                journal.fail(key, str(e))
+            return job
+
+        if journal:
+            journal.submitted(key, job["export_id"], data.get("status", "PENDING"))
+        return job
+
+    pending = [language for language in payloads if language not in jobs]
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            for job in executor.map(submit, pending):
+                jobs[job["language"]] = job
+    return {language: jobs[language] for language in payloads}
+
+
+def reattach_export(target_language, previous):
+    """Job for an export found in the journal"""
+    job = {
+        "language": target_language,
+        "export_id": previous["remote_id"],
+        "submitted_at": previous["created_at"],
+    }
+    if previous["status"] in TERMINAL_STATUSES and previous["result"]:
+        job["result"] = previous["result"]
+        job["finished_at"] = previous["updated_at"]
+    print(
+        f"♻️  Re-attached to {target_language} export {job['export_id']} ({previous['status']})"
+    )
+    return job
+
+
+def track_exports(client, jobs, receiver=None, journal=None):
+    """Wait until every submitted export is COMPLETED or FAILED
+
+    All exports share one ExportPoller, which checks each of them as often
+    as its progress warrants. Status changes are printed with an ETA. With a
+    WebhookReceiver, a notification triggers an immediate check and the
+    poller only runs every minute or so as a safety net. Status changes are
+    recorded in the journal, if any.
+    """
+    last_seen = {}
+    by_export = {
+        job["export_id"]: job
+        for job in jobs.values()
+        if "export_id" in job and "result" not in job
+    }
+
+    if receiver is None:
+        poller = ExportPoller(client)
+    else:
+        poller = ExportPoller(
+            client, initial_interval=60, min_interval=30, max_interval=300
+        )
+        receiver.add_listener(lambda export_id, body: poller.check_now(export_id))
+
+    with poller:
+
+        def on_update(export_id, data):
+            job = by_export[export_id]
+            if journal:
+                journal.update(export_id, data["status"], data)
+            state = (data["status"], data.get("status_detail"))
+            if last_seen.get(export_id) == state:
+                return
+            last_seen[export_id] = state
+            eta = poller.eta(export_id)
+            eta_text = ""
+            if eta is not None and data["status"] not in TERMINAL_STATUSES:
+                eta_text = f", ETA {format_duration(eta)}"
+            print(
+                f"⏳ {job['language']} {export_id} status: {data['status']} "
+                f"({data.get('status_detail')}{eta_text})"
+            )
+
+        def on_complete(export_id, data):
+            job = by_export[export_id]
+            job["finished_at"] = time.time()
+            if receiver is not None:
+                receiver.record_finished(export_id)
+            job["result"] = data
+            if data["status"] == "COMPLETED":
+                print(f"🎉 {job['language']} {export_id} completed!")
+            else:
+                print(
+                    f"❌ {job['language']} {export_id} failed: "
+                    f"{data.get('failure_reason') or data.get('status_detail', 'Unknown error')}"
+                )
+
+        futures = [
+            poller.watch(export_id, on_update=on_update, on_complete=on_complete)
+            for export_id in by_export
+        ]
+        if receiver is not None:
+            for export_id in by_export:
+                receiver.register(export_id)
+                if "notified_at" in receiver.jobs[export_id]:
+                    poller.check_now(export_id)  # Notified before it was watched
+        for export_id, future in zip(by_export, futures):
+            try:
+                future.result()
+            except Exception as e:
+                by_export[export_id]["error"] = f"Could not check export status: {e}"
+                by_export[export_id]["finished_at"] = time.time()
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s"
+
+
+def print_summary(project_id, jobs, started_at):
+    """Per-language outcome, duration and output video"""
+    print("=" * 50)
+    print(f"📊 Summary (wall-clock {format_duration(time.time() - started_at)})")
+    for language, job in jobs.items():
+        result = job.get("result") or {}
+        status = result.get("status", "FAILED" if "error" in job else "UNKNOWN")
+        icon = "✅" if status == "COMPLETED" else "❌"
+        duration = format_duration(
+            job.get("finished_at", time.time()) - job["submitted_at"]
+        )
+        print(
+            f"{icon} {language:<6} {status:<10} {duration:>8}  {job.get('export_id', '-')}"
+        )
+        if status == "COMPLETED":
+            print(
+                f"   🎥 With lip-sync: {result.get('video_output_video_with_lipsync', 'N/A')}"
+            )
+            print(
+                f"   🎥 Without lip-sync: {result.get('video_output_video_without_lipsync', 'N/A')}"
+            )
+        else:
+            print(
+                f"   {job.get('error') or result.get('failure_reason') or result.get('status_detail', 'Unknown error')}"
+            )
+
+    print(f"\n📋 Project ID: {project_id}")
+    print(
+        f"💡 To modify translations, use: python modify_translation.py --project-id {project_id} --script-index 0 --text 'Your new translation'"
+    )
+
+
 def main():
+    if sys.argv[1:2] == ["status"]:
+        return status_command(sys.argv[2:], "main.py")
+
+    started_at = time.time()
+
     # Parse command line arguments
     args = parse_arguments()
 
@@ -115,6 +406,7 @@ def main():
     watermark = (
         not args.no_watermark
     )  # Reverse the logic since no_watermark is the flag
+    target_languages = list(dict.fromkeys(args.target_language))  # Drop duplicates
 
     # Set up API key
     api_key = args.api_key or os.environ.get("EST_LIVE_API_KEY")
@@ -124,16 +416,14 @@ def main():
         )
         return 1
 
-    headers = {
-        "Content-Type": "application/json",
-        "PersoLive-APIKey": api_key,
-    }
+    client = get_session(BASE_URL, api_key)
+    journal = JobJournal(args.journal) if args.journal else None
 
     print("🎬 Starting video translation...")
     print(f"📁 Input file: {input_file_name}")
     print(f"🔗 Input URL: {args.input_file_url}")
     print(f"🌍 Source language: {args.source_language}")
-    print(f"🌍 Target language: {args.target_language}")
+    print(f"🌍 Target languages: {', '.join(target_languages)}")
     print(f"💋 Lip-sync: {'Enabled' if args.lipsync else 'Disabled'}")
     print(f"🏷️  Watermark: {'Enabled' if watermark else 'Disabled'}")
     print(f"🕒 Input file video duration: {args.input_file_video_duration_sec} seconds")
@@ -146,96 +436,91 @@ def main():
 
     ########## Create Project
 
-    url = f"{BASE_URL}/api/video_translator/v2/project/"
-
-    payload = {
-        "input_file_name": input_file_name,
-        "input_file_url": args.input_file_url,
-        "source_language": args.source_language,
-        "input_file_video_duration_sec": args.input_file_video_duration_sec,
-        "input_number_of_speakers": args.input_number_of_speakers,
-        "experiments": args.experiments,
-        "input_file_source_language_subtitle_url": args.input_file_source_language_subtitle_url,
-    }
-
-    payload = json.dumps(payload, ensure_ascii=False)
-
-    response = requests.request("POST", url, headers=headers, data=payload, timeout=30)
-    if response.status_code >= 400:
-        print(f"❌ Error: {response.json()}")
-        return 1
-
-    data = response.json()
-
-    project_id = data["project_id"]
-
-    print(f"✅ Project {project_id} created successfully\n")
-    print(data)
-
-    ########## Create Export
-
-    url = f"{BASE_URL}/api/video_translator/v2/export/"
-
-    payload = {
-        "export_type": "INITIAL_EXPORT",
-        "priority": 1,
-        "server_label": args.server_label,
-        "perso_plan_name": args.perso_plan_name,
-        "project": project_id,
-        "target_language": args.target_language,
-        "lipsync": args.lipsync,
-        "watermark": watermark,
-    }
-    if args.input_dictionary_url:
-        payload["input_dictionary_url"] = args.input_dictionary_url
-
-    payload = json.dumps(payload, ensure_ascii=False)
-
-    response = requests.request("POST", url, headers=headers, data=payload, timeout=30)
-    if response.status_code >= 400:
-        print(f"❌ Error: {response.json()}")
-        return 1
-
-    data = response.json()
-
-    export_id = data["projectexport_id"]
-
-    print(
-        f"🚀 Translation request {export_id} (source: {args.source_language} target: {args.target_language} project: {project_id}) created successfully\n"
+    payload = project_payload(
+        args.input_file_url,
+        args.source_language,
+        input_file_name,
+        video_duration_sec=args.input_file_video_duration_sec,
+        number_of_speakers=args.input_number_of_speakers,
+        experiments=args.experiments,
+        subtitle_url=args.input_file_source_language_subtitle_url,
     )
+    key = job_key("project", payload)
+    previous = journal.resumable(key) if journal else None
+    if previous:
+        project_id = previous["remote_id"]
+        print(f"♻️  Re-attached to project {project_id}\n")
+    else:
+        if journal:
+            journal.begin(key, "project", payload, input_file_name)
+        try:
+            data = create_project(client, payload)
+        except Exception as e:
+            if journal:
+                journal.fail(key, str(e))
+            print(f"❌ Error: {e}")
+            return 1
+
+        project_id = data["project_id"]
+        if journal:
+            journal.submitted(key, project_id, data.get("status", "CREATED"))
+
+        print(f"✅ Project {project_id} created successfully\n")
+        print(data)
+
+    ########## Create Exports (one per target language, concurrently)
+
+    receiver = None
+    if args.webhook_port is not None:
+        receiver = WebhookReceiver(
+            "0.0.0.0", args.webhook_port, args.webhook_public_url
+        ).serve_in_thread()
+        print(f"📬 Receiving webhooks at {receiver.url}")
+
+    payloads = {
+        language: export_payload(
+            project_id,
+            language,
+            lipsync=args.lipsync,
+            watermark=watermark,
+            server_label=args.server_label,
+            perso_plan_name=args.perso_plan_name,
+            dictionary_url=args.input_dictionary_url,
+            webhook_url=receiver.url if receiver else None,
+        )
+        for language in target_languages
+    }
+    jobs = submit_exports(client, payloads, journal)
 
-    print(data)
-
-    while True:
-        time.sleep(5)
-        request = requests.get(url + f"{export_id}/", headers=headers, timeout=120)
+    ########## Track all exports together
 
-        data = request.json()
+    try:
+        track_exports(client, jobs, receiver, journal)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted, exports keep running on the server.")
+    finally:
+        if receiver is not None:
+            receiver.close()
 
+    if receiver is not None:
+        stats = receiver.summary()
         print(
-            f"⏳ Translation request {export_id} status: {data['status']} ({data['status_detail']})\n"
+            f"📬 {stats['by_webhook']}/{stats['jobs']} exports reported by webhook, "
+            f"{stats['by_poll']} found by the safety-net poll"
         )
-
-        if data["status"] == "COMPLETED":
-            print(f"🎉 Translation request {export_id} completed!\n")
-            print(
-                f"🎥 Output video (with lip-sync): {data.get('video_output_video_with_lipsync', 'N/A')}"
-            )
+        if stats["poll_delay_avoided_mean"] is not None:
             print(
-                f"🎥 Output video (without lip-sync): {data.get('video_output_video_without_lipsync', 'N/A')}"
+                f"   A 5 s poll would have noticed them {stats['poll_delay_avoided_mean']:.1f}s later on average"
             )
-            print(f"\n📋 Project ID: {project_id}")
-            print(
-                f"💡 To modify translations, use: python modify_translation.py --project-id {project_id} --script-index 0 --text 'Your new translation'"
-            )
-            break
-        elif data["status"] == "FAILED":
-            print(
-                f"❌ Translation request {export_id} failed: {data.get('status_detail', 'Unknown error')}"
-            )
-            break
 
-    return 0
+    print_summary(project_id, jobs, started_at)
+    if journal:
+        journal.close()
+
+    completed = all(
+        job.get("result", {}).get("status") == "COMPLETED" for job in jobs.values()
+    )
+    return 0 if completed else 1
 
 
 if __name__ == "__main__":
@@ -1,9 +1,11 @@
 import argparse
-import json
 import os
-import time
+import sys
 
-import requests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export_poller import TERMINAL_STATUSES, ExportPoller  # noqa: E402
+from persolive_common.http_client import get_session  # noqa: E402
 
 
 def parse_arguments():
@@ -86,10 +88,10 @@ Examples:
     return parser.parse_args()
 
 
-def get_project_scripts(base_url, headers, project_id):
+def get_project_scripts(client, project_id):
     """Get project details including scripts"""
-    url = f"{base_url}/api/video_translator/v2/project/{project_id}/"
-    response = requests.get(url, headers=headers, timeout=30)
+    url = f"{client.base_url}/api/video_translator/v2/project/{project_id}/"
+    response = client.get(url)
 
     if response.status_code >= 400:
         raise Exception(
@@ -99,17 +101,15 @@ def get_project_scripts(base_url, headers, project_id):
     return response.json()
 
 
-def modify_script(base_url, headers, script_id, new_text):
+def modify_script(client, script_id, new_text):
     """Modify script translation"""
-    url = f"{base_url}/api/video_translator/v2/script/{script_id}/"
+    url = f"{client.base_url}/api/video_translator/v2/script/{script_id}/"
 
-    payload = json.dumps(
-        {
-            "text_translated": new_text,
-        }
-    )
+    payload = {
+        "text_translated": new_text,
+    }
 
-    response = requests.patch(url, headers=headers, data=payload, timeout=30)
+    response = client.patch(url, json=payload)
 
     if response.status_code >= 400:
         raise Exception(
@@ -119,11 +119,13 @@ def modify_script(base_url, headers, script_id, new_text):
     return response.json()
 
 
-def generate_audio(base_url, headers, script_id):
+def generate_audio(client, script_id):
     """Generate audio for modified script"""
-    url = f"{base_url}/api/video_translator/v2/script/{script_id}/generate_audio/"
+    url = (
+        f"{client.base_url}/api/video_translator/v2/script/{script_id}/generate_audio/"
+    )
 
-    response = requests.post(url, headers=headers, timeout=30)
+    response = client.post(url)
 
     if response.status_code >= 400:
         raise Exception(
@@ -134,8 +136,7 @@ def generate_audio(base_url, headers, script_id):
 
 
 def create_proofread_export(
-    base_url,
-    headers,
+    client,
     project_id,
     target_language,
     export_mode="AUDIO_TRANSLATION",
@@ -145,7 +146,7 @@ def create_proofread_export(
     server_label="",
 ):
     """Create a new export with modified translations"""
-    url = f"{base_url}/api/video_translator/v2/export/"
+    url = f"{client.base_url}/api/video_translator/v2/export/"
 
     payload = {
         "export_type": "PROOFREAD_EXPORT",
@@ -161,9 +162,7 @@ def create_proofread_export(
     if source_export:
         payload["source_export"] = source_export
 
-    payload = json.dumps(payload)
-
-    response = requests.post(url, headers=headers, data=payload, timeout=30)
+    response = client.post(url, json=payload)
 
     if response.status_code >= 400:
         raise Exception(
@@ -173,30 +172,24 @@ def create_proofread_export(
     return response.json()
 
 
-def wait_for_export_completion(base_url, headers, export_id):
+def wait_for_export_completion(client, export_id):
     """Wait for export to complete"""
-    url = f"{base_url}/api/video_translator/v2/export/{export_id}/"
 
-    while True:
-        time.sleep(5)
-        response = requests.get(url, headers=headers, timeout=30)
-
-        if response.status_code >= 400:
-            raise Exception(
-                f"Failed to check export status: {response.status_code} - {response.text}"
-            )
-
-        data = response.json()
+    def on_update(export_id, data):
+        eta = poller.eta(export_id)
+        eta_text = ""
+        if eta is not None and data["status"] not in TERMINAL_STATUSES:
+            eta_text = f", ETA {int(eta)}s"
         print(
-            f"⏳ Export {export_id} status: {data['status']} ({data.get('status_detail', 'N/A')})"
+            f"⏳ Export {export_id} status: {data['status']} ({data.get('status_detail', 'N/A')}{eta_text})"
         )
 
-        if data["status"] == "COMPLETED":
-            return data
-        elif data["status"] == "FAILED":
-            raise Exception(
-                f"Export failed: {data.get('status_detail', 'Unknown error')}"
-            )
+    with ExportPoller(client) as poller:
+        data = poller.watch(export_id, on_update=on_update).result()
+
+    if data["status"] == "FAILED":
+        raise Exception(f"Export failed: {data.get('status_detail', 'Unknown error')}")
+    return data
 
 
 def main():
@@ -211,14 +204,11 @@ def main():
         )
         return 1
 
-    headers = {
-        "Content-Type": "application/json",
-        "PersoLive-APIKey": api_key,
-    }
+    client = get_session(args.base_url, api_key)
 
     try:
         print("🔍 Getting project details...")
-        project_data = get_project_scripts(args.base_url, headers, args.project_id)
+        project_data = get_project_scripts(client, args.project_id)
 
         if not project_data.get("scripts"):
             print("❌ No scripts found in this project.")
@@ -240,18 +230,17 @@ def main():
             script_id = project_data["scripts"][args.script_index]["projectscript_id"]
 
         print(f"📝 Modifying script {script_id}...")
-        modify_result = modify_script(args.base_url, headers, script_id, args.text)
+        modify_result = modify_script(client, script_id, args.text)
         print(f"✅ Script modified successfully: {modify_result}")
 
         print("🎵 Generating audio for modified script...")
-        audio_result = generate_audio(args.base_url, headers, script_id)
+        audio_result = generate_audio(client, script_id)
         print(f"✅ Audio generation completed: {audio_result}")
 
         print("🚀 Creating new export with modified translation...")
         watermark = not args.no_watermark
         export_result = create_proofread_export(
-            args.base_url,
-            headers,
+            client,
             args.project_id,
             args.target_language,
             args.export_mode,
@@ -265,7 +254,7 @@ def main():
         print(f"✅ Export {export_id} created successfully")
 
         print("⏳ Waiting for export to complete...")
-        final_result = wait_for_export_completion(args.base_url, headers, export_id)
+        final_result = wait_for_export_completion(client, export_id)
 
         print("🎉 Export completed successfully!")
         print(